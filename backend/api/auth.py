@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import timedelta
-from typing import Optional
 
-from db.database import get_session
-from repositories.user_repository import UserRepository
-from services.auth_service import verify_password, create_access_token, verify_token
-from models.user import User
+from db.database import get_async_session
+from repositories.user_repository import AsyncUserRepository
+from services.auth_service import (
+    verify_password_async,
+    get_password_hash_async,
+    create_access_token,
+    PasswordHashPoolBusy
+)
+from core.auth import get_current_user
 from schemas.auth import (
     UserRegisterRequest, 
     UserLoginRequest, 
@@ -18,45 +22,57 @@ from core.config import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+def hash_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Demasiadas solicitudes de autenticación, intenta de nuevo",
+        headers={"Retry-After": "1"}
+    )
+
 @router.post("/register", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserRegisterRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Registrar un nuevo usuario"""
-    user_repo = UserRepository(session)
+    user_repo = AsyncUserRepository(session)
     
     # Validar que el username no existe
-    if user_repo.username_exists(user_data.username):
+    if await user_repo.username_exists(user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El nombre de usuario ya existe"
         )
     
     # Validar que el email no existe  
-    if user_repo.email_exists(user_data.email):
+    if await user_repo.email_exists(user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El email ya está registrado"
         )
     
         # Verificar si el ID ya existe
-    existing_id = session.exec(select(User).where(User.ID == user_data.ID)).first()
-    if existing_id:
+    if await user_repo.ID_exists(user_data.ID):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"El ID {user_data.ID} ya está en uso"
         )
         
+    # El hash se calcula en el pool de bcrypt, fuera del event loop
+    try:
+        password_hash = await get_password_hash_async(user_data.password)
+    except PasswordHashPoolBusy:
+        raise hash_pool_busy()
+
     # Crear el usuario
     try:
-        user = user_repo.create_user(
+        user = await user_repo.create_user(
             username=user_data.username,
             email=user_data.email,
             ID=user_data.ID,
             name=user_data.name,
             last_name=user_data.last_name,
-            password=user_data.password
+            password_hash=password_hash
         )
         return MessageResponse(message="Usuario registrado exitosamente")
     except ValueError as e:
@@ -73,13 +89,13 @@ async def register_user(
 @router.post("/login", response_model=TokenResponse)
 async def login_user(
     login_data: UserLoginRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Iniciar sesión y obtener token JWT"""
-    user_repo = UserRepository(session)
+    user_repo = AsyncUserRepository(session)
     
     # Buscar usuario
-    user = user_repo.get_user_by_username(login_data.username)
+    user = await user_repo.get_user_by_username(login_data.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -87,8 +103,12 @@ async def login_user(
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    # Verificar contraseña
-    if not verify_password(login_data.password, user.password_hash):
+    # Verificar contraseña (en el pool de bcrypt, fuera del event loop)
+    try:
+        password_ok = await verify_password_async(login_data.password, user.password_hash)
+    except PasswordHashPoolBusy:
+        raise hash_pool_busy()
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciales incorrectas",
@@ -131,56 +151,6 @@ async def login_user(
         user=user_response
     )
 
-# Middleware para obtener usuario actual
-async def get_current_user(
-    authorization: Optional[str] = Header(None),
-    session: Session = Depends(get_session)
-) -> UserResponse:
-    """Obtener usuario actual desde el token JWT"""
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token de autorización requerido"
-        )
-        
-    try:
-        # Extraer token del header Authorization
-        scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Esquema de autenticación inválido"
-            )
-        
-        # Verificar token y obtener datos
-        payload = verify_token(token)
-        user_repo = UserRepository(session)
-        user = user_repo.get_user_by_username(payload["sub"])
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Usuario no encontrado"
-            )
-        
-        return UserResponse(
-            user_id=user.user_id,
-            username=user.username,
-            email=user.email,
-            ID=user.ID,
-            name=user.name,
-            last_name=user.last_name,
-            role=user.role.value,
-            is_active=user.is_active,
-            created_at=user.created_at
-        )
-    
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token malformado"
-        )
-
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: UserResponse = Depends(get_current_user)):
     """Obtener información del usuario actual"""
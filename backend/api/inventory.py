@@ -1,79 +1,130 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Optional
-from sqlmodel import select
-from models.product import Product
-from models.inventory import Inventory
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
+from sqlmodel import Session
 from db.database import get_session
-from models.user import User
-from api.auth import get_current_user
-from schemas.inventory import ListInventoryResponse, ListInventoryUpdateResponse
-from datetime import datetime, timezone
+from models.user import UserRole
+from core.query_stats import query_budget
+from core.auth import require_role
+from schemas.inventory import (
+    ListInventoryPageResponse,
+    ListInventoryUpdateResponse,
+    InventoryAdjustmentItem,
+    InventoryAdjustmentRequest,
+    InventoryAdjustmentResponse,
+    InventoryImportResponse
+)
+from services.inventory_service import (
+    adjust_inventory,
+    export_inventory,
+    iter_lines,
+    list_inventory,
+    InventoryImporter
+)
+from core.errors import BusinessError
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
-@router.get("/", response_model=List[ListInventoryResponse])
-def list_inventory(
+@router.get("/", response_model=ListInventoryPageResponse, dependencies=[Depends(query_budget(1))])
+def list_inventory_endpoint(
     title: Optional[str] = Query(None),
     isbn: Optional[str] = Query(None),
+    low_stock_below: Optional[int] = Query(None, description="Solo productos con stock efectivo (quantity - reserved) menor a este valor"),
+    sort: str = Query("title", description="Orden: title, quantity, reserved o effective (prefijo '-' para descendente)"),
+    limit: int = Query(100, ge=1, le=1000, description="Productos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor next_cursor o previous_cursor de una respuesta anterior"),
     session=Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    admin_id: int = Depends(require_role(UserRole.ADMIN))
 ):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Acceso denegado")
-    
-    query = select(Product, Inventory).join(Inventory, Inventory.product_id == Product.product_id)
+    """
+    Listar el inventario ordenado y paginado en la base de datos.
 
-    if title:
-        query = query.where(Product.title.ilike(f"%{title}%"))
-    if isbn:
-        query = query.where(Product.isbn.ilike(f"%{isbn}%"))
+    La respuesta incluye los cursores de la página siguiente y anterior (next_cursor y
+    previous_cursor), como el historial de pedidos y el catálogo.
+    """
+    try:
+        return list_inventory(session, title, isbn, low_stock_below, sort, limit, cursor)
+    except BusinessError as be:
+        raise HTTPException(status_code=400, detail=str(be))
 
-    results = session.exec(query).all()
-    inventory_list = []
+@router.post("/adjustments", response_model=InventoryAdjustmentResponse)
+def adjust_inventory_endpoint(
+    request: InventoryAdjustmentRequest,
+    session=Depends(get_session),
+    admin_id: int = Depends(require_role(UserRole.ADMIN))
+):
+    """
+    Ajustar el stock de muchos productos en una sola transacción.
 
-    for product, inventory in results:
-        inventory_list.append(ListInventoryResponse(
-            product_id=product.product_id,
-            title=product.title,
-            author=product.author,
-            isbn=product.isbn,
-            price=product.price,
-            quantity=inventory.quantity,
-            reserved=inventory.reserved
-        ))
-    sorted_inventory_list = sorted(inventory_list, key=lambda x: x.title)
-    return sorted_inventory_list
+    - **mode=absolute**: la cantidad indicada reemplaza la actual
+    - **mode=delta**: la cantidad indicada se suma (o resta) a la actual
+
+    Los productos sin inventario se crean. Se informan los productos inexistentes (`not_found`)
+    y las líneas que dejarían el stock por debajo de lo reservado (`rejected`).
+    """
+    try:
+        return adjust_inventory(session, [item.model_dump(mode="json") for item in request.items])
+    except BusinessError as be:
+        raise HTTPException(status_code=400, detail=str(be))
 
 @router.put("/adjust-many", response_model=List[ListInventoryUpdateResponse])
 def update_inventory(
-    updates: List[dict],
+    updates: List[InventoryAdjustmentItem],
     session=Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    admin_id: int = Depends(require_role(UserRole.ADMIN))
 ):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Acceso denegado")
+    try:
+        result = adjust_inventory(session, [item.model_dump(mode="json") for item in updates])
+    except BusinessError as be:
+        raise HTTPException(status_code=400, detail=str(be))
+    return [
+        ListInventoryUpdateResponse(title=row["title"], quantity=row["quantity"])
+        for row in result["results"]
+    ]
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
 
-    responses = []
-    for item in updates:
-        product_id = item.get("product_id")
-        quantity = item.get("quantity")
+@router.get("/export")
+def export_inventory_endpoint(
+    format: Literal["csv", "ndjson"] = "csv",
+    session=Depends(get_session),
+    admin_id: int = Depends(require_role(UserRole.ADMIN))
+):
+    """Exportar el stock (producto + inventario) en CSV o NDJSON, en streaming y ordenado por product_id"""
+    bind = session.get_bind()
 
-        inventory = session.get(Inventory, product_id)
-        if not inventory:
-            continue  # o lanzar error si prefieres detener todo
+    def stream():
+        # Sesión propia: la del request se cierra antes de terminar de enviar la respuesta
+        with Session(bind) as export_session:
+            yield from export_inventory(export_session, format)
 
-        inventory.quantity = quantity
-        inventory.last_updated = datetime.now(timezone.utc)
-        session.add(inventory)
-        session.commit()
-        session.refresh(inventory)
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="inventory.{format}"'}
+    )
 
-        product = session.get(Product, product_id)
-        responses.append(
-            ListInventoryUpdateResponse(
-                title=product.title,
-                quantity=inventory.quantity
-            )
-        )
+@router.post("/import", response_model=InventoryImportResponse)
+async def import_inventory_endpoint(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    session=Depends(get_session),
+    admin_id: int = Depends(require_role(UserRole.ADMIN))
+):
+    """
+    Importar stock desde el cuerpo del request (CSV con cabecera product_id,quantity[,mode] o NDJSON).
 
-    return responses
\ No newline at end of file
+    El cuerpo se procesa a medida que llega y se aplica por lotes en una sola transacción:
+    si una línea es inválida no se aplica nada.
+    """
+    importer = InventoryImporter(session, format)
+    try:
+        async for line in iter_lines(request.stream()):
+            batch = importer.feed(line)
+            if batch:
+                await run_in_threadpool(importer.apply, batch)
+        return await run_in_threadpool(importer.finish)
+    except BusinessError as be:
+        await run_in_threadpool(session.rollback)
+        raise HTTPException(status_code=400, detail=str(be))
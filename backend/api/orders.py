@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any , Annotated
 
-from db.database import get_session
+from db.database import get_async_session
 from schemas.create_order import (
     CreateOrderRequest ,
     CancelOrderResponse,
@@ -16,7 +16,8 @@ from schemas.create_order import (
     ProductNotFoundError as ProductNotFoundErrorSchema,
     OrderListResponse)
 
-from services.auth_service import verify_token as verify_token_service
+from core.query_stats import query_budget
+from core.auth import get_current_user_id
 from services.orders_service import (
     create_order,
     delete_order_item, 
@@ -31,34 +32,22 @@ from services.orders_service import (
     cancel_order
 )
 from core.config import settings
-from fastapi.security import OAuth2PasswordBearer
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
-
-# dependencia para verificar token y obtener user_id
-def verify_token(token: str = Depends(oauth2_scheme)) -> int:
-    """Verificar token JWT y devolver el user_id"""
-    payload = verify_token_service(token)
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token no contiene user_id",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user_id
 
 router = APIRouter(prefix="/orders", tags=["Orders (Crear Pedido)"])
 
-@router.post("/", response_model=CreateOrderResponse, status_code=status.HTTP_201_CREATED,responses={404: {"model": ProductNotFoundErrorSchema}})
-def create_order_endpoint(
+# Los servicios son síncronos: session.run_sync los ejecuta sobre la conexión asíncrona,
+# así la espera a la base de datos no ocupa un hilo del threadpool.
+
+@router.post("/", response_model=CreateOrderResponse, status_code=status.HTTP_201_CREATED,responses={404: {"model": ProductNotFoundErrorSchema}}, dependencies=[Depends(query_budget(3))])
+async def create_order_endpoint(
     request: CreateOrderRequest,
-    session: Session = Depends(get_session),
-    user_id: int = Depends(verify_token)
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
         items_data = [item.model_dump() for item in request.items]
-        order, items_details = create_order(session, user_id, items_data)
+        order, items_details = await session.run_sync(create_order, user_id, items_data)
         if order.order_id is None:
             raise BusinessError("No se pudo obtener el ID de la orden")
         items_response = [
@@ -95,14 +84,14 @@ def create_order_endpoint(
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
-@router.delete("/{order_id}/cancel", response_model=CancelOrderResponse)
-def cancel_order_endpoint(
+@router.delete("/{order_id}/cancel", response_model=CancelOrderResponse, dependencies=[Depends(query_budget(7))])
+async def cancel_order_endpoint(
     order_id: int,
-    session: Session = Depends(get_session),
-    user_id: int = Depends(verify_token)
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        order= cancel_order(session, order_id)
+        order= await session.run_sync(cancel_order, order_id)
         return CancelOrderResponse(
             order_id=order.order_id, # type: ignore
             status=OrdenStatus(order.status),
@@ -115,14 +104,14 @@ def cancel_order_endpoint(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
 @router.post("/{order_id}/validate", response_model=CreateOrderResponse, 
-             responses={409: {"model": InsufficientStockErrorSchema}})
-def validate_order_endpoint(
+             responses={409: {"model": InsufficientStockErrorSchema}}, dependencies=[Depends(query_budget(8))])
+async def validate_order_endpoint(
     order_id: int,
-    session: Session = Depends(get_session),
-    user_id: int = Depends(verify_token)
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        order, items_details = validate_order(session, order_id)
+        order, items_details = await session.run_sync(validate_order, order_id)
         items_response = [
             OrderItemResponse(
                 order_item_id=item["order_item_id"],
@@ -158,14 +147,14 @@ def validate_order_endpoint(
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
-@router.post("/{order_id}/confirm", response_model=CreateOrderResponse)
-def confirm_order_endpoint(
+@router.post("/{order_id}/confirm", response_model=CreateOrderResponse, dependencies=[Depends(query_budget(8))])
+async def confirm_order_endpoint(
     order_id: int,
-    session: Session = Depends(get_session),
-    user_id: int = Depends(verify_token)
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        order, items_details = confirm_order(session, order_id)
+        order, items_details = await session.run_sync(confirm_order, order_id)
         items_response = [
             OrderItemResponse(
                 order_item_id=item["order_item_id"],
@@ -202,41 +191,42 @@ def confirm_order_endpoint(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.put("/{order_id}/items/{item_id}", response_model=OrderItemResponse)
-def edit_order_item_endpoint(
+async def edit_order_item_endpoint(
     order_id: int,
     item_id: int,
     quantity: EditOrderItemRequest,
-    session: Session = Depends(get_session),
-    user_id: int = Depends(verify_token)
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
         data=quantity.model_dump()
-        order_item_updated = edit_order_item(session, order_id, item_id, data['quantity'])
-        order,items=get_order_details(session, order_id)
+        order_item_updated = await session.run_sync(edit_order_item, order_id, item_id, data['quantity'])
+        order,items=await session.run_sync(get_order_details, order_id)
         item = [it for it in items if it['order_item_id'] == order_item_updated.order_item_id]
         return item[0]
     except BusinessError as be:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(be))
 
 @router.delete("/{order_id}/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_order_item_endpoint(
+async def delete_order_item_endpoint(
     order_id: int,
     item_id: int,
-    session: Session = Depends(get_session),
-    user_id: int = Depends(verify_token)
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
 ):
     try:
-        delete_order_item(session, order_id, item_id)
+        await session.run_sync(delete_order_item, order_id, item_id)
     except BusinessError as be:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(be))
 
-@router.get("/user/{user_id}", response_model=OrderListResponse, tags=["Orders (Listar Pedidos)"])
-def get_user_orders_endpoint(
+@router.get("/user/{user_id}", response_model=OrderListResponse, tags=["Orders (Listar Pedidos)"], dependencies=[Depends(query_budget(2))])
+async def get_user_orders_endpoint(
     user_id: int,
     page: int = 1,
     page_size: int = 10,
-    session: Session = Depends(get_session),
-    current_user_id: int = Depends(verify_token)
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+    current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Listar todos los pedidos del usuario con paginación.
@@ -244,6 +234,7 @@ def get_user_orders_endpoint(
     - **user_id**: ID del usuario para obtener sus pedidos
     - **page**: Número de página (default: 1)
     - **page_size**: Número de pedidos por página (default: 10, max: 50)
+    - **cursor**: Cursor opaco (`next_cursor`/`previous_cursor`) para paginar por cursor en lugar de por página
     """
     # Validar que el usuario solo pueda ver sus propios pedidos (o ser admin)
     if current_user_id != user_id:
@@ -267,8 +258,10 @@ def get_user_orders_endpoint(
         )
     
     try:
-        result = get_user_orders(session, user_id, page, page_size)
+        result = await session.run_sync(get_user_orders, user_id, page, page_size, cursor)
         return OrderListResponse(**result)
+    except BusinessError as be:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(be))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
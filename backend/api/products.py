@@ -1,41 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any , Annotated
-from schemas.products import ProductsResponse
-from db.database import get_session
+from schemas.products import ProductsResponse, ProductSearchResponse, ProductAvailabilityResponse
+from db.database import get_async_session
 
-from services.products_service import get_products
+from services.products_service import get_catalog, search_products, get_availability
+from services import product_cache
+from core.errors import BusinessError
 
 
 from core.config import settings
-from fastapi.security import OAuth2PasswordBearer
-from services.auth_service import verify_token as verify_token_service
-from schemas.products import ProductBase
-
-# Configure OAuth2
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
-
-# Dependencia para verificar token y obtener user_id
-def verify_token(token: str = Depends(oauth2_scheme)) -> int:
-    """Verificar token JWT y devolver el user_id"""
-    payload = verify_token_service(token)
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token no contiene user_id",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user_id
+from core.query_stats import query_budget
+from core.auth import get_current_user_id, require_role
+from models.user import UserRole
+
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
-@router.get("/", response_model=ProductsResponse)
-def get_products_endpoint(
-    session: Session = Depends(get_session),
-    user_id: int = Depends(verify_token)
+@router.get("/", response_model=ProductsResponse, response_model_exclude_unset=True, dependencies=[Depends(query_budget(1))])
+async def get_products_endpoint(
+    page: Annotated[int, Query(ge=1, description="Número de página")] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100, description="Productos por página")] = 10,
+    sort: Annotated[str, Query(description="Orden: product_id, price o publication_year (prefijo '-' para descendente)")] = "product_id",
+    author: Annotated[Optional[str], Query(description="Filtrar por autor")] = None,
+    publisher: Annotated[Optional[str], Query(description="Filtrar por editorial")] = None,
+    publication_year: Annotated[Optional[int], Query(description="Filtrar por año de publicación")] = None,
+    min_price: Annotated[Optional[float], Query(ge=0, description="Precio mínimo")] = None,
+    max_price: Annotated[Optional[float], Query(ge=0, description="Precio máximo")] = None,
+    category_id: Annotated[Optional[int], Query(description="Filtrar por categoría")] = None,
+    fields: Annotated[Optional[str], Query(description="Campos a devolver separados por coma, ej: title,price")] = None,
+    cursor: Annotated[Optional[str], Query(description="Cursor opaco para paginar por cursor")] = None,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
 ):
-    products = get_products(session)
-    compatible_products = [ProductBase.model_validate(p.model_dump()) for p in products]
-    return ProductsResponse(products=compatible_products)
\ No newline at end of file
+    """
+    Listar el catálogo con paginación, filtros, orden y selección de campos.
+
+    Con selección de campos cada producto trae solo product_id y los campos pedidos.
+    """
+    filters = {
+        "author": author,
+        "publisher": publisher,
+        "publication_year": publication_year,
+        "min_price": min_price,
+        "max_price": max_price,
+        "category_id": category_id
+    }
+    try:
+        catalog = await session.run_sync(
+            get_catalog,
+            page=page,
+            page_size=page_size,
+            sort=sort,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            filters=filters,
+            cursor=cursor
+        )
+    except BusinessError as be:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(be))
+    return catalog
+
+@router.get("/search", response_model=ProductSearchResponse, dependencies=[Depends(query_budget(2))])
+async def search_products_endpoint(
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Texto a buscar en título, autor, ISBN o descripción")],
+    page: Annotated[int, Query(ge=1, description="Número de página")] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100, description="Resultados por página")] = 10,
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Buscar libros con índice de texto completo, ordenados por relevancia"""
+    try:
+        results = await session.run_sync(search_products, q, page, page_size)
+    except BusinessError as be:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(be))
+    return results
+
+@router.get("/availability", response_model=ProductAvailabilityResponse, dependencies=[Depends(query_budget(1))])
+async def product_availability_endpoint(
+    ids: Annotated[str, Query(description="IDs de producto separados por coma, ej: 1,2,3")],
+    session: AsyncSession = Depends(get_async_session),
+    user_id: int = Depends(get_current_user_id)
+):
+    """Stock disponible de varios productos en una sola consulta (insignias de "en stock")"""
+    try:
+        product_ids = [int(product_id) for product_id in ids.split(",") if product_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Los IDs de producto deben ser enteros")
+    try:
+        availability = await session.run_sync(get_availability, product_ids)
+    except BusinessError as be:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(be))
+    return availability
+
+@router.get("/cache/stats")
+async def product_cache_stats_endpoint(admin_id: int = Depends(require_role(UserRole.ADMIN))):
+    """Estadísticas de la caché de productos (aciertos, fallos, tamaño)"""
+    return product_cache.stats()
@@ -1,39 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session
-from typing import Annotated
+from typing import Annotated, Optional
 
 from db.database import get_session
 from schemas.create_order import OrderListResponse
-from services.orders_service import get_user_orders, BusinessError
-from services.auth_service import verify_token as verify_token_service
-from fastapi.security import OAuth2PasswordBearer
+from core.errors import BusinessError
+from services.orders_service import get_user_orders
+from core.query_stats import query_budget
+from core.auth import get_current_user_id
 
-# Configure OAuth2
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
-
-# Dependencia para verificar token y obtener user_id
-def verify_token(token: str = Depends(oauth2_scheme)) -> int:
-    """Verificar token JWT y devolver el user_id"""
-    payload = verify_token_service(token)
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token no contiene user_id",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user_id
 
 router = APIRouter(prefix="/users", tags=["Users (Historial de Pedidos)"])
 
 # US-06: Endpoint para listar pedidos del usuario
-@router.get("/{user_id}/orders", response_model=OrderListResponse)
+@router.get("/{user_id}/orders", response_model=OrderListResponse, dependencies=[Depends(query_budget(2))])
 def get_user_orders_endpoint(
     user_id: int,
     page: Annotated[int, Query(ge=1, description="Número de página")] = 1,
     page_size: Annotated[int, Query(ge=1, le=50, description="Pedidos por página")] = 10,
+    cursor: Annotated[Optional[str], Query(description="Cursor opaco para paginar por cursor")] = None,
     session: Session = Depends(get_session),
-    current_user_id: int = Depends(verify_token)
+    current_user_id: int = Depends(get_current_user_id)
 ):
     # Validar que el usuario solo pueda ver sus propios pedidos
     if current_user_id != user_id:
@@ -44,7 +31,7 @@ def get_user_orders_endpoint(
         )
     
     try:
-        result = get_user_orders(session, user_id, page, page_size)
+        result = get_user_orders(session, user_id, page, page_size, cursor)
         return OrderListResponse(**result)
     except BusinessError as be:
         raise HTTPException(
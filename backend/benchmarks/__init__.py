@@ -0,0 +1,8 @@
+"""
+Benchmarks de latencia y consultas SQL por request (ciclo de pedidos, historial, catálogo e inventario).
+
+Uso:
+    python -m benchmarks.run                                   # SQLite temporal
+    python -m benchmarks.run --database postgresql://...       # PostgreSQL local (base descartable)
+    python -m benchmarks.run --save-baseline                   # guardar la línea base
+"""
@@ -0,0 +1,187 @@
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from db.bootstrap import bootstrap
+from db.database import async_database_url, engine_options, get_async_session, get_session
+from db.synthetic import SyntheticScale, load
+from models.inventory import Inventory
+from models.order import Order
+from models.user import User, UserRole
+from services import product_cache, token_cache
+from services.auth_service import create_access_token
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+class StepStats:
+    """Latency and SQL statement samples of one benchmarked request"""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.statements: List[int] = []
+
+    def add(self, latency_ms: float, statements: int) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statements.append(statements)
+
+    def summary(self) -> dict:
+        cuts = statistics.quantiles(self.latencies_ms, n=100, method="inclusive") if len(self.latencies_ms) > 1 else [self.latencies_ms[0]] * 99
+        return {
+            "requests": len(self.latencies_ms),
+            "p50_ms": round(cuts[49], 3),
+            "p95_ms": round(cuts[94], 3),
+            "p99_ms": round(cuts[98], 3),
+            "mean_ms": round(statistics.fmean(self.latencies_ms), 3),
+            "statements": round(statistics.fmean(self.statements), 2),
+            "max_statements": max(self.statements),
+        }
+
+
+class StatementCounter:
+    """Count the SQL statements executed on a set of engines"""
+
+    def __init__(self, engines: List[Engine]):
+        self.count = 0
+        for target in engines:
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+
+
+class BenchmarkEnvironment:
+    """The app served by a TestClient on a benchmark database loaded with synthetic data.
+
+    The database is bootstrapped (migrations and seed) and loaded with `scale` unless
+    load_data is False. The lifespan tasks (bootstrap of the configured database, sweeper) are
+    turned off: only the endpoints are measured.
+    """
+
+    def __init__(self, database_url: str, scale: SyntheticScale, load_data: bool = True):
+        from main import app
+
+        self.app = app
+        self.database_url = database_url
+        self.engine = create_engine(database_url, **engine_options(database_url))
+        async_url = async_database_url(database_url)
+        self.async_engine: AsyncEngine = create_async_engine(async_url, **engine_options(async_url, asynchronous=True))
+        self.counter = StatementCounter([self.engine, self.async_engine.sync_engine])
+        self.stats: Dict[str, StepStats] = {}
+        self.rng = random.Random(scale.seed)
+        if load_data:
+            bootstrap(self.engine)
+            load(self.engine, scale)
+        self._prepare_fixtures()
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    def _prepare_fixtures(self) -> None:
+        """Pick the users and products the scenarios work with"""
+        with Session(self.engine) as session:
+            admin = session.execute(select(User).where(User.role == UserRole.ADMIN).order_by(User.user_id)).scalars().first() # type: ignore
+            user_id = session.execute(
+                select(Order.user_created).group_by(Order.user_created).order_by(Order.user_created).limit(1) # type: ignore
+            ).scalars().first()
+            user = session.get(User, user_id) if user_id else session.execute(
+                select(User).where(User.role == UserRole.USER).order_by(User.user_id) # type: ignore
+            ).scalars().first()
+            self.product_ids = list(session.execute(
+                select(Inventory.product_id).order_by(Inventory.product_id).limit(200) # type: ignore
+            ).scalars())
+            # El ciclo de pedidos consume stock: los productos usados nunca se quedan sin existencias
+            session.execute(update(Inventory).where(Inventory.product_id.in_(self.product_ids)).values(quantity=Inventory.quantity + 1_000_000)) # type: ignore
+            session.commit()
+            self.admin_headers = self._headers(admin)
+            self.user_id = user.user_id
+            self.user_headers = self._headers(user)
+
+    @staticmethod
+    def _headers(user: User) -> dict:
+        token = create_access_token(data={"sub": user.username, "user_id": user.user_id, "role": user.role.value})
+        return {"Authorization": f"Bearer {token}"}
+
+    def __enter__(self) -> "BenchmarkEnvironment":
+        def get_benchmark_session():
+            with Session(self.engine) as session:
+                yield session
+
+        async def get_benchmark_async_session():
+            async with AsyncSession(self.async_engine, expire_on_commit=False) as session:
+                yield session
+
+        self._saved_settings = (settings.DB_BOOTSTRAP_ON_STARTUP, settings.RESERVATION_SWEEPER_ENABLED)
+        settings.DB_BOOTSTRAP_ON_STARTUP = False
+        settings.RESERVATION_SWEEPER_ENABLED = False
+        self.app.dependency_overrides[get_session] = get_benchmark_session
+        self.app.dependency_overrides[get_async_session] = get_benchmark_async_session
+        product_cache.invalidate()
+        token_cache.clear()
+        # Un solo event loop para todos los requests: el pool asíncrono se reutiliza como en producción
+        self.client = TestClient(self.app).__enter__()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.client.__exit__(*exc)
+        self.app.dependency_overrides.clear()
+        settings.DB_BOOTSTRAP_ON_STARTUP, settings.RESERVATION_SWEEPER_ENABLED = self._saved_settings
+        self.engine.dispose()
+
+    def request(self, step: str, method: str, url: str, record: bool = True, **kwargs):
+        """Send one request, recording its latency and SQL statements under `step`"""
+        before = self.counter.count
+        started = time.perf_counter()
+        response = self.client.request(method, url, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            raise RuntimeError(f"{step}: {method} {url} devolvió {response.status_code}: {response.text}")
+        if record:
+            self.stats.setdefault(step, StepStats()).add(elapsed_ms, self.counter.count - before)
+        return response
+
+    def run(self, scenarios: Dict[str, Callable], iterations: int, warmup: int = 5) -> dict:
+        """Run every scenario `warmup` times unrecorded and then `iterations` times"""
+        for scenario in scenarios.values():
+            for _ in range(warmup):
+                scenario(self, False)
+        for scenario in scenarios.values():
+            for _ in range(iterations):
+                scenario(self, True)
+        return {step: self.stats[step].summary() for step in sorted(self.stats)}
+
+
+def baseline_path(dialect: str, directory: Optional[Path] = None) -> Path:
+    return (directory or BASELINES_DIR) / f"{dialect}.json"
+
+def save_baseline(results: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.25) -> List[str]:
+    """Regressions against a baseline: p95 latency above (1 + tolerance) times the baseline,
+    or more SQL statements per request than the baseline (query counts are exact)"""
+    regressions = []
+    for step, current in results.items():
+        previous = baseline.get(step)
+        if previous is None:
+            continue
+        if current["max_statements"] > previous["max_statements"]:
+            regressions.append(
+                f"{step}: {current['max_statements']} sentencias SQL por request (línea base {previous['max_statements']})"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{step}: p95 {current['p95_ms']}ms (línea base {previous['p95_ms']}ms)")
+    return regressions
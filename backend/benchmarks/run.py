@@ -0,0 +1,64 @@
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import BenchmarkEnvironment, baseline_path, compare, save_baseline
+from benchmarks.scenarios import SCENARIOS
+from db.synthetic import SyntheticScale
+
+
+def print_report(results: dict) -> None:
+    header = f"{'request':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'SQL/req':>9}{'SQL max':>9}"
+    print(header)
+    print("-" * len(header))
+    for step, row in results.items():
+        print(f"{step:<26}{row['requests']:>6}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+              f"{row['statements']:>9.1f}{row['max_statements']:>9}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de endpoints: latencia p50/p95/p99 y sentencias SQL por request")
+    parser.add_argument("--database", help="URL de la base de benchmark (por defecto un SQLite temporal). Se modifica: usar una base descartable")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Escenarios a ejecutar (por defecto todos)")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true", help="No cargar datos (la base ya está preparada)")
+    parser.add_argument("--baseline-dir", type=Path, help="Directorio de líneas base (por defecto benchmarks/baselines)")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Aumento de p95 tolerado frente a la línea base")
+    parser.add_argument("--json", type=Path, help="Escribir los resultados en este archivo")
+    args = parser.parse_args(argv)
+
+    scale = SyntheticScale(seed=args.seed, products=args.products, users=args.users, orders=args.orders)
+    scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database or f"sqlite:///{Path(directory) / 'benchmark.db'}"
+        with BenchmarkEnvironment(database_url, scale, load_data=not args.skip_load) as env:
+            results = env.run(scenarios, args.iterations, args.warmup)
+            dialect = env.dialect
+
+    print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    path = baseline_path(dialect, args.baseline_dir)
+    if args.save_baseline:
+        save_baseline(results, path)
+        print(f"Línea base guardada en {path}")
+        return 0
+    if not path.exists():
+        print(f"Sin línea base en {path} (usar --save-baseline)")
+        return 0
+    regressions = compare(results, json.loads(path.read_text()), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESIÓN {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
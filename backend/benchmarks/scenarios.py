@@ -0,0 +1,51 @@
+"""
+Escenarios medidos. Cada uno recibe el entorno y si debe registrar las muestras (calentamiento).
+"""
+from benchmarks.harness import BenchmarkEnvironment
+
+
+def _order_items(env: BenchmarkEnvironment) -> list[dict]:
+    return [{"product_id": product_id, "quantity": 1} for product_id in env.rng.sample(env.product_ids, 2)]
+
+def order_lifecycle(env: BenchmarkEnvironment, record: bool) -> None:
+    """create -> validate -> confirm, and create -> validate -> cancel"""
+    headers = env.user_headers
+    for final_step in ("confirm", "cancel"):
+        response = env.request("orders.create", "POST", "/api/orders/", record, json={"items": _order_items(env)}, headers=headers)
+        order_id = response.json()["order_id"]
+        env.request("orders.validate", "POST", f"/api/orders/{order_id}/validate", record, headers=headers)
+        if final_step == "confirm":
+            env.request("orders.confirm", "POST", f"/api/orders/{order_id}/confirm", record, headers=headers)
+        else:
+            env.request("orders.cancel", "DELETE", f"/api/orders/{order_id}/cancel", record, headers=headers)
+
+def order_history(env: BenchmarkEnvironment, record: bool) -> None:
+    """First page of the user's order history, then the next page by cursor"""
+    url = f"/api/orders/user/{env.user_id}"
+    response = env.request("orders.history", "GET", url, record, params={"page_size": 20}, headers=env.user_headers)
+    cursor = response.json().get("next_cursor")
+    if cursor:
+        env.request("orders.history.cursor", "GET", url, record, params={"page_size": 20, "cursor": cursor}, headers=env.user_headers)
+
+def catalog(env: BenchmarkEnvironment, record: bool) -> None:
+    """A catalog page, then the next page by cursor"""
+    response = env.request("products.catalog", "GET", "/api/products/", record, params={"page_size": 50}, headers=env.user_headers)
+    cursor = response.json().get("next_cursor")
+    if cursor:
+        env.request("products.catalog.cursor", "GET", "/api/products/", record, params={"page_size": 50, "cursor": cursor}, headers=env.user_headers)
+
+def inventory_listing(env: BenchmarkEnvironment, record: bool) -> None:
+    """Admin inventory listing sorted by available stock, then the next page by cursor"""
+    params = {"sort": "-effective", "limit": 100}
+    response = env.request("inventory.list", "GET", "/api/inventory/", record, params=params, headers=env.admin_headers)
+    cursor = response.json().get("next_cursor")
+    if cursor:
+        env.request("inventory.list.cursor", "GET", "/api/inventory/", record, params={**params, "cursor": cursor}, headers=env.admin_headers)
+
+
+SCENARIOS = {
+    "order_lifecycle": order_lifecycle,
+    "order_history": order_history,
+    "catalog": catalog,
+    "inventory": inventory_listing,
+}
@@ -0,0 +1,96 @@
+"""
+Dependencias de autenticación compartidas por todos los routers.
+
+Cada variante paga solo lo que necesita:
+- get_claims / get_current_user_id: solo decodifican el JWT (sin base de datos).
+- require_role: verifica el rol con el claim del token (sin base de datos).
+- require_metrics_access: token de scraping de /metrics, o un administrador.
+- get_current_user: resuelve el usuario completo (caché de tokens, o un SELECT).
+
+El token se decodifica una vez por request y el resultado queda en request.state.
+"""
+import secrets
+from typing import Callable
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import settings
+from db.database import get_async_session
+from models.user import UserRole
+from repositories.user_repository import AsyncUserRepository
+from schemas.auth import UserResponse
+from services import token_cache
+from services.auth_service import verify_token
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+
+async def get_claims(request: Request, token: str = Depends(oauth2_scheme)) -> dict:
+    """Verified JWT claims of the request"""
+    claims = getattr(request.state, "auth_claims", None)
+    if claims is None:
+        claims = verify_token(token)
+        request.state.auth_claims = claims
+    return claims
+
+async def get_current_user_id(claims: dict = Depends(get_claims)) -> int:
+    """user_id claim of the request's token"""
+    user_id = claims.get("user_id")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token no contiene user_id",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+def require_role(*roles: str) -> Callable:
+    """Dependency that only lets through tokens whose role claim is one of `roles`"""
+    allowed = {getattr(role, "value", role) for role in roles}
+
+    async def check_role(claims: dict = Depends(get_claims), user_id: int = Depends(get_current_user_id)) -> int:
+        if claims.get("role") not in allowed:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
+        return user_id
+
+    return check_role
+
+async def require_metrics_access(request: Request, token: str = Depends(oauth2_scheme)) -> None:
+    """Let in the scraper's settings.METRICS_SCRAPE_TOKEN, or else an admin's JWT"""
+    scrape_token = settings.METRICS_SCRAPE_TOKEN
+    if scrape_token and secrets.compare_digest(token.encode(), scrape_token.encode()):
+        return
+    claims = await get_claims(request, token)
+    if claims.get("role") != UserRole.ADMIN.value:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso denegado")
+
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    claims: dict = Depends(get_claims),
+    session: AsyncSession = Depends(get_async_session)
+) -> UserResponse:
+    """Full user of the request's token"""
+    current_user = getattr(request.state, "current_user", None) or token_cache.get_user(token)
+    if current_user is None:
+        user = await AsyncUserRepository(session).get_user_by_username(claims["sub"])
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuario no encontrado"
+            )
+        current_user = UserResponse(
+            user_id=user.user_id, # type: ignore
+            username=user.username,
+            email=user.email,
+            ID=user.ID,
+            name=user.name,
+            last_name=user.last_name,
+            role=user.role.value,
+            is_active=user.is_active,
+            created_at=user.created_at
+        )
+        token_cache.store_user(token, current_user)
+    request.state.current_user = current_user
+    return current_user
@@ -0,0 +1,300 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache whose entries expire after `ttl` seconds.
+
+    Keeps hit/miss/eviction counters so the cache can be monitored.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return the cached values of the keys found (missing or expired keys are left out)"""
+        sentinel = object()
+        found = {}
+        for key in keys:
+            value = self.get(key, sentinel)
+            if value is not sentinel:
+                found[key] = value
+        return found
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def call_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking I/O call without stalling the event loop.
+
+    Sync code under `session.run_sync` (or an AsyncSession commit hook) runs on the loop's
+    thread inside a greenlet: there the call goes to the threadpool and the greenlet awaits it.
+    Anywhere else it is a plain call.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(fn, *args, **kwargs))
+    return fn(*args, **kwargs)
+
+
+class CacheBackend(ABC):
+    """Key/value cache shared by the workers, plus a pub/sub channel for invalidations.
+
+    Values must be JSON serializable. Subscribers receive the published message (a dict).
+    `shared` tells whether other workers see the same keys. get/set/delete are thin
+    wrappers over the batch methods, which are what each backend implements.
+    """
+
+    shared = False
+
+    def get(self, key: str) -> Any:
+        return self.get_many([key]).get(key)
+
+    @abstractmethod
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        ...
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_many({key: value}, ttl)
+
+    @abstractmethod
+    def set_many(self, items: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        self.delete_many([key])
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every key of this backend"""
+        ...
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str, callback: Callable[[dict], None]) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Single-process backend: a TTLCache and in-process delivery of published messages"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._subscribers: Dict[str, List[Callable[[dict], None]]] = {}
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return self.cache.get_many(keys) # type: ignore
+
+    def set_many(self, items: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        for key, value in items.items():
+            self.cache.set(key, value, ttl)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def publish(self, channel: str, message: dict) -> None:
+        for callback in list(self._subscribers.get(channel, [])):
+            callback(message)
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None]) -> None:
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self.cache.stats()}
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend on any Redis-protocol server (Redis, Valkey, KeyDB, fakeredis in tests).
+
+    Keys are namespaced with `prefix`; get/set/delete of many keys are a single MGET,
+    pipeline or DEL. The client is blocking, so every command goes through `call_blocking`.
+    Subscriptions are served by one background thread per backend.
+    """
+
+    shared = True
+
+    def __init__(self, url: Optional[str] = None, client: Any = None, prefix: str = "libco:", default_ttl: float = 60.0):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis requiere el paquete 'redis'") from e
+            client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self._pubsub = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = call_blocking(self.client.mget, [self._key(k) for k in keys])
+        found = {key: json.loads(raw) for key, raw in zip(keys, values) if raw is not None}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Mapping[str, Any], ttl: Optional[float] = None) -> None:
+        if not items:
+            return
+        expire_ms = int((self.default_ttl if ttl is None else ttl) * 1000)
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(self._key(key), json.dumps(value), px=expire_ms)
+        call_blocking(pipeline.execute)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = [self._key(k) for k in keys]
+        if keys:
+            call_blocking(self.client.delete, *keys)
+
+    def clear(self) -> None:
+        call_blocking(self._clear)
+
+    def _clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self._key("*")))
+        if keys:
+            self.client.delete(*keys)
+
+    def publish(self, channel: str, message: dict) -> None:
+        call_blocking(self.client.publish, self._key(channel), json.dumps(message))
+
+    def subscribe(self, channel: str, callback: Callable[[dict], None]) -> None:
+        def handler(raw: dict) -> None:
+            try:
+                callback(json.loads(raw["data"]))
+            except Exception:
+                logger.exception("Error procesando mensaje de invalidación en %s", channel)
+
+        with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self._key(channel): handler})
+            if self._thread is None:
+                self._thread = self._pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                self._thread.stop()
+                self._thread.join(timeout=1)
+                self._thread = None
+            if self._pubsub is not None:
+                self._pubsub.close()
+                self._pubsub = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+def get_cache_backend() -> CacheBackend:
+    """Shared cache backend selected by settings.CACHE_BACKEND ("memory" or "redis")"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if settings.CACHE_BACKEND == "redis":
+                _backend = RedisCacheBackend(url=settings.REDIS_URL, default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS)
+            elif settings.CACHE_BACKEND == "memory":
+                _backend = MemoryCacheBackend(max_size=settings.CACHE_MAX_SIZE, ttl=settings.CACHE_DEFAULT_TTL_SECONDS)
+            else:
+                raise ValueError(f"CACHE_BACKEND desconocido: {settings.CACHE_BACKEND}")
+        return _backend
+
+def set_cache_backend(backend: Optional[CacheBackend]) -> None:
+    """Replace the shared backend (tests, or custom wiring at startup)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
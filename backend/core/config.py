@@ -1,12 +1,61 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     app_name: str = "LibCo - Sistema de gestion de libros"
     ENV: str = "development"
     DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/appdb"
+    # Pool de conexiones y motor SQL (valores seguros para producción)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # Migrar y sembrar al arrancar si la marca de bootstrap no está al día (un SELECT si lo está)
+    DB_BOOTSTRAP_ON_STARTUP: bool = True
+    # Sentencias SQL por request (cabecera Server-Timing y log "sql"); el modo estricto hace
+    # fallar los requests que superan su query_budget (pensado para los tests)
+    SQL_STATS_ENABLED: bool = True
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5
+    SQL_QUERY_BUDGET_STRICT: bool = False
+    # /metrics: con varios workers, directorio compartido donde cada worker deja su snapshot
+    METRICS_DIR: Optional[str] = None
+    METRICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    METRICS_STALE_SECONDS: float = 60.0
+    # Token fijo para el scraper de Prometheus (Authorization: Bearer ...); sin él solo entra un admin
+    METRICS_SCRAPE_TOKEN: Optional[str] = None
     JWT_SECRET: str = "change_me"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Hilos dedicados a bcrypt y máximo de hashes en cola o en curso (el resto recibe 503)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 256
+    # Caché de tokens verificados (claims y usuario resuelto hasta el exp del token)
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Líneas de inventario por lote en los ajustes masivos (todo en una sola transacción)
+    INVENTORY_ADJUST_BATCH_SIZE: int = 5000
+    INVENTORY_RECONCILE_BATCH_SIZE: int = 5000
+    INVENTORY_RECONCILE_INTERVAL_SECONDS: float = 300.0
+    # Vencimiento de reservas: órdenes en 'check' sin confirmar pasan a 'expired' y liberan el stock
+    RESERVATION_TTL_MINUTES: int = 30
+    RESERVATION_SWEEPER_ENABLED: bool = True
+    RESERVATION_SWEEP_INTERVAL_SECONDS: float = 60.0
+    RESERVATION_SWEEP_BATCH_SIZE: int = 500
+
+    # Caché compartida entre workers: "memory" (un solo proceso) o "redis"
+    CACHE_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_SIZE: int = 10000
+    CACHE_DEFAULT_TTL_SECONDS: float = 60.0
+
+    # Caché en memoria de productos (título y precio) para el flujo de pedidos
+    PRODUCT_CACHE_ENABLED: bool = True
+    PRODUCT_CACHE_MAX_SIZE: int = 10000
+    PRODUCT_CACHE_TTL_SECONDS: float = 60.0
+    AVAILABILITY_MAX_PRODUCTS: int = 100
 
     CORS_ORIGINS:list[str]=[
         "http://localhost",
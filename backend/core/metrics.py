@@ -0,0 +1,329 @@
+"""
+Métricas en formato de texto de Prometheus, agregadas en proceso.
+
+Cada métrica guarda sus valores en un diccionario por etiquetas, protegido por un lock, y
+observar un valor cuesta un bisect y una suma. Los valores que ya viven en otros módulos (pool
+de conexiones, cachés) se leen con collectors en el momento de exportar.
+
+Con varios workers se define METRICS_DIR: cada worker escribe su snapshot en un archivo
+(periódicamente y en cada exportación) y /metrics suma los archivos de todos los workers.
+Los archivos sin actualizar durante METRICS_STALE_SECONDS (workers terminados) se ignoran.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Snapshot: {name: {"type", "help", "labels", "aggregate", "buckets"?, "samples": [[label_values, value]]}}
+Snapshot = Dict[str, dict]
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), aggregate: str = "sum"):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        # Cómo se combinan los valores de varios workers: "sum" o "max"
+        self.aggregate = aggregate
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(key), self._copy(value)] for key, value in self._values.items()]
+        return {"type": self.type, "help": self.help, "labels": list(self.labels), "aggregate": self.aggregate, "samples": samples}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount # type: ignore
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount # type: ignore
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Conteos por bucket (no acumulados, el último es +Inf), suma y total
+                entry = self._values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            entry["counts"][index] += 1 # type: ignore
+            entry["sum"] += value # type: ignore
+            entry["count"] += 1 # type: ignore
+
+    @staticmethod
+    def _copy(value):
+        return {"counts": list(value["counts"]), "sum": value["sum"], "count": value["count"]}
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+Collector = Callable[[], Iterable[Tuple[str, str, str, Dict[str, object], float]]]
+
+
+class MetricsRegistry:
+    """Metrics of this process, plus collectors yielding (name, type, help, labels, value) at export time"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels)) # type: ignore
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), aggregate: str = "sum") -> Gauge:
+        return self._register(Gauge(name, help, labels, aggregate)) # type: ignore
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets)) # type: ignore
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Snapshot:
+        snapshot = {name: metric.snapshot() for name, metric in self._metrics.items()}
+        for collector in self._collectors:
+            try:
+                collected = list(collector())
+            except Exception:
+                logger.exception("Error leyendo métricas de %s", getattr(collector, "__name__", collector))
+                continue
+            for name, type_, help, labels, value in collected:
+                family = snapshot.setdefault(name, {
+                    "type": type_, "help": help, "labels": list(labels),
+                    "aggregate": "max" if name.endswith("_max") else "sum", "samples": []
+                })
+                family["samples"].append([[str(v) for v in labels.values()], value])
+        return snapshot
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+def merge(snapshots: Iterable[Snapshot]) -> Snapshot:
+    """Combine the snapshots of several workers sample by sample"""
+    merged: Snapshot = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {**family, "samples": []})
+            values = {tuple(key): value for key, value in target["samples"]}
+            for key, value in family["samples"]:
+                key = tuple(key)
+                current = values.get(key)
+                if current is None:
+                    values[key] = value
+                elif family["type"] == "histogram":
+                    values[key] = {
+                        "counts": [a + b for a, b in zip(current["counts"], value["counts"])],
+                        "sum": current["sum"] + value["sum"],
+                        "count": current["count"] + value["count"],
+                    }
+                elif family.get("aggregate") == "max":
+                    values[key] = max(current, value)
+                else:
+                    values[key] = current + value
+            target["samples"] = [[list(key), value] for key, value in values.items()]
+    return merged
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render(snapshot: Snapshot) -> str:
+    """Prometheus text exposition format"""
+    lines: List[str] = []
+    for name in sorted(snapshot):
+        family = snapshot[name]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for values, value in sorted(family["samples"]):
+            if family["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip([*family["buckets"], "+Inf"], value["counts"]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _number(float(bound))
+                    lines.append(f"{name}_bucket{_labels(family['labels'], values, ('le', le))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(family['labels'], values)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_labels(family['labels'], values)} {value['count']}")
+            else:
+                lines.append(f"{name}{_labels(family['labels'], values)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+def with_hit_ratios(snapshot: Snapshot) -> Snapshot:
+    """Add cache_hit_ratio from the (already merged) cache_hits_total and cache_misses_total"""
+    hits = {tuple(k): v for k, v in snapshot.get("cache_hits_total", {}).get("samples", [])}
+    misses = {tuple(k): v for k, v in snapshot.get("cache_misses_total", {}).get("samples", [])}
+    if hits or misses:
+        snapshot["cache_hit_ratio"] = {
+            "type": "gauge", "help": "Fracción de lecturas de caché servidas desde la caché",
+            "labels": ["cache"], "aggregate": "max",
+            "samples": [
+                [list(key), round(hits.get(key, 0) / total, 4) if (total := hits.get(key, 0) + misses.get(key, 0)) else 0.0]
+                for key in sorted(set(hits) | set(misses))
+            ],
+        }
+    return snapshot
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Latencia de los requests HTTP por ruta y estado", ["method", "route", "status"]
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "Requests HTTP en curso")
+order_transitions = registry.counter(
+    "order_transitions_total", "Cambios de estado de las órdenes", ["from_status", "to_status"]
+)
+reservation_failures = registry.counter(
+    "reservation_failures_total", "Reservas de stock fallidas por motivo", ["reason"]
+)
+
+
+def _worker_file(directory: str) -> Path:
+    return Path(directory) / f"worker-{os.getpid()}.json"
+
+def write_worker_snapshot(directory: str) -> None:
+    """Write this worker's snapshot atomically (the exporter never reads a partial file)"""
+    path = _worker_file(directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(registry.snapshot()))
+    os.replace(temporary, path)
+
+def remove_worker_snapshot(directory: str) -> None:
+    try:
+        _worker_file(directory).unlink()
+    except FileNotFoundError:
+        pass
+
+def collect(directory: Optional[str] = None) -> Snapshot:
+    """This process's metrics, or the merge of every live worker's file when a directory is set"""
+    if not directory:
+        return registry.snapshot()
+    write_worker_snapshot(directory)
+    cutoff = time.time() - settings.METRICS_STALE_SECONDS
+    snapshots = []
+    for path in Path(directory).glob("worker-*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                continue
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Archivo de un worker que terminó durante la lectura
+            continue
+    return merge(snapshots)
+
+def export(directory: Optional[str] = None) -> str:
+    return render(with_hit_ratios(collect(directory)))
+
+async def run_flusher(directory: str, stop: asyncio.Event) -> None:
+    """Write this worker's snapshot every METRICS_FLUSH_INTERVAL_SECONDS until `stop` is set"""
+    while not stop.is_set():
+        try:
+            write_worker_snapshot(directory)
+        except OSError:
+            logger.exception("No se pudieron escribir las métricas en %s", directory)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.METRICS_FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+    remove_worker_snapshot(directory)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request by route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # La plantilla de la ruta (no el path) mantiene acotada la cantidad de series
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            http_request_duration.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=status_code
+            )
@@ -0,0 +1,73 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from core.errors import BusinessError
+
+NEXT = "next"
+PREVIOUS = "prev"
+
+def encode_cursor(key: Sequence[Any], direction: str = NEXT) -> str:
+    """Encode a keyset position into an opaque, URL-safe cursor"""
+    payload = json.dumps(
+        {"k": [v.isoformat() if isinstance(v, datetime) else v for v in key], "d": direction},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[list, str]:
+    """Decode a cursor produced by encode_cursor, returns (key, direction).
+
+    Raises ValueError when the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, direction = payload["k"], payload["d"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(key, list) or direction not in (NEXT, PREVIOUS):
+        raise ValueError("Cursor inválido")
+    return key, direction
+
+def decode_position(
+    cursor: str,
+    sort: Optional[str] = None,
+    parse_value: Optional[Callable[[Any], Any]] = None
+) -> Tuple[Tuple[Any, int], bool]:
+    """Decode a keyset cursor into ((sort value, id), backwards).
+
+    Cursors made for a sort order carry it first ([sort, value, id]) and must match `sort`.
+    Raises BusinessError when the cursor is malformed or belongs to another order.
+    """
+    try:
+        key, direction = decode_cursor(cursor)
+        cursor_sort = key.pop(0) if sort is not None else None
+        value, row_id = key
+        position = (parse_value(value) if parse_value else value, int(row_id))
+    except (ValueError, TypeError, IndexError):
+        raise BusinessError("Cursor de paginación inválido")
+    if cursor_sort != sort:
+        raise BusinessError("El cursor no corresponde al orden solicitado")
+    return position, direction == PREVIOUS
+
+def trim_keyset_page(rows: List[Any], limit: int, backwards: bool, from_cursor: bool = True) -> Tuple[List[Any], bool, bool]:
+    """Trim a keyset page fetched with limit + 1 rows, returns (rows, has_next, has_previous)"""
+    has_more = len(rows) > limit
+    if has_more:
+        rows = rows[1:] if backwards else rows[:limit]
+    has_next = True if backwards else has_more
+    has_previous = has_more if backwards else from_cursor
+    return rows, has_next, has_previous
+
+def page_cursors(
+    rows: List[Any],
+    has_next: bool,
+    has_previous: bool,
+    key: Callable[[Any], Sequence[Any]]
+) -> Tuple[Optional[str], Optional[str]]:
+    """Cursors of the pages after the last row and before the first one, returns (next, previous)"""
+    next_cursor = encode_cursor(key(rows[-1])) if has_next and rows else None
+    previous_cursor = encode_cursor(key(rows[0]), PREVIOUS) if has_previous and rows else None
+    return next_cursor, previous_cursor
@@ -0,0 +1,147 @@
+"""
+Sentencias SQL por request: cantidad, tiempo en base de datos y sentencias repetidas (N+1).
+
+Los hooks de SQLAlchemy se registran sobre todos los engines y anotan en las estadísticas del
+request en curso (una ContextVar que el middleware abre por request). Fuera de un request no
+cuestan más que leer la ContextVar.
+
+Cada respuesta lleva una cabecera Server-Timing (db y app) y se registra una línea JSON en el
+logger "sql": en DEBUG normalmente, en WARNING si una misma sentencia se repite
+SQL_REPEATED_STATEMENT_THRESHOLD veces o más, o si se supera el presupuesto de consultas
+declarado con query_budget(). Con SQL_QUERY_BUDGET_STRICT (tests) superar el presupuesto
+lanza QueryBudgetExceeded.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import settings
+
+logger = logging.getLogger("sql")
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LISTS = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|\$\d+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, route: str, count: int, budget: int):
+        self.route = route
+        self.count = count
+        self.budget = budget
+        super().__init__(f"{route} ejecutó {count} sentencias SQL (presupuesto: {budget})")
+
+
+class RequestQueryStats:
+    """SQL statements executed while serving one request"""
+
+    __slots__ = ("count", "duration", "fingerprints", "budget", "started")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter = Counter()
+        self.budget: Optional[int] = None
+        self.started = time.perf_counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints executed at least `threshold` times, most repeated first"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Statement shape: literals and expanded IN lists replaced, whitespace collapsed"""
+    normalized = _LITERALS.sub("?", statement)
+    normalized = _PARAMETER_LISTS.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+def query_budget(max_statements: int) -> Callable:
+    """Route dependency declaring how many SQL statements the endpoint may execute per request"""
+    async def declare_budget() -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = max_statements
+
+    return declare_budget
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware opening the per-request SQL statistics (no response buffering)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - stats.started) * 1000
+                timing = f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", app;dur={elapsed_ms:.2f}'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._report(scope, stats, status_code)
+
+    @staticmethod
+    def _report(scope, stats: RequestQueryStats, status_code: int) -> None:
+        route = getattr(scope.get("route"), "path", scope["path"])
+        repeated = stats.repeated(settings.SQL_REPEATED_STATEMENT_THRESHOLD)
+        over_budget = stats.budget is not None and stats.count > stats.budget
+        level = logging.WARNING if repeated or over_budget else logging.DEBUG
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                "event": "sql_stats",
+                "method": scope["method"],
+                "route": route,
+                "status": status_code,
+                "queries": stats.count,
+                "db_ms": round(stats.duration * 1000, 3),
+                "total_ms": round((time.perf_counter() - stats.started) * 1000, 3),
+                "budget": stats.budget,
+                "repeated": [{"count": count, "sql": sql[:500]} for sql, count in repeated],
+            }, ensure_ascii=False))
+        if over_budget and settings.SQL_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(f"{scope['method']} {route}", stats.count, stats.budget) # type: ignore
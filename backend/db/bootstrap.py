@@ -0,0 +1,131 @@
+"""
+Preparación de la base de datos al arrancar: migraciones y datos iniciales.
+
+Una sola fila (bootstrap_state) guarda la revisión de Alembic y la versión de los datos
+sembrados. Si coinciden con las del código, el arranque cuesta un SELECT; si no, el primer
+proceso que toma el advisory lock migra y siembra, y los demás esperan y encuentran la marca
+al día. En PostgreSQL el esquema lo crea Alembic; en otras bases (desarrollo local) create_all.
+
+Uso (antes de levantar los workers):
+    python -m db.bootstrap
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, exc, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+
+from db.seed import SEED_VERSION, seed_database
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Clave del advisory lock de PostgreSQL que serializa el bootstrap entre procesos ("LIBCO")
+BOOTSTRAP_LOCK_KEY = 0x4C4942434F
+
+bootstrap_metadata = MetaData()
+bootstrap_state = Table(
+    "bootstrap_state",
+    bootstrap_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("schema_revision", String(64), nullable=False),
+    Column("seed_version", Integer, nullable=False),
+    Column("updated_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    # Al migrar dentro de la aplicación no se reconfigura el logging
+    config.attributes["configure_logger"] = False
+    return config
+
+@lru_cache(maxsize=None)
+def schema_head() -> str:
+    """Alembic head revision of the code"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head() or "base"
+
+def expected_marker() -> tuple[str, int]:
+    return schema_head(), SEED_VERSION
+
+def read_marker(connection: Connection) -> Optional[tuple[str, int]]:
+    """Bootstrap marker stored in the database, None before the first bootstrap"""
+    try:
+        row = connection.execute(
+            select(bootstrap_state.c.schema_revision, bootstrap_state.c.seed_version).where(bootstrap_state.c.id == 1)
+        ).first()
+    except (exc.ProgrammingError, exc.OperationalError):
+        # La tabla aún no existe
+        connection.rollback()
+        return None
+    connection.rollback()
+    return (row[0], row[1]) if row else None
+
+def write_marker(connection: Connection, marker: tuple[str, int]) -> None:
+    bootstrap_metadata.create_all(connection)
+    connection.execute(bootstrap_state.delete())
+    connection.execute(bootstrap_state.insert().values(
+        id=1, schema_revision=marker[0], seed_version=marker[1], updated_at=datetime.now(timezone.utc)
+    ))
+
+def migrate(engine: Engine) -> None:
+    """Bring the schema to the head revision (Alembic on PostgreSQL, create_all elsewhere)"""
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            config = alembic_config()
+            config.attributes["connection"] = connection
+            command.upgrade(config, "head")
+    else:
+        from db.database import create_db_and_tables
+        create_db_and_tables(engine)
+
+def bootstrap(engine: Engine) -> bool:
+    """Migrate and seed the database unless the marker says it is already up to date.
+
+    Returns True when this call did the work. Safe to call from every worker: only one
+    process at a time gets past the advisory lock, and it re-checks the marker first.
+    """
+    expected = expected_marker()
+    with engine.connect() as connection:
+        if read_marker(connection) == expected:
+            return False
+        postgresql = engine.dialect.name == "postgresql"
+        if postgresql:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+            connection.commit()
+        try:
+            current = read_marker(connection)
+            if current == expected:
+                return False
+            started = time.perf_counter()
+            if current is None or current[0] != expected[0]:
+                migrate(engine)
+            with Session(engine) as session:
+                seed_database(session)
+            with engine.begin() as marker_connection:
+                write_marker(marker_connection, expected)
+            logger.info(
+                "Base de datos preparada (revisión %s, semilla %s) en %.2fs",
+                expected[0], expected[1], time.perf_counter() - started
+            )
+            return True
+        finally:
+            if postgresql:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+                connection.commit()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    from db.database import engine
+    if not bootstrap(engine):
+        print("La base de datos ya está al día")
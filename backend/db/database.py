@@ -1,4 +1,11 @@
+import threading
+import time
+from functools import lru_cache
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from core.config import settings
 
 from models.user import User
@@ -6,20 +13,153 @@ from models.order import Order
 from models.audit_log import AuditLog
 from models.product import Product
 from models.order_item import OrderItem
+import db.search  # noqa: F401  registra los índices de búsqueda de product
+
+
+class PoolMetrics:
+    """Counters of the connection pool: checkouts, new connections, waits and timeouts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _MeteredPool:
+    """Pool mixin that measures how long each checkout waits for a free connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out)
+
+
+class MeteredQueuePool(_MeteredPool, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(database_url: str, asynchronous: bool = False) -> dict:
+    """create_engine keyword arguments for the configured pool, echo and statement timeout"""
+    options: dict = {"echo": settings.DB_ECHO, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if database_url.startswith("sqlite"):
+        # SQLite usa su propio pool (un archivo local no necesita dimensionarse)
+        return options
+    options.update(
+        poolclass=MeteredAsyncQueuePool if asynchronous else MeteredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if database_url.startswith("postgresql") and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        if asynchronous:
+            # asyncpg no acepta "options": los parámetros de sesión van en server_settings
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def async_database_url(database_url: str) -> str:
+    """Same database, through its asyncio driver (asyncpg for PostgreSQL, aiosqlite for SQLite)"""
+    scheme, _, rest = database_url.partition("://")
+    dialect = scheme.split("+")[0]
+    drivers = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    if dialect not in drivers:
+        raise ValueError(f"No hay driver asíncrono configurado para {dialect}")
+    return f"{drivers[dialect]}://{rest}"
+
+def instrument_pool(target_engine) -> None:
+    """Count checkouts, checkins and new connections of an engine's pool"""
+    @event.listens_for(target_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.checkouts += 1
+
+    @event.listens_for(target_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_metrics.checkins += 1
+
+    @event.listens_for(target_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_metrics.connects += 1
 
 # Create engine
-engine = create_engine(settings.DATABASE_URL, echo=True)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+instrument_pool(engine)
+
+def get_pool_stats() -> dict:
+    """Current pool usage plus the accumulated pool metrics"""
+    pool = engine.pool
+    stats = {"pool": pool.__class__.__name__, **pool_metrics.snapshot()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    return stats
 
-def create_db_and_tables():
-    """Create database tables"""
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """Async engine on the same database, created on first use"""
+    url = async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(url, **engine_options(url, asynchronous=True))
+    instrument_pool(async_engine.sync_engine)
+    return async_engine
+
+def create_db_and_tables(target_engine=None):
+    """Create database tables (development databases without migrations)"""
     User.model_rebuild()
     Order.model_rebuild()
     AuditLog.model_rebuild()
     Product.model_rebuild()
     OrderItem.model_rebuild()
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(target_engine or engine)
 
 def get_session():
     """Get database session dependency for FastAPI"""
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_async_session():
+    """Get async database session dependency for FastAPI.
+
+    Objects are not expired on commit: after the commit the response is built from them
+    outside the session, where lazy loads are not possible.
+    """
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,55 @@
+"""
+Índices de búsqueda de texto completo sobre el catálogo de libros.
+
+PostgreSQL: índice GIN sobre un tsvector (title, author, isbn, description) más índices
+de trigramas (pg_trgm) para coincidencias parciales de título e ISBN.
+SQLite (tests / desarrollo): tabla virtual FTS5 sincronizada con triggers.
+
+Los DDL se registran sobre la tabla product, así que create_all los crea junto con ella;
+en PostgreSQL también los crea la migración correspondiente.
+"""
+from sqlalchemy import DDL, event
+
+from models.product import Product
+
+# Debe coincidir exactamente con la expresión del índice para que PostgreSQL lo use
+PG_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '') || ' ' || "
+    "coalesce(isbn, '') || ' ' || coalesce(description, ''))"
+)
+
+PG_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_product_search_vector ON product USING gin ({PG_SEARCH_VECTOR})",
+    "CREATE INDEX IF NOT EXISTS ix_product_title_trgm ON product USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_product_isbn_trgm ON product USING gin (isbn gin_trgm_ops)",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5("
+    "title, author, isbn, description, content='product', content_rowid='product_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN "
+    "INSERT INTO product_fts(rowid, title, author, isbn, description) "
+    "VALUES (new.product_id, new.title, new.author, new.isbn, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN "
+    "INSERT INTO product_fts(product_fts, rowid, title, author, isbn, description) "
+    "VALUES ('delete', old.product_id, old.title, old.author, old.isbn, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS product_fts_au AFTER UPDATE ON product BEGIN "
+    "INSERT INTO product_fts(product_fts, rowid, title, author, isbn, description) "
+    "VALUES ('delete', old.product_id, old.title, old.author, old.isbn, old.description); "
+    "INSERT INTO product_fts(rowid, title, author, isbn, description) "
+    "VALUES (new.product_id, new.title, new.author, new.isbn, new.description); END",
+]
+
+for statement in PG_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Product.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def fts5_match_expression(query: str) -> str:
+    """Build a safe FTS5 MATCH expression: every word must match as a prefix"""
+    terms = ['"' + term.replace('"', '""') + '"*' for term in query.split()]
+    return " ".join(terms)
@@ -1,267 +1,242 @@
-from .database import get_session
-from sqlmodel import select
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session
 from models.user import User, UserRole
 from models.product import Product
 from models.inventory import Inventory
 from models.category import Category, CategoryProductLink
-import hashlib
-from datetime import datetime, timezone
 
-from passlib.context import CryptContext
+# Cambiar al modificar los datos de abajo: el bootstrap vuelve a sembrar solo cuando cambia
+SEED_VERSION = 1
 
-# Usar la misma configuración que en auth_service.py
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes bcrypt precalculados de "admin123" y "usuario123" (sembrar no cuesta ningún hash)
+ADMIN_PASSWORD_HASH = "$2b$12$xdq3pCQnKFi0c7dRbA/HsepkUrCAk571hDVcG9KqIt4piJ3tf1nCS"
+USER_PASSWORD_HASH = "$2b$12$TmMu3k2QNXgH1JOWovCXfelqJZm5KIwI/ouRKx/WFW958MYGmQZam"
 
-def hash_password(password: str) -> str:
-    """Hash a password using the same method as in auth_service"""
-    return pwd_context.hash(password)
+CATEGORIES = [
+    {"category_id": 1, "name": "Filosofía", "description": "Libros de filosofía"},
+    {"category_id": 2, "name": "Ciencias de la Computación", "description": "Libros de ciencias de la computación"},
+    {"category_id": 3, "name": "Novela", "description": "Novelas literarias"},
+    {"category_id": 4, "name": "Matemáticas", "description": "Libros de matemáticas"}
+]
 
-def seed_database():
-    """Seed the database with initial data"""
-    session = next(get_session())
-    
-    # Seed categories
-    categories = [
-        {"category_id": 1, "name": "Filosofía", "description": "Libros de filosofía"},
-        {"category_id": 2, "name": "Ciencias de la Computación", "description": "Libros de ciencias de la computación"},
-        {"category_id": 3, "name": "Novela", "description": "Novelas literarias"},
-        {"category_id": 4, "name": "Matemáticas", "description": "Libros de matemáticas"}
-    ]
-    
-    for cat_data in categories:
-        if not session.exec(select(Category).filter(Category.name == cat_data["name"])).first():
-            category = Category(**cat_data)
-            session.add(category)
-    
-    session.commit()
-    
-    # Crear usuarios de prueba
-    users = [
-        {
-            "username": "admin",
-            "email": "admin@libco.com",
-            "ID": 1001,
-            "name": "Admin",
-            "last_name": "User",
-            "password_hash": hash_password("admin123"),
-            "role": UserRole.ADMIN,
-            "is_active": True
-        },
-        {
-            "username": "usuario1",
-            "email": "usuario1@example.com",
-            "ID": 1002,
-            "name": "Juan",
-            "last_name": "Pérez",
-            "password_hash": hash_password("usuario123"),
-            "role": UserRole.USER,
-            "is_active": True
-        },
-        {
-            "username": "usuario2",
-            "email": "usuario2@example.com",
-            "ID": 1003,
-            "name": "María",
-            "last_name": "González",
-            "password_hash": hash_password("usuario123"),
-            "role": UserRole.USER,
-            "is_active": True
-        },
-        {
-            "username": "usuario3",
-            "email": "usuario3@example.com",
-            "ID": 1004,
-            "name": "Carlos",
-            "last_name": "Rodríguez",
-            "password_hash": hash_password("usuario123"),
-            "role": UserRole.USER,
-            "is_active": True
-        }
-    ]
-    
-    for user_data in users:
-        if not session.exec(select(User).filter(User.username == user_data["username"])).first():
-            user = User(**user_data)
-            session.add(user)
-    
-    session.commit()
-    
-    # Seed products (books)
-    products = [
-        # Libros de Filosofía
-        {
-            "product_id": 1,
-            "sku": "FIL-001",
-            "title": "El mundo de Sofía",
-            "author": "Jostein Gaarder",
-            "isbn": "9788478448500",
-            "format": "paperback",
-            "edition": "1st",
-            "description": "Novela sobre la historia de la filosofía",
-            "language": "es",
-            "publisher": "Siruela",
-            "publication_year": 1991,
-            "price": 75000.0,
-            "pages": 638,
-            "currency": "COP",
-            "weight": 0.7,
-            "dimensions": "15x23x3",
-            "front_page_url": "https://www.tornamesa.co/imagenes/9788498/978849841170.GIF"
-        },
-        {
-            "product_id": 2,
-            "sku": "FIL-002",
-            "title": "Ética a Nicómaco",
-            "author": "Aristóteles",
-            "isbn": "9788430943425",
-            "format": "hardcover",
-            "edition": "3rd",
-            "description": "Obra clásica sobre ética y moral",
-            "language": "es",
-            "publisher": "Gredos",
-            "publication_year": 1985,
-            "price": 65000.0,
-            "pages": 320,
-            "currency": "COP",
-            "weight": 0.5,
-            "dimensions": "13x21x2",
-            "front_page_url": "https://m.media-amazon.com/images/I/4189G-gaGEL._SY445_SX342_QL70_ML2_.jpg"
-        },
-        {
-            "product_id": 3,
-            "sku": "FIL-003",
-            "title": "Así habló Zaratustra",
-            "author": "Friedrich Nietzsche",
-            "isbn": "9788420637204",
-            "format": "paperback",
-            "edition": "2nd",
-            "description": "Obra filosófica que introduce el concepto del superhombre",
-            "language": "es",
-            "publisher": "Alianza Editorial",
-            "publication_year": 1972,
-            "price": 68000.0,
-            "pages": 384,
-            "currency": "COP",
-            "weight": 0.6,
-            "dimensions": "14x22x2.5",
-            "front_page_url": "https://pictures.abebooks.com/inventory/md/md31403665059.jpg"
-        },
-        
-        # Libros de Ciencias de la Computación
-        {
-            "product_id": 4,
-            "sku": "COMP-001",
-            "title": "Clean Code",
-            "author": "Robert C. Martin",
-            "isbn": "9780132350884",
-            "format": "paperback",
-            "edition": "1st",
-            "description": "Guía para escribir código limpio y mantenible",
-            "language": "en",
-            "publisher": "Prentice Hall",
-            "publication_year": 2008,
-            "price": 120000.0,
-            "pages": 464,
-            "currency": "COP",
-            "weight": 0.8,
-            "dimensions": "17x23x3",
-            "front_page_url": "https://images.cdn1.buscalibre.com/fit-in/360x360/87/da/87da3d378f0336fd04014c4ea153d064.jpg"
-        },
-        {
-            "product_id": 5,
-            "sku": "COMP-002",
-            "title": "Introduction to Algorithms",
-            "author": "Thomas H. Cormen",
-            "isbn": "9780262033848",
-            "format": "hardcover",
-            "edition": "3rd",
-            "description": "El libro de referencia sobre algoritmos",
-            "language": "en",
-            "publisher": "MIT Press",
-            "publication_year": 2009,
-            "price": 160000.0,
-            "pages": 1312,
-            "currency": "COP",
-            "weight": 2.5,
-            "dimensions": "20x25x5",
-            "front_page_url": "https://images.cdn1.buscalibre.com/fit-in/360x360/ce/4d/ce4daab00e405bca345cfbbf20b5c8df.jpg"
-        },
-        {
-            "product_id": 6,
-            "sku": "COMP-003",
-            "title": "Design Patterns",
-            "author": "Erich Gamma",
-            "isbn": "9780201633610",
-            "format": "hardcover",
-            "edition": "1st",
-            "description": "Elementos reusables de software orientado a objetos",
-            "language": "en",
-            "publisher": "Addison-Wesley",
-            "publication_year": 1994,
-            "price": 135000.0,
-            "pages": 416,
-            "currency": "COP",
-            "weight": 0.9,
-            "dimensions": "18x24x3",
-            "front_page_url": "https://imagessl8.casadellibro.com/a/l/s7/98/9788478290598.webp"
-        }
-    ]
-    
-    for product_data in products:
-        if not session.exec(select(Product).filter(Product.sku == product_data["sku"])).first():
-            product = Product(**product_data)
-            session.add(product)
-    
-    session.commit()
-    
-    # Asignar categorías a los productos
-    product_categories = [
-        {"product_id": 1, "category_id": 1},  # El mundo de Sofía - Filosofía
-        {"product_id": 2, "category_id": 1},  # Ética a Nicómaco - Filosofía
-        {"product_id": 3, "category_id": 1},  # Así habló Zaratustra - Filosofía
-        {"product_id": 4, "category_id": 2},  # Clean Code - Ciencias de la Computación
-        {"product_id": 5, "category_id": 2},  # Introduction to Algorithms - Ciencias de la Computación
-        {"product_id": 5, "category_id": 4},  # Introduction to Algorithms - Matemáticas (categoría múltiple)
-        {"product_id": 6, "category_id": 2}   # Design Patterns - Ciencias de la Computación
-    ]
-    
-    for link_data in product_categories:
-        # Using SQLModel's filter directly without and_
-        if not session.exec(
-            select(CategoryProductLink).where(
-                (CategoryProductLink.product_id == link_data["product_id"]) & 
-                (CategoryProductLink.category_id == link_data["category_id"])
+USERS = [
+    {
+        "username": "admin",
+        "email": "admin@libco.com",
+        "ID": 1001,
+        "name": "Admin",
+        "last_name": "User",
+        "password_hash": ADMIN_PASSWORD_HASH,
+        "role": UserRole.ADMIN,
+        "is_active": True
+    },
+    {
+        "username": "usuario1",
+        "email": "usuario1@example.com",
+        "ID": 1002,
+        "name": "Juan",
+        "last_name": "Pérez",
+        "password_hash": USER_PASSWORD_HASH,
+        "role": UserRole.USER,
+        "is_active": True
+    },
+    {
+        "username": "usuario2",
+        "email": "usuario2@example.com",
+        "ID": 1003,
+        "name": "María",
+        "last_name": "González",
+        "password_hash": USER_PASSWORD_HASH,
+        "role": UserRole.USER,
+        "is_active": True
+    },
+    {
+        "username": "usuario3",
+        "email": "usuario3@example.com",
+        "ID": 1004,
+        "name": "Carlos",
+        "last_name": "Rodríguez",
+        "password_hash": USER_PASSWORD_HASH,
+        "role": UserRole.USER,
+        "is_active": True
+    }
+]
+
+PRODUCTS = [
+    # Libros de Filosofía
+    {
+        "product_id": 1,
+        "sku": "FIL-001",
+        "title": "El mundo de Sofía",
+        "author": "Jostein Gaarder",
+        "isbn": "9788478448500",
+        "format": "paperback",
+        "edition": "1st",
+        "description": "Novela sobre la historia de la filosofía",
+        "language": "es",
+        "publisher": "Siruela",
+        "publication_year": 1991,
+        "price": 75000.0,
+        "pages": 638,
+        "currency": "COP",
+        "weight": 0.7,
+        "dimensions": "15x23x3",
+        "front_page_url": "https://www.tornamesa.co/imagenes/9788498/978849841170.GIF"
+    },
+    {
+        "product_id": 2,
+        "sku": "FIL-002",
+        "title": "Ética a Nicómaco",
+        "author": "Aristóteles",
+        "isbn": "9788430943425",
+        "format": "hardcover",
+        "edition": "3rd",
+        "description": "Obra clásica sobre ética y moral",
+        "language": "es",
+        "publisher": "Gredos",
+        "publication_year": 1985,
+        "price": 65000.0,
+        "pages": 320,
+        "currency": "COP",
+        "weight": 0.5,
+        "dimensions": "13x21x2",
+        "front_page_url": "https://m.media-amazon.com/images/I/4189G-gaGEL._SY445_SX342_QL70_ML2_.jpg"
+    },
+    {
+        "product_id": 3,
+        "sku": "FIL-003",
+        "title": "Así habló Zaratustra",
+        "author": "Friedrich Nietzsche",
+        "isbn": "9788420637204",
+        "format": "paperback",
+        "edition": "2nd",
+        "description": "Obra filosófica que introduce el concepto del superhombre",
+        "language": "es",
+        "publisher": "Alianza Editorial",
+        "publication_year": 1972,
+        "price": 68000.0,
+        "pages": 384,
+        "currency": "COP",
+        "weight": 0.6,
+        "dimensions": "14x22x2.5",
+        "front_page_url": "https://pictures.abebooks.com/inventory/md/md31403665059.jpg"
+    },
+
+    # Libros de Ciencias de la Computación
+    {
+        "product_id": 4,
+        "sku": "COMP-001",
+        "title": "Clean Code",
+        "author": "Robert C. Martin",
+        "isbn": "9780132350884",
+        "format": "paperback",
+        "edition": "1st",
+        "description": "Guía para escribir código limpio y mantenible",
+        "language": "en",
+        "publisher": "Prentice Hall",
+        "publication_year": 2008,
+        "price": 120000.0,
+        "pages": 464,
+        "currency": "COP",
+        "weight": 0.8,
+        "dimensions": "17x23x3",
+        "front_page_url": "https://images.cdn1.buscalibre.com/fit-in/360x360/87/da/87da3d378f0336fd04014c4ea153d064.jpg"
+    },
+    {
+        "product_id": 5,
+        "sku": "COMP-002",
+        "title": "Introduction to Algorithms",
+        "author": "Thomas H. Cormen",
+        "isbn": "9780262033848",
+        "format": "hardcover",
+        "edition": "3rd",
+        "description": "El libro de referencia sobre algoritmos",
+        "language": "en",
+        "publisher": "MIT Press",
+        "publication_year": 2009,
+        "price": 160000.0,
+        "pages": 1312,
+        "currency": "COP",
+        "weight": 2.5,
+        "dimensions": "20x25x5",
+        "front_page_url": "https://images.cdn1.buscalibre.com/fit-in/360x360/ce/4d/ce4daab00e405bca345cfbbf20b5c8df.jpg"
+    },
+    {
+        "product_id": 6,
+        "sku": "COMP-003",
+        "title": "Design Patterns",
+        "author": "Erich Gamma",
+        "isbn": "9780201633610",
+        "format": "hardcover",
+        "edition": "1st",
+        "description": "Elementos reusables de software orientado a objetos",
+        "language": "en",
+        "publisher": "Addison-Wesley",
+        "publication_year": 1994,
+        "price": 135000.0,
+        "pages": 416,
+        "currency": "COP",
+        "weight": 0.9,
+        "dimensions": "18x24x3",
+        "front_page_url": "https://imagessl8.casadellibro.com/a/l/s7/98/9788478290598.webp"
+    }
+]
+
+PRODUCT_CATEGORIES = [
+    {"product_id": 1, "category_id": 1},  # El mundo de Sofía - Filosofía
+    {"product_id": 2, "category_id": 1},  # Ética a Nicómaco - Filosofía
+    {"product_id": 3, "category_id": 1},  # Así habló Zaratustra - Filosofía
+    {"product_id": 4, "category_id": 2},  # Clean Code - Ciencias de la Computación
+    {"product_id": 5, "category_id": 2},  # Introduction to Algorithms - Ciencias de la Computación
+    {"product_id": 5, "category_id": 4},  # Introduction to Algorithms - Matemáticas (categoría múltiple)
+    {"product_id": 6, "category_id": 2}   # Design Patterns - Ciencias de la Computación
+]
+
+INVENTORY = [
+    {"product_id": 1, "quantity": 25, "reserved": 0},  # El mundo de Sofía
+    {"product_id": 2, "quantity": 15, "reserved": 0},  # Ética a Nicómaco
+    {"product_id": 3, "quantity": 20, "reserved": 0},  # Así habló Zaratustra
+    {"product_id": 4, "quantity": 30, "reserved": 0},  # Clean Code
+    {"product_id": 5, "quantity": 10, "reserved": 0},  # Introduction to Algorithms
+    {"product_id": 6, "quantity": 18, "reserved": 0}   # Design Patterns
+]
+
+# Tablas en orden de dependencia
+SEED_ROWS = [
+    (Category, CATEGORIES),
+    (User, USERS),
+    (Product, PRODUCTS),
+    (CategoryProductLink, PRODUCT_CATEGORIES),
+    (Inventory, INVENTORY),
+]
+
+def column_values(model, row: dict) -> dict:
+    """Row with the model defaults applied (default factories run in Python, not in the table)"""
+    instance = model(**row)
+    return {
+        column.name: getattr(instance, column.name)
+        for column in model.__table__.columns
+        if column.computed is None and getattr(instance, column.name) is not None
+    }
+
+def insert_ignore(session: Session, model, rows: list[dict]) -> None:
+    """Bulk INSERT ... ON CONFLICT DO NOTHING: rows already present are left as they are"""
+    if not rows:
+        return
+    dialect = session.connection().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    session.execute(insert(model).on_conflict_do_nothing(), [column_values(model, row) for row in rows])
+
+def seed_database(session: Session) -> None:
+    """Seed the database with initial data (one INSERT per table, idempotent)"""
+    for model, rows in SEED_ROWS:
+        insert_ignore(session, model, rows)
+    if session.connection().dialect.name == "postgresql":
+        # Las categorías y los productos se insertan con ID explícito: avanzar las secuencias
+        for table, column in [(Category, Category.category_id), (Product, Product.product_id)]:
+            session.execute(
+                text("SELECT setval(pg_get_serial_sequence(:table, :column), :max_id)"),
+                {"table": table.__tablename__, "column": column.key, "max_id": session.scalar(select(func.max(column)))}
             )
-        ).first():
-            link = CategoryProductLink(**link_data)
-            session.add(link)
-    
-    session.commit()
-    
-    from datetime import datetime, timezone
-    
-    inventory_items = [
-        {"product_id": 1, "quantity": 25, "reserved": 0},  # El mundo de Sofía
-        {"product_id": 2, "quantity": 15, "reserved": 0},  # Ética a Nicómaco
-        {"product_id": 3, "quantity": 20, "reserved": 0},  # Así habló Zaratustra
-        {"product_id": 4, "quantity": 30, "reserved": 0},  # Clean Code
-        {"product_id": 5, "quantity": 10, "reserved": 0},  # Introduction to Algorithms
-        {"product_id": 6, "quantity": 18, "reserved": 0}   # Design Patterns
-    ]
-    
-    for inv_data in inventory_items:
-        product_id = inv_data.pop("product_id")
-        existing_inventory = session.exec(select(Inventory).where(Inventory.product_id == product_id)).first()
-        if not existing_inventory:
-            product = session.exec(select(Product).where(Product.product_id == product_id)).first()
-            if product:
-                inventory = Inventory(
-                    product_id=product_id,
-                    product=product,
-                    quantity=inv_data["quantity"],
-                    reserved=inv_data["reserved"],
-                    last_updated=datetime.now(timezone.utc)
-                )
-                session.add(inventory)    
     session.commit()
-    print("Database seeded successfully Xd")
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""
+Datos sintéticos a escala de producción para reproducir problemas de rendimiento y medir mejoras.
+
+Genera categorías, productos, enlaces de categoría, usuarios, órdenes con sus items e
+inventario de forma determinista: la misma semilla y la misma escala producen las mismas filas.
+Cada tabla sale de su propio generador aleatorio y las filas se producen por lotes, así que la
+memoria no crece con la escala (solo se guardan los precios y el reservado por producto).
+
+La carga usa COPY en PostgreSQL y executemany en otras bases, un lote por transacción. Los IDs
+continúan a partir de los existentes, de modo que se puede cargar encima de db.seed.
+"""
+import csv
+import io
+import random
+from array import array
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from db.seed import USER_PASSWORD_HASH
+from models.category import Category, CategoryProductLink
+from models.inventory import Inventory
+from models.order import Order
+from models.order_item import OrderItem
+from models.product import Product
+from models.user import User, UserRole
+
+# Fecha de referencia fija: las fechas generadas no dependen del momento de la carga
+REFERENCE_DATE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+# Estados de las órdenes con su peso relativo
+ORDER_STATUSES = [("completed", 60), ("canceled", 10), ("expired", 5), ("draft", 15), ("check", 10)]
+
+FIRST_NAMES = ["Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Andrés", "Camila", "Jorge", "Valentina",
+               "Pedro", "Sofía", "Diego", "Isabella", "Miguel", "Daniela", "José", "Paula", "Felipe", "Natalia"]
+LAST_NAMES = ["Pérez", "González", "Rodríguez", "Gómez", "Martínez", "López", "García", "Hernández", "Díaz",
+              "Moreno", "Álvarez", "Romero", "Torres", "Ramírez", "Vargas", "Castro", "Rojas", "Ortiz"]
+TOPICS = ["Filosofía", "Historia", "Novela", "Poesía", "Matemáticas", "Física", "Química", "Biología",
+          "Economía", "Derecho", "Arte", "Música", "Cocina", "Viajes", "Psicología", "Ingeniería"]
+TITLE_WORDS = ["sombra", "ciudad", "tiempo", "río", "memoria", "silencio", "jardín", "mar", "camino",
+               "noche", "fuego", "espejo", "ciencia", "teoría", "historia", "arte", "viaje", "lengua"]
+TITLE_ADJECTIVES = ["perdido", "eterno", "breve", "secreto", "moderno", "antiguo", "infinito", "último",
+                    "primer", "nuevo", "oculto", "fundamental", "práctico", "esencial"]
+PUBLISHERS = ["Siruela", "Gredos", "Alianza Editorial", "Anagrama", "Planeta", "Penguin Random House",
+              "Tusquets", "Fondo de Cultura Económica", "MIT Press", "Prentice Hall", "Addison-Wesley", "Norma"]
+FORMATS = ["paperback", "hardcover", "ebook"]
+EDITIONS = ["1st", "2nd", "3rd", "4th"]
+LANGUAGES = ["es", "es", "es", "en", "en", "fr", "pt"]
+
+
+class SyntheticScale(NamedTuple):
+    """How many rows of each kind to generate"""
+    seed: int = 42
+    categories: int = 50
+    products: int = 10000
+    users: int = 1000
+    orders: int = 10000
+    max_items_per_order: int = 5
+
+
+class StartIds(NamedTuple):
+    """First id of each table (right after the rows already in the database)"""
+    category: int = 1
+    product: int = 1
+    user: int = 1
+    order: int = 1
+    order_item: int = 1
+
+
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "category": ("category_id", "name", "description"),
+    "product": ("product_id", "sku", "title", "author", "isbn", "format", "edition", "description", "language",
+                "publisher", "publication_year", "price", "pages", "currency", "weight", "dimensions",
+                "front_page_url", "created_at", "updated_at"),
+    "category_product_link": ("category_id", "product_id"),
+    "user": ("user_id", "username", "email", "ID", "name", "last_name", "created_at", "password_hash", "role",
+             "is_active"),
+    "order": ("order_id", "status", "total", "created_at", "updated_at", "user_created"),
+    "order_item": ("order_item_id", "order_id", "product_id", "quantity", "unit_price", "sub_total",
+                   "created_at", "updated_at"),
+    "inventory": ("product_id", "quantity", "reserved", "last_updated"),
+}
+
+TABLE_MODELS = {
+    "category": Category,
+    "product": Product,
+    "category_product_link": CategoryProductLink,
+    "user": User,
+    "order": Order,
+    "order_item": OrderItem,
+    "inventory": Inventory,
+}
+
+Batch = Tuple[str, List[tuple]]
+
+
+def _rng(scale: SyntheticScale, table: str) -> random.Random:
+    """Independent random stream per table, so each table only depends on the seed and the scale"""
+    return random.Random(f"{scale.seed}:{table}")
+
+def _timestamp(rng: random.Random, max_days: int = 730) -> datetime:
+    return REFERENCE_DATE - timedelta(seconds=rng.randrange(max_days * 86400))
+
+def _isbn(rng: random.Random) -> str:
+    digits = [9, 7, 8] + [rng.randrange(10) for _ in range(9)]
+    check = (10 - sum(d * (1 if i % 2 == 0 else 3) for i, d in enumerate(digits)) % 10) % 10
+    return "".join(map(str, digits + [check]))
+
+def _chunks(rows: Iterator[tuple], table: str, batch_size: int) -> Iterator[Batch]:
+    batch: List[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield table, batch
+            batch = []
+    if batch:
+        yield table, batch
+
+def generate_categories(scale: SyntheticScale, start: StartIds) -> Iterator[tuple]:
+    for i in range(scale.categories):
+        topic = TOPICS[i % len(TOPICS)]
+        yield (start.category + i, f"{topic} {i + 1}", f"Libros de {topic.lower()}")
+
+def generate_products(scale: SyntheticScale, start: StartIds, prices: array) -> Iterator[tuple]:
+    """Products, recording each price in `prices` (indexed by position) for the order items"""
+    rng = _rng(scale, "product")
+    for i in range(scale.products):
+        product_id = start.product + i
+        created_at = _timestamp(rng, 3650)
+        price = float(rng.randrange(20, 400) * 1000)
+        prices.append(price)
+        title = f"El {rng.choice(TITLE_WORDS)} {rng.choice(TITLE_ADJECTIVES)} {product_id}"
+        author = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield (
+            product_id, f"SYN-{product_id:09d}", title, author, _isbn(rng), rng.choice(FORMATS),
+            rng.choice(EDITIONS), f"{title}, de {author}", rng.choice(LANGUAGES), rng.choice(PUBLISHERS),
+            rng.randrange(1950, 2026), price, rng.randrange(80, 1200), "COP", round(rng.uniform(0.1, 2.5), 2),
+            f"{rng.randrange(12, 22)}x{rng.randrange(18, 28)}x{rng.randrange(1, 6)}", None,
+            created_at, created_at
+        )
+
+def generate_category_links(scale: SyntheticScale, start: StartIds) -> Iterator[tuple]:
+    """One or two categories per product"""
+    rng = _rng(scale, "category_product_link")
+    for i in range(scale.products):
+        categories = rng.sample(range(scale.categories), min(scale.categories, rng.choice((1, 1, 2))))
+        for category in sorted(categories):
+            yield (start.category + category, start.product + i)
+
+def generate_users(scale: SyntheticScale, start: StartIds) -> Iterator[tuple]:
+    """Users with the seed's precomputed password hash (usuario123), so no bcrypt is paid"""
+    rng = _rng(scale, "user")
+    for i in range(scale.users):
+        user_id = start.user + i
+        yield (
+            user_id, f"synthetic{user_id}", f"synthetic{user_id}@example.com", 100_000_000 + user_id,
+            rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), _timestamp(rng), USER_PASSWORD_HASH,
+            UserRole.USER, rng.random() > 0.02
+        )
+
+def generate_orders(
+    scale: SyntheticScale, start: StartIds, prices: array, reserved: Dict[int, int], batch_size: int
+) -> Iterator[Batch]:
+    """Orders and their items, each order batch followed by the batch of its items.
+    The quantities of the orders in 'check' are added to `reserved`."""
+    rng = _rng(scale, "order")
+    statuses = [status for status, _ in ORDER_STATUSES]
+    weights = [weight for _, weight in ORDER_STATUSES]
+    order_item_id = start.order_item
+    orders: List[tuple] = []
+    items: List[tuple] = []
+    for i in range(scale.orders):
+        order_id = start.order + i
+        status = rng.choices(statuses, weights)[0]
+        created_at = _timestamp(rng)
+        updated_at = created_at + timedelta(minutes=rng.randrange(1, 600))
+        total = 0.0
+        item_count = rng.randint(1, max(1, min(scale.max_items_per_order, scale.products)))
+        for position in rng.sample(range(scale.products), item_count):
+            product_id = start.product + position
+            quantity = rng.choice((1, 1, 1, 2, 3))
+            sub_total = prices[position] * quantity
+            total += sub_total
+            items.append((order_item_id, order_id, product_id, quantity, prices[position], sub_total, created_at, created_at))
+            order_item_id += 1
+            if status == "check":
+                reserved[product_id] = reserved.get(product_id, 0) + quantity
+        orders.append((order_id, status, total, created_at, updated_at, start.user + rng.randrange(scale.users)))
+        if len(orders) >= batch_size:
+            yield "order", orders
+            yield "order_item", items
+            orders, items = [], []
+    if orders:
+        yield "order", orders
+        yield "order_item", items
+
+def generate_inventory(scale: SyntheticScale, start: StartIds, reserved: Dict[int, int]) -> Iterator[tuple]:
+    """Stock per product, never below what the open orders reserve (the reconciler finds nothing)"""
+    rng = _rng(scale, "inventory")
+    for i in range(scale.products):
+        product_id = start.product + i
+        product_reserved = reserved.get(product_id, 0)
+        quantity = product_reserved + (0 if rng.random() < 0.05 else rng.randrange(1, 200))
+        yield (product_id, quantity, product_reserved, REFERENCE_DATE)
+
+def generate(scale: SyntheticScale, start: StartIds = StartIds(), batch_size: int = 10000) -> Iterator[Batch]:
+    """All the synthetic rows as (table, rows) batches in foreign key order"""
+    if scale.orders and not (scale.users and scale.products):
+        raise ValueError("Las órdenes necesitan usuarios y productos")
+    if scale.products and not scale.categories:
+        raise ValueError("Los productos necesitan al menos una categoría")
+    prices = array("d")
+    reserved: Dict[int, int] = {}
+    yield from _chunks(generate_categories(scale, start), "category", batch_size)
+    yield from _chunks(generate_products(scale, start, prices), "product", batch_size)
+    yield from _chunks(generate_category_links(scale, start), "category_product_link", batch_size)
+    yield from _chunks(generate_users(scale, start), "user", batch_size)
+    yield from generate_orders(scale, start, prices, reserved, batch_size)
+    yield from _chunks(generate_inventory(scale, start, reserved), "inventory", batch_size)
+
+
+def next_ids(connection: Connection) -> StartIds:
+    """First free id of each table"""
+    def next_id(column) -> int:
+        return (connection.execute(select(func.max(column))).scalar() or 0) + 1
+
+    return StartIds(
+        category=next_id(Category.category_id),
+        product=next_id(Product.product_id),
+        user=next_id(User.user_id),
+        order=next_id(Order.order_id),
+        order_item=next_id(OrderItem.order_item_id),
+    )
+
+def _copy_value(value):
+    if isinstance(value, Enum):
+        # Los enums se guardan por nombre (userrole: 'ADMIN', 'USER')
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def copy_rows(connection: Connection, table: str, rows: List[tuple]) -> None:
+    """Load one batch with COPY (PostgreSQL) or an executemany INSERT"""
+    columns = TABLE_COLUMNS[table]
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([_copy_value(value) for value in row] for row in rows)
+        buffer.seek(0)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY "{table}" ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+    else:
+        connection.execute(TABLE_MODELS[table].__table__.insert(), [dict(zip(columns, row)) for row in rows]) # type: ignore
+
+def load(engine: Engine, scale: SyntheticScale, batch_size: int = 10000, progress=None) -> Dict[str, int]:
+    """Generate and load the synthetic data after the existing rows, one transaction per batch.
+    Returns the rows loaded per table; `progress(table, loaded)` is called after each batch."""
+    with engine.connect() as connection:
+        start = next_ids(connection)
+    loaded = {table: 0 for table in TABLE_COLUMNS}
+    for table, rows in generate(scale, start, batch_size):
+        with engine.begin() as connection:
+            copy_rows(connection, table, rows)
+        loaded[table] += len(rows)
+        if progress:
+            progress(table, loaded[table])
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            # Los IDs se cargaron explícitos: avanzar las secuencias y actualizar estadísticas
+            for table, column in [("category", "category_id"), ("product", "product_id"), ("user", "user_id"),
+                                  ("order", "order_id"), ("order_item", "order_item_id")]:
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{column}'), "
+                    f"(SELECT coalesce(max({column}), 1) FROM \"{table}\"))"
+                ))
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ANALYZE"))
+    return loaded
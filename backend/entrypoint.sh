@@ -7,9 +7,9 @@ while ! nc -z db 5432; do
 done
 echo "Database is ready!"
 
-# Run migrations
-echo "Running database migrations..."
-alembic upgrade head
+# Run migrations and seed once, before the workers start
+echo "Bootstrapping database..."
+python -m db.bootstrap
 
 # Start the application
 echo "Starting FastAPI application..."
@@ -1,25 +1,52 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from core.auth import require_metrics_access, require_role
 from core.config import settings
+from core.query_stats import QueryStatsMiddleware
+from core import metrics
+from core.cache import get_cache_backend
 from api.auth import router as auth_router
 from api.orders import router as orders_router
 from api.order_item import router as order_item_router
 from api.products import router as products_router
 from api.inventory import router as inventory_router
 from api.users import router as users_router
-from db.database import create_db_and_tables
-from db.seed import seed_database
+from models.user import UserRole
+from sqlmodel import Session
+from db.database import get_pool_stats, engine
+from db.bootstrap import bootstrap
+from services import product_cache, token_cache
+from services.auth_service import password_hash_pool
+from services.reservation_sweeper import run_sweeper
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    create_db_and_tables()
-    seed_database()  # Sembrar la base de datos
+    # Migraciones y datos iniciales solo si la marca de bootstrap no está al día
+    if settings.DB_BOOTSTRAP_ON_STARTUP:
+        await asyncio.to_thread(bootstrap, engine)
+    # Barrido periódico de reservas vencidas (SKIP LOCKED: varios workers pueden ejecutarlo a la vez)
+    stop_sweeper = asyncio.Event()
+    sweeper = None
+    if settings.RESERVATION_SWEEPER_ENABLED:
+        sweeper = asyncio.create_task(run_sweeper(lambda: Session(engine), stop_sweeper))
+    # Con varios workers cada uno publica su snapshot de métricas en METRICS_DIR
+    stop_flusher = asyncio.Event()
+    flusher = None
+    if settings.METRICS_DIR:
+        flusher = asyncio.create_task(metrics.run_flusher(settings.METRICS_DIR, stop_flusher))
     yield
-    # Shutdown (si necesitas hacer algo al cerrar)
+    # Shutdown
+    stop_sweeper.set()
+    stop_flusher.set()
+    if sweeper:
+        await sweeper
+    if flusher:
+        await flusher
 
 app = FastAPI(
     title=settings.app_name,
@@ -35,6 +62,45 @@ app.add_middleware(
     allow_methods=settings.CORS_ALLOW_METHODS,
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+POOL_GAUGES = {
+    "size": "Tamaño configurado del pool de conexiones",
+    "checked_out": "Conexiones del pool en uso",
+    "overflow": "Conexiones de overflow abiertas (negativo mientras el pool no está lleno)",
+}
+POOL_COUNTERS = {
+    "checkouts": "Conexiones entregadas por el pool",
+    "connects": "Conexiones nuevas abiertas contra la base de datos",
+    "timeouts": "Esperas por una conexión que agotaron DB_POOL_TIMEOUT",
+}
+
+def pool_metric_samples():
+    """Connection pool usage of this worker"""
+    stats = get_pool_stats()
+    for key, help in POOL_GAUGES.items():
+        if key in stats:
+            yield f"db_pool_{key}", "gauge", help, {}, stats[key]
+    for key, help in POOL_COUNTERS.items():
+        yield f"db_pool_{key}_total", "counter", help, {}, stats[key]
+    yield "db_pool_wait_seconds_total", "counter", "Tiempo total esperando una conexión", {}, stats["wait_seconds_total"]
+    yield "db_pool_wait_seconds_max", "gauge", "Mayor espera por una conexión", {}, stats["wait_seconds_max"]
+
+def cache_metric_samples():
+    """Hits and misses of every cache (cache_hit_ratio is derived from them at export)"""
+    caches = {
+        "product": product_cache.stats(),
+        "token": token_cache.stats(),
+        "shared": get_cache_backend().stats(),
+    }
+    for cache, stats in caches.items():
+        if "hits" in stats:
+            yield "cache_hits_total", "counter", "Lecturas servidas desde la caché", {"cache": cache}, stats["hits"]
+            yield "cache_misses_total", "counter", "Lecturas que no estaban en la caché", {"cache": cache}, stats["misses"]
+
+metrics.registry.add_collector(pool_metric_samples)
+metrics.registry.add_collector(cache_metric_samples)
 
 # Rutas
 app.include_router(auth_router, prefix="/api")
@@ -60,4 +126,20 @@ async def read_root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/db", tags=["Health"])
+async def db_pool_health(admin_id: int = Depends(require_role(UserRole.ADMIN))):
+    """Uso del pool de conexiones (conexiones en uso, overflow, esperas y timeouts)"""
+    return get_pool_stats()
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+async def metrics_endpoint():
+    """Métricas en formato Prometheus (de todos los workers si METRICS_DIR está definido)"""
+    content = await asyncio.to_thread(metrics.export, settings.METRICS_DIR)
+    return PlainTextResponse(content, media_type=metrics.CONTENT_TYPE)
+
+@app.get("/health/auth", tags=["Health"])
+async def password_hash_pool_health(admin_id: int = Depends(require_role(UserRole.ADMIN))):
+    """Cola del pool de bcrypt (hashes en espera, en curso, rechazados y tiempos de espera)"""
+    return password_hash_pool.stats()
@@ -12,16 +12,17 @@ from alembic import context
 from sqlmodel import SQLModel
 
 from models import User , UserRole, Order, Product, OrderItem, Inventory, Category, CategoryProductLink, AuditLog
+from core.config import settings
 
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/appdb"
+DATABASE_URL: str = settings.DATABASE_URL
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -30,6 +31,10 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    # bootstrap_state la administra db.bootstrap, no las migraciones
+    return not (type_ == "table" and name == "bootstrap_state")
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -43,6 +48,13 @@ def run_migrations_offline():
         context.run_migrations()
 
 def run_migrations_online():
+    # db.bootstrap pasa su propia conexión (ya dentro de una transacción)
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
     connectable = engine_from_config(
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
@@ -50,7 +62,7 @@ def run_migrations_online():
         poolclass=None,
     )
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
         with context.begin_transaction():
             context.run_migrations()
 
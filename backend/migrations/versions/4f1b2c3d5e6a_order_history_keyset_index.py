@@ -0,0 +1,25 @@
+"""order_history_keyset_index
+
+Revision ID: 4f1b2c3d5e6a
+Revises: a9343c9eb4b3
+Create Date: 2026-10-17 09:12:41.532817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1b2c3d5e6a'
+down_revision: Union[str, None] = 'a9343c9eb4b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_order_user_created_created_at_order_id', 'order', ['user_created', 'created_at', 'order_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_user_created_created_at_order_id', table_name='order')
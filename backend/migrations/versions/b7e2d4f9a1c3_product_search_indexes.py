@@ -0,0 +1,39 @@
+"""product_search_indexes
+
+Revision ID: b7e2d4f9a1c3
+Revises: 4f1b2c3d5e6a
+Create Date: 2026-10-17 10:05:12.381954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4f9a1c3'
+down_revision: Union[str, None] = '4f1b2c3d5e6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Copia fija de db.search.PG_SEARCH_DDL al crear la migración: cambios posteriores en
+# la aplicación no deben alterar lo que hace esta revisión
+SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '') || ' ' || "
+    "coalesce(isbn, '') || ' ' || coalesce(description, ''))"
+)
+
+
+def upgrade() -> None:
+    # Extensión pg_trgm, índice GIN del tsvector e índices de trigramas de título e ISBN
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_product_search_vector ON product USING gin ({SEARCH_VECTOR})")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_product_title_trgm ON product USING gin (title gin_trgm_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_product_isbn_trgm ON product USING gin (isbn gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_product_isbn_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_product_title_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_product_search_vector")
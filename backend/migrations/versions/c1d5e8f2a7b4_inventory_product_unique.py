@@ -0,0 +1,43 @@
+"""inventory_product_unique
+
+Revision ID: c1d5e8f2a7b4
+Revises: b7e2d4f9a1c3
+Create Date: 2026-10-17 15:40:03.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1d5e8f2a7b4'
+down_revision: Union[str, None] = 'b7e2d4f9a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Un producto tiene una sola fila de inventario (los ajustes masivos crean las que faltan).
+    # Las filas repetidas se actualizaban todas a la vez por product_id: se conserva la más
+    # reciente y el reservado lo corrige después scripts/reconcile_inventory.py
+    op.execute("""
+        DELETE FROM inventory
+        WHERE inventory_id IN (
+            SELECT inventory_id FROM (
+                SELECT inventory_id,
+                       row_number() OVER (
+                           PARTITION BY product_id ORDER BY last_updated DESC, inventory_id DESC
+                       ) AS position
+                FROM inventory
+            ) AS ranked
+            WHERE position > 1
+        )
+    """)
+    op.drop_index('ix_inventory_product_id', table_name='inventory')
+    op.create_index('ix_inventory_product_id', 'inventory', ['product_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_product_id', table_name='inventory')
+    op.create_index('ix_inventory_product_id', 'inventory', ['product_id'], unique=False)
@@ -0,0 +1,31 @@
+"""inventory_effective_quantity_index
+
+Revision ID: d3a9f6b1c2e7
+Revises: c1d5e8f2a7b4
+Create Date: 2026-10-17 16:52:27.604915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a9f6b1c2e7'
+down_revision: Union[str, None] = 'c1d5e8f2a7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_inventory_effective_quantity',
+        'inventory',
+        [sa.text('(quantity - reserved)'), 'product_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_effective_quantity', table_name='inventory')
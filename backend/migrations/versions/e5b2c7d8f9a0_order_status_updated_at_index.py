@@ -0,0 +1,25 @@
+"""order_status_updated_at_index
+
+Revision ID: e5b2c7d8f9a0
+Revises: d3a9f6b1c2e7
+Create Date: 2026-10-17 17:35:12.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2c7d8f9a0'
+down_revision: Union[str, None] = 'd3a9f6b1c2e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_order_status_updated_at', 'order', ['status', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_status_updated_at', table_name='order')
@@ -0,0 +1,39 @@
+"""inventory_available_column
+
+Revision ID: f7c3a1d9e4b2
+Revises: e5b2c7d8f9a0
+Create Date: 2026-10-17 18:41:09.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3a1d9e4b2'
+down_revision: Union[str, None] = 'e5b2c7d8f9a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Columna generada almacenada: PostgreSQL la recalcula en cada escritura de quantity/reserved
+    op.add_column(
+        'inventory',
+        sa.Column('available', sa.Integer(), sa.Computed('quantity - reserved', persisted=True), nullable=False)
+    )
+    op.drop_index('ix_inventory_effective_quantity', table_name='inventory')
+    op.create_index('ix_inventory_available', 'inventory', ['available', 'product_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_available', table_name='inventory')
+    op.create_index(
+        'ix_inventory_effective_quantity',
+        'inventory',
+        [sa.text('(quantity - reserved)'), 'product_id'],
+        unique=False
+    )
+    op.drop_column('inventory', 'available')
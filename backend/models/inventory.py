@@ -1,6 +1,7 @@
 from datetime import datetime , timezone
 from typing import TYPE_CHECKING
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, Computed, Index, Integer
 
 if TYPE_CHECKING:
     from .product import Product
@@ -8,8 +9,16 @@ if TYPE_CHECKING:
 class Inventory(SQLModel, table=True):
     __tablename__ = "inventory"  # type: ignore[assignment]
     inventory_id: int | None = Field(default=None, primary_key=True)
-    product_id: int = Field(foreign_key="product.product_id", index=True)
+    product_id: int = Field(foreign_key="product.product_id", index=True, unique=True)
     quantity: int = Field(default=0, ge=0)
     reserved: int = Field(default=0, ge=0)
+    # Stock vendible, calculado por la base de datos en la misma escritura que quantity/reserved
+    available: int | None = Field(
+        default=None,
+        sa_column=Column(Integer, Computed("quantity - reserved", persisted=True), nullable=False)
+    )
     last_updated: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    product: "Product" = Relationship(back_populates="inventory_product")
\ No newline at end of file
+    product: "Product" = Relationship(back_populates="inventory_product")
+
+# Filtro de stock bajo y orden por stock disponible en el listado de inventario
+Index("ix_inventory_available", Inventory.available, Inventory.product_id) # type: ignore
@@ -1,6 +1,7 @@
 from datetime import datetime , timezone
 from typing import List, TYPE_CHECKING
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 
 from .order_item import OrderItem
 
@@ -11,6 +12,12 @@ if TYPE_CHECKING:
 
 class Order(SQLModel, table=True):
     __tablename__ = "order"  # type: ignore[assignment]
+    __table_args__ = (
+        # Historial de pedidos por usuario (paginación por cursor)
+        Index("ix_order_user_created_created_at_order_id", "user_created", "created_at", "order_id"),
+        # Barrido de reservas vencidas (órdenes en 'check' por antigüedad)
+        Index("ix_order_status_updated_at", "status", "updated_at"),
+    )
     order_id: int | None = Field(default=None, primary_key=True)
     status: str = Field(default='draft')
     total: float = Field(default=0)
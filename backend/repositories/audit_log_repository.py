@@ -0,0 +1,15 @@
+from sqlmodel import Session
+from sqlalchemy import insert
+from datetime import datetime, timezone
+from models.audit_log import AuditLog
+
+class AuditLogRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add_many(self, entries: list[dict]) -> None:
+        """Insert many audit log entries with one bulk INSERT, without committing"""
+        if not entries:
+            return
+        now = datetime.now(timezone.utc)
+        self.session.execute(insert(AuditLog), [{"create_at": now, **entry} for entry in entries])
@@ -1,8 +1,19 @@
-from typing import Optional
+import csv
+import io
+from typing import Iterator, Optional
 from sqlmodel import Session, select
-from sqlalchemy import desc
+from sqlalchemy import desc, bindparam, case, insert, text, tuple_, update
 from datetime import datetime, timezone
 from models.inventory import Inventory
+from models.product import Product
+
+# Columnas por las que se puede ordenar el listado de inventario (desempate por product_id)
+STOCK_SORT_COLUMNS = {
+    "title": Product.title,
+    "quantity": Inventory.quantity,
+    "reserved": Inventory.reserved,
+    "effective": Inventory.available,
+}
 
 class InventoryRepository:
     def __init__(self, session: Session):
@@ -73,7 +84,335 @@ class InventoryRepository:
         return inventory
     
     def get_effective_quantity(self, product_id: int) -> Optional[int]:
-        inventory = self.get_inventory_by_product_id(product_id)
-        if inventory:
-            return inventory.quantity - inventory.reserved
-        return None
+        statement = select(Inventory.available).where(Inventory.product_id == product_id)
+        return self.session.exec(statement).first()
+
+    def get_availability_many(self, product_ids: list[int]) -> dict[int, int]:
+        """Available stock of many products in one indexed query (products without inventory are left out)"""
+        if not product_ids:
+            return {}
+        statement = select(Inventory.product_id, Inventory.available).where(Inventory.product_id.in_(product_ids)) # type: ignore
+        return dict(self.session.exec(statement).all()) # type: ignore
+
+    def lock_stock(self, product_ids: list[int]) -> list[tuple[int, int, int, str]]:
+        """Lock the inventory rows of many products in product_id order (avoids deadlocks)
+        and return (product_id, quantity, reserved, title) for each one"""
+        statement = (
+            select(Inventory.product_id, Inventory.quantity, Inventory.reserved, Product.title)
+            .join(Product, Product.product_id == Inventory.product_id) # type: ignore
+            .where(Inventory.product_id.in_(product_ids)) # type: ignore
+            .order_by(Inventory.product_id)
+            .with_for_update(of=Inventory) # type: ignore
+        )
+        return list(self.session.exec(statement).all()) # type: ignore
+
+    def reserve_stock_many(self, quantities: dict[int, int]) -> list[dict]:
+        """Reserve stock for every product of an order at once.
+
+        Locks the rows, computes the shortfalls and, only when there are none, applies a single
+        conditional UPDATE. Returns the shortfalls (empty list when everything was reserved).
+        Does not commit: the caller decides when the whole order is committed.
+        """
+        if not quantities:
+            return []
+        locked = {row[0]: row for row in self.lock_stock(list(quantities))}
+        shortfalls = []
+        for product_id in sorted(quantities):
+            requested = quantities[product_id]
+            row = locked.get(product_id)
+            available = row[1] - row[2] if row else None
+            if available is None or available < requested:
+                shortfalls.append({
+                    "product_id": product_id,
+                    "product_title": row[3] if row else None,
+                    "available_quantity": available or 0,
+                    "requested_quantity": requested
+                })
+        if shortfalls:
+            return shortfalls
+        amount = case(quantities, value=Inventory.product_id)
+        statement = (
+            update(Inventory)
+            .where(Inventory.product_id.in_(list(quantities))) # type: ignore
+            .where(Inventory.available >= amount) # type: ignore
+            .values(reserved=Inventory.reserved + amount, last_updated=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        result = self.session.exec(statement) # type: ignore
+        if result.rowcount != len(quantities):
+            # Otra transacción tomó el stock entre el bloqueo y la actualización (bases sin FOR UPDATE)
+            raise RuntimeError("La reserva de stock fue modificada concurrentemente")
+        return []
+
+    def confirm_reservations_many(self, quantities: dict[int, int]) -> list[int]:
+        """Turn the reservations of many products into sold stock with a single UPDATE.
+        Returns the product_ids whose reservation was not enough (nothing is updated then)."""
+        if not quantities:
+            return []
+        locked = {row[0]: row for row in self.lock_stock(list(quantities))}
+        failed = [
+            product_id for product_id in sorted(quantities)
+            if product_id not in locked or locked[product_id][2] < quantities[product_id]
+        ]
+        if failed:
+            return failed
+        amount = case(quantities, value=Inventory.product_id)
+        statement = (
+            update(Inventory)
+            .where(Inventory.product_id.in_(list(quantities))) # type: ignore
+            .where(Inventory.reserved >= amount)
+            .values(
+                reserved=Inventory.reserved - amount,
+                quantity=Inventory.quantity - amount,
+                last_updated=datetime.now(timezone.utc)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = self.session.exec(statement) # type: ignore
+        if result.rowcount != len(quantities):
+            raise RuntimeError("La reserva de stock fue modificada concurrentemente")
+        return []
+
+    def release_reserved_stock_many(self, quantities: dict[int, int]) -> int:
+        """Release the reservations of many products with a single UPDATE, never going below zero.
+        Returns the number of inventory rows updated."""
+        if not quantities:
+            return 0
+        amount = case(quantities, value=Inventory.product_id)
+        statement = (
+            update(Inventory)
+            .where(Inventory.product_id.in_(list(quantities))) # type: ignore
+            .values(
+                reserved=case((Inventory.reserved < amount, 0), else_=Inventory.reserved - amount),
+                last_updated=datetime.now(timezone.utc)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return self.session.exec(statement).rowcount # type: ignore
+
+    def adjust_stock_many(self, adjustments: dict[int, tuple[str, int]]) -> tuple[list[dict], list[int], list[dict]]:
+        """Apply absolute ("absolute") or relative ("delta") quantity changes to many products.
+
+        Locks the existing rows, computes every new quantity, then writes them with one
+        set-wise UPDATE and one bulk INSERT for products that had no inventory yet.
+        A quantity may not drop below what is reserved: those rows are rejected.
+        Returns (results, product_ids not found, rejected rows). Does not commit.
+        """
+        if not adjustments:
+            return [], [], []
+        product_ids = sorted(adjustments)
+        titles = dict(self.session.exec(
+            select(Product.product_id, Product.title).where(Product.product_id.in_(product_ids)) # type: ignore
+        ).all())
+        current = {
+            row[0]: (row[1], row[2])
+            for row in self.session.exec(
+                select(Inventory.product_id, Inventory.quantity, Inventory.reserved)
+                .where(Inventory.product_id.in_(product_ids)) # type: ignore
+                .order_by(Inventory.product_id)
+                .with_for_update()
+            ).all()
+        }
+        results, not_found, rejected = [], [], []
+        updates, inserts = [], []
+        for product_id in product_ids:
+            if product_id not in titles:
+                not_found.append(product_id)
+                continue
+            mode, amount = adjustments[product_id]
+            previous, reserved = current.get(product_id, (0, 0))
+            quantity = previous + amount if mode == "delta" else amount
+            if quantity < reserved or quantity < 0:
+                rejected.append({
+                    "product_id": product_id,
+                    "reason": f"La cantidad resultante ({quantity}) es menor que la reservada ({reserved})"
+                })
+                continue
+            (updates if product_id in current else inserts).append((product_id, quantity))
+            results.append({
+                "product_id": product_id,
+                "title": titles[product_id],
+                "previous_quantity": previous,
+                "quantity": quantity,
+                "reserved": reserved,
+                "created": product_id not in current
+            })
+        now = datetime.now(timezone.utc)
+        self._set_column("quantity", updates, now)
+        if inserts:
+            self.session.execute(insert(Inventory), [
+                {"product_id": product_id, "quantity": quantity, "reserved": 0, "last_updated": now}
+                for product_id, quantity in inserts
+            ])
+        return results, not_found, rejected
+
+    def lock_stock_chunk(self, after_product_id: int, limit: int) -> list[tuple[int, int, int, int]]:
+        """Lock the next `limit` inventory rows after after_product_id (keyset order) and
+        return (inventory_id, product_id, quantity, reserved) for each one"""
+        statement = (
+            select(Inventory.inventory_id, Inventory.product_id, Inventory.quantity, Inventory.reserved)
+            .where(Inventory.product_id > after_product_id)
+            .order_by(Inventory.product_id)
+            .limit(limit)
+            .with_for_update()
+        )
+        return list(self.session.exec(statement).all()) # type: ignore
+
+    def set_reserved_many(self, reserved: list[tuple[int, int]]) -> None:
+        """Overwrite the reserved stock of many products from (product_id, reserved) pairs.
+        Does not commit."""
+        self._set_column("reserved", reserved, datetime.now(timezone.utc))
+
+    def list_stock(
+        self,
+        title: Optional[str] = None,
+        isbn: Optional[str] = None,
+        low_stock_below: Optional[int] = None,
+        sort: str = "title",
+        descending: bool = False,
+        limit: int = 100,
+        after: Optional[tuple] = None,
+        backwards: bool = False
+    ) -> list[dict]:
+        """Get one page of the stock listing as plain dicts, sorted and limited in SQL.
+
+        Pages by keyset on (sort column, product_id): the rows after `after`, or right
+        before it when backwards is True. low_stock_below keeps rows whose available stock
+        (quantity - reserved) is below the threshold.
+        """
+        sort_column = STOCK_SORT_COLUMNS[sort]
+        statement = (
+            select(
+                Product.product_id, Product.title, Product.author, Product.isbn, Product.price,
+                Inventory.quantity, Inventory.reserved
+            )
+            .join(Inventory, Inventory.product_id == Product.product_id) # type: ignore
+        )
+        if title:
+            statement = statement.where(Product.title.ilike(f"%{title}%")) # type: ignore
+        if isbn:
+            statement = statement.where(Product.isbn.ilike(f"%{isbn}%")) # type: ignore
+        if low_stock_below is not None:
+            statement = statement.where(Inventory.available < low_stock_below) # type: ignore
+        reverse = descending != backwards
+        if after is not None:
+            position = tuple_(sort_column, Product.product_id)
+            statement = statement.where(position < tuple_(*after) if reverse else position > tuple_(*after))
+        if reverse:
+            statement = statement.order_by(sort_column.desc(), Product.product_id.desc()) # type: ignore
+        else:
+            statement = statement.order_by(sort_column.asc(), Product.product_id.asc()) # type: ignore
+        rows = [dict(row._mapping) for row in self.session.exec(statement.limit(limit)).all()] # type: ignore
+        if backwards:
+            rows.reverse()
+        return rows
+
+    def iter_stock(self, batch_size: int = 1000) -> Iterator[tuple]:
+        """Stream (product_id, title, author, isbn, price, quantity, reserved) for every
+        product with inventory, in product_id order, fetching `batch_size` rows at a time
+        from a server-side cursor"""
+        statement = (
+            select(
+                Product.product_id, Product.title, Product.author, Product.isbn, Product.price,
+                Inventory.quantity, Inventory.reserved
+            )
+            .join(Inventory, Inventory.product_id == Product.product_id) # type: ignore
+            .order_by(Product.product_id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.session.exec(statement) # type: ignore
+
+    def import_stock_batch(self, rows: list[tuple[int, str, int]]) -> dict:
+        """Apply a batch of imported (product_id, mode, quantity) lines without committing.
+
+        On PostgreSQL the batch is loaded with COPY into a temporary table and applied with
+        set-wise statements; elsewhere it goes through adjust_stock_many.
+        Returns {"updated", "created", "not_found", "rejected"}.
+        """
+        if not rows:
+            return {"updated": 0, "created": 0, "not_found": [], "rejected": []}
+        if self.session.connection().dialect.name != "postgresql":
+            results, not_found, rejected = self.adjust_stock_many(
+                {product_id: (mode, quantity) for product_id, mode, quantity in rows}
+            )
+            created = sum(1 for result in results if result["created"])
+            return {"updated": len(results) - created, "created": created, "not_found": not_found, "rejected": rejected}
+
+        connection = self.session.connection()
+        connection.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS inventory_import "
+            "(product_id integer PRIMARY KEY, mode text NOT NULL, amount integer NOT NULL) ON COMMIT DROP"
+        ))
+        connection.execute(text("TRUNCATE inventory_import"))
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert("COPY inventory_import (product_id, mode, amount) FROM STDIN WITH (FORMAT csv)", buffer)
+
+        new_quantity = "CASE WHEN s.mode = 'delta' THEN coalesce(i.quantity, 0) + s.amount ELSE s.amount END"
+        connection.execute(text(
+            "SELECT i.product_id FROM inventory i JOIN inventory_import s ON s.product_id = i.product_id "
+            "ORDER BY i.product_id FOR UPDATE OF i"
+        ))
+        not_found = list(connection.execute(text(
+            "SELECT s.product_id FROM inventory_import s "
+            "WHERE NOT EXISTS (SELECT 1 FROM product p WHERE p.product_id = s.product_id) ORDER BY s.product_id"
+        )).scalars())
+        rejected = [
+            {
+                "product_id": product_id,
+                "reason": f"La cantidad resultante ({quantity}) es menor que la reservada ({reserved})"
+            }
+            for product_id, quantity, reserved in connection.execute(text(f"""
+                SELECT s.product_id, {new_quantity}, coalesce(i.reserved, 0)
+                FROM inventory_import s
+                JOIN product p ON p.product_id = s.product_id
+                LEFT JOIN inventory i ON i.product_id = s.product_id
+                WHERE {new_quantity} < coalesce(i.reserved, 0)
+                ORDER BY s.product_id
+            """))
+        ]
+        now = datetime.now(timezone.utc)
+        updated = connection.execute(text(f"""
+            UPDATE inventory AS i SET quantity = {new_quantity}, last_updated = :now
+            FROM inventory_import s
+            WHERE i.product_id = s.product_id AND {new_quantity} >= i.reserved
+        """), {"now": now}).rowcount
+        created = connection.execute(text("""
+            INSERT INTO inventory (product_id, quantity, reserved, last_updated)
+            SELECT s.product_id, s.amount, 0, :now
+            FROM inventory_import s
+            JOIN product p ON p.product_id = s.product_id
+            WHERE s.amount >= 0 AND NOT EXISTS (SELECT 1 FROM inventory i WHERE i.product_id = s.product_id)
+        """), {"now": now}).rowcount
+        return {"updated": updated, "created": created, "not_found": not_found, "rejected": rejected}
+
+    def _set_column(self, column: str, values: list[tuple[int, int]], now: datetime) -> None:
+        """Set quantity or reserved of many products at once from (product_id, value) pairs"""
+        if not values:
+            return
+        assert column in ("quantity", "reserved")
+        connection = self.session.connection()
+        if connection.dialect.name == "postgresql":
+            # Un solo UPDATE unido a los valores enviados como dos arreglos
+            connection.execute(text(f"""
+                UPDATE inventory AS i
+                SET {column} = v.value, last_updated = :now
+                FROM unnest(CAST(:product_ids AS integer[]), CAST(:values AS integer[])) AS v(product_id, value)
+                WHERE i.product_id = v.product_id
+            """), {
+                "now": now,
+                "product_ids": [product_id for product_id, _ in values],
+                "values": [value for _, value in values]
+            })
+        else:
+            table = Inventory.__table__
+            statement = (
+                update(table) # type: ignore
+                .where(table.c.product_id == bindparam("b_product_id")) # type: ignore
+                .values({column: bindparam("b_value"), "last_updated": now})
+            )
+            connection.execute(statement, [
+                {"b_product_id": product_id, "b_value": value} for product_id, value in values
+            ])
@@ -1,8 +1,9 @@
 from typing import Optional
 from sqlmodel import Session, select
-from sqlalchemy import desc
+from sqlalchemy import desc, insert, delete, func, tuple_, update
 from datetime import datetime, timezone
 from models.order import Order, OrderItem
+from models.product import Product
 
 class OrderRepository:
     def __init__(self,session: Session):
@@ -23,24 +24,44 @@ class OrderRepository:
         return order
     
     def create_order_item(self,order_id:int,items_data:list[dict]) -> list[OrderItem]:
-        order_items = []
-        for item in items_data:
-            order_item=OrderItem(
-                order_id=order_id,
-                product_id=item["product_id"],
-                quantity = item["quantity"],
-                unit_price = item["unit_price"],
-                sub_total = item["sub_total"],
-                created_at = datetime.now(timezone.utc),
-                updated_at = datetime.now(timezone.utc)
-            )
-            self.session.add(order_item)
-            order_items.append(order_item)
+        """Insert all the items of an order with a single multi-row INSERT ... RETURNING"""
+        if not items_data:
+            return []
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "order_id": order_id,
+                "product_id": item["product_id"],
+                "quantity": item["quantity"],
+                "unit_price": item["unit_price"],
+                "sub_total": item["sub_total"],
+                "created_at": now,
+                "updated_at": now
+            }
+            for item in items_data
+        ]
+        return list(self.session.scalars(insert(OrderItem).returning(OrderItem), rows).all())
+
+    def create_order_with_items(self,user_id:int,items_data:list[dict],status:str='draft') -> tuple[Order, list[OrderItem]]:
+        """Create an order and all its items with two INSERTs, without committing"""
+        now = datetime.now(timezone.utc)
+        order = Order(
+            user_created=user_id,
+            total=sum(item["sub_total"] for item in items_data),
+            status=status,
+            created_at=now,
+            updated_at=now
+        )
+        self.session.add(order)
         self.session.flush()
-        return order_items
+        order_items = self.create_order_item(order.order_id, items_data) # type: ignore
+        return order, order_items
     
-    def get_order_by_id(self, order_id:int) -> Optional[Order]:
+    def get_order_by_id(self, order_id:int, for_update:bool=False) -> Optional[Order]:
+        """Get an order; for_update locks its row (and reloads it) until the transaction ends"""
         statement = select(Order).where(Order.order_id == order_id)
+        if for_update:
+            statement = statement.with_for_update().execution_options(populate_existing=True)
         return self.session.exec(statement).first()
     
     def update_order_status(self,order_id:int, new_status:str) -> Optional[Order]:
@@ -67,9 +88,108 @@ class OrderRepository:
         )
         return list(self.session.exec(statement).all())
     
+    def get_orders_with_items(self, order_ids:list[int]) -> list[tuple[Order, list[tuple[OrderItem, Optional[str]]]]]:
+        """Get many orders with their items and product titles in one joined query"""
+        if not order_ids:
+            return []
+        return self._load_orders_with_items(
+            Order.order_id.in_(order_ids), # type: ignore
+            Order.order_id
+        )
+
+    def get_orders_by_user_with_items(self, user_id:int, limit:int=10, offset:int=0) -> list[tuple[Order, list[tuple[OrderItem, Optional[str]]]]]:
+        """Get a page of a user's orders with their items and product titles in one query"""
+        page = (
+            select(Order.order_id)
+            .where(Order.user_created == user_id)
+            .order_by(Order.created_at.desc()) # type: ignore
+            .limit(limit)
+            .offset(offset)
+        )
+        return self._load_orders_with_items(
+            Order.order_id.in_(page), # type: ignore
+            Order.created_at.desc() # type: ignore
+        )
+
+    def _load_orders_with_items(self, criteria, ordering) -> list[tuple[Order, list[tuple[OrderItem, Optional[str]]]]]:
+        statement = (
+            select(Order, OrderItem, Product.title)
+            .outerjoin(OrderItem, OrderItem.order_id == Order.order_id) # type: ignore
+            .outerjoin(Product, Product.product_id == OrderItem.product_id) # type: ignore
+            .where(criteria)
+            .order_by(ordering, OrderItem.order_item_id)
+        )
+        orders: dict[int, tuple[Order, list[tuple[OrderItem, Optional[str]]]]] = {}
+        for order, item, title in self.session.exec(statement).all():
+            _, items = orders.setdefault(order.order_id, (order, [])) # type: ignore
+            if item is not None:
+                items.append((item, title))
+        return list(orders.values())
+
+    def get_order_summaries_by_user(self, user_id:int, limit:int=10, offset:int=0) -> tuple[list[dict], Optional[int]]:
+        """Get a page of a user's orders with their items_count and the user's total orders in one query.
+
+        The total comes from a window function, so it is None when the page is empty.
+        """
+        statement = (
+            self._order_summaries(user_id, func.count().over().label("total_orders"))
+            .order_by(Order.created_at.desc(), Order.order_id.desc()) # type: ignore
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = [dict(row._mapping) for row in self.session.exec(statement).all()] # type: ignore
+        total = rows[0]["total_orders"] if rows else None
+        for row in rows:
+            del row["total_orders"]
+        return rows, total
+
+    def get_order_summaries_by_user_after(self, user_id:int, key:tuple[datetime, int], limit:int=10, backwards:bool=False) -> list[dict]:
+        """Keyset page of a user's orders, newest first.
+
+        Returns the orders that come after the (created_at, order_id) key in the history, or the
+        ones right before it when backwards is True. Served by the (user_created, created_at, order_id) index.
+        """
+        position = tuple_(Order.created_at, Order.order_id)
+        if backwards:
+            statement = (
+                self._order_summaries(user_id)
+                .where(position > tuple_(*key))
+                .order_by(Order.created_at.asc(), Order.order_id.asc()) # type: ignore
+            )
+        else:
+            statement = (
+                self._order_summaries(user_id)
+                .where(position < tuple_(*key))
+                .order_by(Order.created_at.desc(), Order.order_id.desc()) # type: ignore
+            )
+        rows = [dict(row._mapping) for row in self.session.exec(statement.limit(limit)).all()] # type: ignore
+        if backwards:
+            rows.reverse()
+        return rows
+
+    def _order_summaries(self, user_id:int, *extra_columns):
+        items_count = (
+            select(OrderItem.order_id, func.count(OrderItem.order_item_id).label("items_count")) # type: ignore
+            .join(Order, Order.order_id == OrderItem.order_id) # type: ignore
+            .where(Order.user_created == user_id)
+            .group_by(OrderItem.order_id)
+            .subquery()
+        )
+        return (
+            select(
+                Order.order_id,
+                Order.status,
+                Order.total,
+                Order.created_at,
+                func.coalesce(items_count.c.items_count, 0).label("items_count"),
+                *extra_columns
+            )
+            .outerjoin(items_count, items_count.c.order_id == Order.order_id) # type: ignore
+            .where(Order.user_created == user_id)
+        )
+
     def count_orders_by_user(self, user_id: int) -> int:
         """Count total orders for a user"""
-        from sqlalchemy import func
         statement = select(func.count(Order.order_id)).where(Order.user_created == user_id)
         result = self.session.exec(statement).first()
         return result or 0
@@ -99,4 +219,58 @@ class OrderRepository:
             self.session.delete(order_item)
             self.session.commit()
             return True
-        return False        
\ No newline at end of file
+        return False
+
+    def lock_expired_reservations(self, cutoff:datetime, limit:int) -> list[int]:
+        """Lock up to `limit` orders in 'check' not updated since `cutoff`, oldest first.
+        Rows locked by another transaction (a confirm, another sweeper) are skipped."""
+        statement = (
+            select(Order.order_id)
+            .where(Order.status == "check", Order.updated_at < cutoff)
+            .order_by(Order.updated_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(self.session.exec(statement).all()) # type: ignore
+
+    def get_quantities_by_product(self, order_ids:list[int]) -> dict[int, int]:
+        """Total quantity per product over the items of many orders"""
+        if not order_ids:
+            return {}
+        statement = (
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id.in_(order_ids)) # type: ignore
+            .group_by(OrderItem.product_id)
+        )
+        return {product_id: int(quantity) for product_id, quantity in self.session.exec(statement).all()}
+
+    def get_reserved_quantities(self, first_product_id:int, last_product_id:int) -> dict[int, int]:
+        """Quantity reserved by the orders in 'check' per product, for a product_id range"""
+        statement = (
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .join(Order, Order.order_id == OrderItem.order_id) # type: ignore
+            .where(
+                Order.status == "check",
+                OrderItem.product_id >= first_product_id,
+                OrderItem.product_id <= last_product_id
+            )
+            .group_by(OrderItem.product_id)
+        )
+        return {product_id: int(quantity) for product_id, quantity in self.session.exec(statement).all()}
+
+    def update_orders_status(self, order_ids:list[int], new_status:str) -> int:
+        """Set the status of many orders with a single UPDATE, without committing"""
+        if not order_ids:
+            return 0
+        statement = (
+            update(Order)
+            .where(Order.order_id.in_(order_ids)) # type: ignore
+            .values(status=new_status, updated_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        return self.session.exec(statement).rowcount # type: ignore
+
+    def delete_order_items(self,order_id:int) -> int:
+        """Delete every item of an order with a single DELETE, without committing"""
+        statement = delete(OrderItem).where(OrderItem.order_id == order_id) # type: ignore
+        return self.session.exec(statement).rowcount # type: ignore
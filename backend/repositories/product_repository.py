@@ -1,6 +1,16 @@
-from typing import Optional
+from typing import Any, Optional
 from sqlmodel import Session, select
+from sqlalchemy import exists, func, literal, or_, tuple_, text
 from models.product import Product
+from models.category import CategoryProductLink
+from db.search import PG_SEARCH_VECTOR, fts5_match_expression
+
+SEARCH_COLUMNS = "p.product_id, p.title, p.author, p.isbn, p.publisher, p.publication_year, p.price, p.front_page_url"
+
+def like_pattern(query: str) -> str:
+    """Substring LIKE pattern matching the query literally (wildcards escaped with a backslash)"""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
 class ProductRepository:
     def __init__(self, session: Session):
@@ -10,6 +20,141 @@ class ProductRepository:
         statement = select(Product).where(Product.product_id == product_id)
         return self.session.exec(statement).first()
 
+    def get_products_by_ids(self, product_ids: list[int]) -> dict[int, Product]:
+        """Get many products with a single IN query, keyed by product_id"""
+        if not product_ids:
+            return {}
+        statement = select(Product).where(Product.product_id.in_(set(product_ids)))  # type: ignore
+        return {product.product_id: product for product in self.session.exec(statement).all()}  # type: ignore
+
     def get_products(self, limit: int = 10, offset: int = 0) -> list[Product]:
-        statement = select(Product).offset(offset).limit(limit)
-        return list(self.session.exec(statement).all())
\ No newline at end of file
+        statement = select(Product).order_by(Product.product_id).offset(offset).limit(limit)
+        return list(self.session.exec(statement).all())
+
+    def get_catalog(
+        self,
+        fields: list[str],
+        filters: dict[str, Any],
+        sort: str = "product_id",
+        descending: bool = False,
+        limit: int = 10,
+        offset: int = 0,
+        after: Optional[tuple[Any, int]] = None,
+        backwards: bool = False,
+        with_total: bool = False
+    ) -> tuple[list[dict], Optional[int]]:
+        """Get a page of the catalog as plain dicts with only the requested columns.
+
+        Pages by offset, or by keyset on (sort column, product_id) when `after` is given
+        (the rows right before it when backwards is True). The total of matching products
+        comes from a window function when with_total is True (None for an empty page).
+        """
+        sort_column = getattr(Product, sort)
+        columns = [getattr(Product, field) for field in fields]
+        if with_total:
+            columns.append(func.count().over().label("total"))
+        statement = self._filter_catalog(select(*columns), filters)
+        # Ordenar hacia atrás equivale a invertir el orden y luego la página
+        reverse = descending != backwards
+        if after is not None:
+            position = tuple_(sort_column, Product.product_id)
+            statement = statement.where(position < tuple_(*after) if reverse else position > tuple_(*after))
+        if reverse:
+            statement = statement.order_by(sort_column.desc(), Product.product_id.desc()) # type: ignore
+        else:
+            statement = statement.order_by(sort_column.asc(), Product.product_id.asc()) # type: ignore
+        statement = statement.limit(limit)
+        if after is None:
+            statement = statement.offset(offset)
+        rows = [dict(row._mapping) for row in self.session.exec(statement).all()] # type: ignore
+        if backwards:
+            rows.reverse()
+        total = None
+        if with_total:
+            total = rows[0]["total"] if rows else None
+            for row in rows:
+                del row["total"]
+        return rows, total
+
+    def count_catalog(self, filters: dict[str, Any]) -> int:
+        """Count the products matching the catalog filters"""
+        statement = self._filter_catalog(select(func.count(Product.product_id)), filters) # type: ignore
+        return self.session.exec(statement).one()
+
+    def _filter_catalog(self, statement, filters: dict[str, Any]):
+        if filters.get("author") is not None:
+            statement = statement.where(Product.author == filters["author"])
+        if filters.get("publisher") is not None:
+            statement = statement.where(Product.publisher == filters["publisher"])
+        if filters.get("publication_year") is not None:
+            statement = statement.where(Product.publication_year == filters["publication_year"])
+        if filters.get("min_price") is not None:
+            statement = statement.where(Product.price >= filters["min_price"])
+        if filters.get("max_price") is not None:
+            statement = statement.where(Product.price <= filters["max_price"])
+        if filters.get("category_id") is not None:
+            statement = statement.where(
+                exists().where(
+                    CategoryProductLink.product_id == Product.product_id,
+                    CategoryProductLink.category_id == filters["category_id"]
+                )
+            )
+        return statement
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> tuple[list[dict], int]:
+        """Full-text search over title, author, isbn and description, best matches first.
+
+        Uses the tsvector/trigram GIN indexes on PostgreSQL and the FTS5 table on SQLite.
+        Returns the page of rows (with their rank) and the total of matches.
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = text(f"""
+                SELECT {SEARCH_COLUMNS},
+                       ts_rank_cd({PG_SEARCH_VECTOR}, q.tsq) + similarity(p.title, :q) AS rank,
+                       count(*) OVER () AS total
+                FROM product p, websearch_to_tsquery('simple', :q) AS q(tsq)
+                WHERE {PG_SEARCH_VECTOR} @@ q.tsq
+                   OR p.title % :q
+                   OR p.isbn ILIKE :pattern ESCAPE '\\'
+                ORDER BY rank DESC, p.product_id
+                LIMIT :limit OFFSET :offset
+            """).bindparams(q=query, pattern=like_pattern(query), limit=limit, offset=offset)
+        elif dialect == "sqlite":
+            match = fts5_match_expression(query)
+            if not match:
+                return [], 0
+            statement = text(f"""
+                SELECT {SEARCH_COLUMNS}, m.rank, count(*) OVER () AS total
+                FROM (
+                    SELECT rowid, -bm25(product_fts) AS rank
+                    FROM product_fts
+                    WHERE product_fts MATCH :match
+                ) AS m
+                JOIN product p ON p.product_id = m.rowid
+                ORDER BY m.rank DESC, p.product_id
+                LIMIT :limit OFFSET :offset
+            """).bindparams(match=match, limit=limit, offset=offset)
+        else:
+            # Sin índice de texto completo: coincidencia parcial sin ranking
+            pattern = like_pattern(query)
+            statement = (
+                select(
+                    Product.product_id, Product.title, Product.author, Product.isbn, Product.publisher, # type: ignore
+                    Product.publication_year, Product.price, Product.front_page_url,
+                    literal(0.0).label("rank"), func.count().over().label("total")
+                )
+                .where(or_(
+                    Product.title.ilike(pattern, escape="\\"), # type: ignore
+                    Product.author.ilike(pattern, escape="\\"), # type: ignore
+                    Product.isbn.ilike(pattern, escape="\\") # type: ignore
+                ))
+                .order_by(Product.product_id)
+                .limit(limit)
+                .offset(offset)
+            )
+        rows = [dict(row._mapping) for row in self.session.exec(statement).all()] # type: ignore
+        total = rows[0]["total"] if rows else 0
+        for row in rows:
+            del row["total"]
+        return rows, total
@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
 from models.user import User
 from services.auth_service import get_password_hash
@@ -23,8 +24,8 @@ class UserRepository:
         statement = select(User).where(User.user_id == user_id)
         return self.session.exec(statement).first()
     
-    def create_user(self, username: str, email: str, ID: int, name: str, last_name: str, password: str) -> User:
-        """Create a new user"""
+    def create_user(self, username: str, email: str, ID: int, name: str, last_name: str, password: str = "", password_hash: Optional[str] = None) -> User:
+        """Create a new user (pass password_hash to skip hashing here)"""
         existing_id = self.session.exec(select(User).where(User.ID == ID)).first()
         if existing_id:
             raise ValueError(f"El ID {ID} ya está en uso")
@@ -35,7 +36,7 @@ class UserRepository:
             name=name,
             last_name=last_name,
             ID=ID,
-            password_hash=get_password_hash(password)
+            password_hash=password_hash or get_password_hash(password)
         )
         
         self.session.add(user)
@@ -49,4 +50,49 @@ class UserRepository:
     
     def email_exists(self, email: str) -> bool:
         """Check if email already exists"""
-        return self.get_user_by_email(email) is not None
\ No newline at end of file
+        return self.get_user_by_email(email) is not None
+
+
+class AsyncUserRepository:
+    """UserRepository for an AsyncSession (hash passwords before calling create_user)"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        statement = select(User).where(User.username == username)
+        return (await self.session.exec(statement)).first()
+
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        statement = select(User).where(User.email == email)
+        return (await self.session.exec(statement)).first()
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        statement = select(User).where(User.user_id == user_id)
+        return (await self.session.exec(statement)).first()
+
+    async def ID_exists(self, ID: int) -> bool:
+        return (await self.session.exec(select(User.user_id).where(User.ID == ID))).first() is not None
+
+    async def create_user(self, username: str, email: str, ID: int, name: str, last_name: str, password_hash: str) -> User:
+        """Create a new user from an already computed password hash"""
+        if await self.ID_exists(ID):
+            raise ValueError(f"El ID {ID} ya está en uso")
+        user = User(
+            username=username,
+            email=email,
+            name=name,
+            last_name=last_name,
+            ID=ID,
+            password_hash=password_hash
+        )
+        self.session.add(user)
+        await self.session.commit()
+        await self.session.refresh(user)
+        return user
+
+    async def username_exists(self, username: str) -> bool:
+        return await self.get_user_by_username(username) is not None
+
+    async def email_exists(self, email: str) -> bool:
+        return await self.get_user_by_email(email) is not None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import ClassVar, List
+from typing import ClassVar, List, Optional
 from datetime import datetime , timezone
 from enum import Enum
 
@@ -13,6 +13,7 @@ class OrdenStatus(str,Enum):
     CHECK="check"
     COMPLETED="completed"
     CANCELED="canceled"
+    EXPIRED="expired"
 
 class CreateItemRequest(BaseModel):
     """Request model for creating an item in an order.
@@ -171,6 +172,8 @@ class OrderListResponse(BaseModel):
     total_pages: int = Field(..., description="Total number of pages", ge=0)
     has_next: bool = Field(..., description="Whether there are more pages")
     has_previous: bool = Field(..., description="Whether there are previous pages")
+    next_cursor: Optional[str] = Field(default=None, description="Opaque cursor for the next page (cursor pagination)")
+    previous_cursor: Optional[str] = Field(default=None, description="Opaque cursor for the previous page (cursor pagination)")
     
     class Config:
         schema_extra = {
@@ -196,6 +199,8 @@ class OrderListResponse(BaseModel):
                 "page_size": 10,
                 "total_pages": 2,
                 "has_next": True,
-                "has_previous": False
+                "has_previous": False,
+                "next_cursor": "eyJrIjpbIjIwMjQtMDEtMTRUMDk6MTU6MDAiLDJdLCJkIjoibmV4dCJ9",
+                "previous_cursor": None
             }
         }
\ No newline at end of file
@@ -1,3 +1,5 @@
+from enum import Enum
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class ListInventoryResponse(BaseModel):
@@ -9,6 +11,51 @@ class ListInventoryResponse(BaseModel):
     quantity: int
     reserved: int
 
+class ListInventoryPageResponse(BaseModel):
+    inventory: List[ListInventoryResponse]
+    has_next: bool
+    has_previous: bool
+    next_cursor: Optional[str] = Field(default=None, description="Cursor de la página siguiente")
+    previous_cursor: Optional[str] = Field(default=None, description="Cursor de la página anterior")
+
 class ListInventoryUpdateResponse(BaseModel):
     title: str
-    quantity: int
\ No newline at end of file
+    quantity: int
+
+class InventoryAdjustmentMode(str, Enum):
+    ABSOLUTE = "absolute"
+    DELTA = "delta"
+
+class InventoryAdjustmentItem(BaseModel):
+    product_id: int
+    quantity: int = Field(..., description="Cantidad final (absolute) o variación (delta)")
+    mode: InventoryAdjustmentMode = InventoryAdjustmentMode.ABSOLUTE
+
+class InventoryAdjustmentRequest(BaseModel):
+    items: List[InventoryAdjustmentItem] = Field(..., min_length=1)
+
+class InventoryAdjustmentResult(BaseModel):
+    product_id: int
+    title: str
+    previous_quantity: int
+    quantity: int
+    reserved: int
+    created: bool
+
+class InventoryAdjustmentRejected(BaseModel):
+    product_id: int
+    reason: str
+
+class InventoryAdjustmentResponse(BaseModel):
+    updated: int
+    created: int
+    results: List[InventoryAdjustmentResult]
+    not_found: List[int]
+    rejected: List[InventoryAdjustmentRejected]
+
+class InventoryImportResponse(BaseModel):
+    received: int
+    updated: int
+    created: int
+    not_found: List[int]
+    rejected: List[InventoryAdjustmentRejected]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import ClassVar, List
+from typing import ClassVar, List, Optional
 from datetime import datetime , timezone
 from enum import Enum
 
@@ -15,13 +15,13 @@ class ProductBase(BaseModel):
     language: str
     publisher: str
     publication_year: int
-    description : str
+    description : Optional[str] = None
     price: float
     pages: int
     currency: str
     weight: float 
     dimensions: str
-    front_page_url: str 
+    front_page_url: Optional[str] = None
     class Config:
         schema_extra = {
             "example": {
@@ -44,7 +44,76 @@ class ProductBase(BaseModel):
             }
         }
 
+class CatalogProduct(BaseModel):
+    """A product of the catalog listing.
+
+    With a sparse fieldset only product_id and the selected fields are present.
+    """
+    product_id: int
+    title: Optional[str] = None
+    author: Optional[str] = None
+    isbn: Optional[str] = None
+    format: Optional[str] = None
+    edition: Optional[str] = None
+    language: Optional[str] = None
+    publisher: Optional[str] = None
+    publication_year: Optional[int] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    pages: Optional[int] = None
+    currency: Optional[str] = None
+    weight: Optional[float] = None
+    dimensions: Optional[str] = None
+    front_page_url: Optional[str] = None
+
 class ProductsResponse(BaseModel):
-    """Response model for a list of products.
+    """Response model for a page of the catalog.
+
+    When a sparse fieldset is requested each product only carries the selected fields.
+    """
+    products: List[CatalogProduct] = Field(..., description="List of products")
+    total: Optional[int] = Field(default=None, description="Total number of matching products (not computed in cursor mode)")
+    page: int = Field(default=1, description="Current page number", gt=0)
+    page_size: int = Field(default=10, description="Number of products per page", gt=0)
+    total_pages: Optional[int] = Field(default=None, description="Total number of pages (not computed in cursor mode)")
+    has_next: bool = Field(default=False, description="Whether there are more pages")
+    has_previous: bool = Field(default=False, description="Whether there are previous pages")
+    next_cursor: Optional[str] = Field(default=None, description="Opaque cursor for the next page")
+    previous_cursor: Optional[str] = Field(default=None, description="Opaque cursor for the previous page")
+
+class ProductSearchItem(BaseModel):
+    """A product matched by the catalog search, with its relevance.
+    """
+    product_id: int
+    title: str
+    author: str
+    isbn: str
+    publisher: str
+    publication_year: int
+    price: float
+    front_page_url: Optional[str] = None
+    rank: float = Field(..., description="Relevance of the match (higher is better)")
+
+class ProductSearchResponse(BaseModel):
+    """Response model for a page of search results.
+    """
+    query: str
+    products: List[ProductSearchItem] = Field(..., description="Matching products, best matches first")
+    total: int = Field(..., description="Total number of matches", ge=0)
+    page: int = Field(..., description="Current page number", gt=0)
+    page_size: int = Field(..., description="Number of products per page", gt=0)
+    total_pages: int = Field(..., description="Total number of pages", ge=0)
+    has_next: bool = Field(..., description="Whether there are more pages")
+    has_previous: bool = Field(..., description="Whether there are previous pages")
+
+class ProductAvailability(BaseModel):
+    """Sellable stock of a product.
+    """
+    product_id: int
+    available: int = Field(..., description="Units that can still be ordered (quantity - reserved)", ge=0)
+    in_stock: bool
+
+class ProductAvailabilityResponse(BaseModel):
+    """Response model for a batch availability lookup, in the order requested.
     """
-    products: List[ProductBase] = Field(..., description="List of products")
\ No newline at end of file
+    products: List[ProductAvailability]
@@ -0,0 +1,44 @@
+"""
+Worker que libera las reservas de órdenes abandonadas en estado 'check'.
+
+Las órdenes que llevan más de RESERVATION_TTL_MINUTES en 'check' pasan a 'expired'
+y su stock reservado vuelve a estar disponible.
+
+Uso:
+    python scripts/expire_reservations.py           # barrido periódico (RESERVATION_SWEEP_INTERVAL_SECONDS)
+    python scripts/expire_reservations.py --once    # un solo barrido
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import logging
+import signal
+from sqlmodel import Session
+
+# Añadir el directorio raíz del proyecto al path para poder importar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import engine
+from services.reservation_sweeper import run_sweeper, sweep_expired_reservations
+
+def session_factory() -> Session:
+    return Session(engine)
+
+async def run_forever():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await run_sweeper(session_factory, stop)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Liberar reservas de órdenes vencidas")
+    parser.add_argument("--once", action="store_true", help="Ejecutar un solo barrido y salir")
+    args = parser.parse_args()
+    if args.once:
+        print(f"Órdenes expiradas: {sweep_expired_reservations(session_factory)}")
+    else:
+        asyncio.run(run_forever())
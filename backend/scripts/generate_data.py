@@ -0,0 +1,54 @@
+"""
+Script que genera y carga datos sintéticos a escala de producción.
+
+Las filas se generan de forma determinista a partir de --seed y se cargan con COPY
+(PostgreSQL) o executemany por lotes, después de los datos existentes (db.seed incluido).
+
+Uso:
+    python scripts/generate_data.py --products 1000000 --users 100000 --orders 2000000
+    python scripts/generate_data.py --products 1000 --orders 0 --seed 7
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Añadir el directorio raíz del proyecto al path para poder importar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.database import engine
+from db.bootstrap import bootstrap
+from db.synthetic import SyntheticScale, load
+
+if __name__ == "__main__":
+    defaults = SyntheticScale()
+    parser = argparse.ArgumentParser(description="Generar y cargar datos sintéticos")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Semilla (misma semilla, mismos datos)")
+    parser.add_argument("--categories", type=int, default=defaults.categories)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--orders", type=int, default=defaults.orders)
+    parser.add_argument("--max-items-per-order", type=int, default=defaults.max_items_per_order)
+    parser.add_argument("--batch-size", type=int, default=10000, help="Filas por lote (una transacción por lote)")
+    args = parser.parse_args()
+
+    scale = SyntheticScale(
+        seed=args.seed,
+        categories=args.categories,
+        products=args.products,
+        users=args.users,
+        orders=args.orders,
+        max_items_per_order=args.max_items_per_order,
+    )
+    bootstrap(engine)
+    started = time.perf_counter()
+
+    def progress(table: str, loaded: int) -> None:
+        print(f"\r{table}: {loaded} filas ({time.perf_counter() - started:.1f}s)", end="", flush=True)
+
+    loaded = load(engine, scale, args.batch_size, progress)
+    print()
+    for table, rows in loaded.items():
+        print(f"{table}: {rows} filas")
+    print(f"Carga completa en {time.perf_counter() - started:.1f}s")
@@ -1,9 +1,14 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from core.config import settings
+from services import token_cache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,6 +21,86 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+
+class PasswordHashPoolBusy(Exception):
+    """Too many password hashes already waiting for a worker"""
+
+
+class PasswordHashPool:
+    """Bounded thread pool for bcrypt, so hashing never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads run in parallel. At most
+    `max_pending` calls may be queued or running; beyond that calls are rejected
+    instead of piling up. Keeps queue/wait/run counters for monitoring.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHashPoolBusy()
+            self.pending += 1
+        queued_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.wait_seconds_total += started_at - queued_at
+                self.wait_seconds_max = max(self.wait_seconds_max, started_at - queued_at)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.run_seconds_total += time.perf_counter() - started_at
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(task))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "queued": self.pending - self.running,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "run_seconds_total": round(self.run_seconds_total, 6),
+            }
+
+
+password_hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password hash pool"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password hash pool"""
+    return await password_hash_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -29,7 +114,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def verify_token(token: str) -> dict:
-    """Verify and decode JWT token"""
+    """Verify and decode JWT token (already verified tokens come from the token cache)"""
+    cached = token_cache.get_claims(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
         username: str = payload.get("sub")
@@ -39,6 +127,7 @@ def verify_token(token: str) -> dict:
                 detail="Token inválido",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        token_cache.store_claims(token, payload)
         return payload
     except JWTError:
         raise HTTPException(
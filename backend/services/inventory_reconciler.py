@@ -0,0 +1,94 @@
+import json
+import logging
+import time
+from typing import Callable, Optional
+
+from sqlmodel import Session
+
+from core.config import settings
+from repositories.audit_log_repository import AuditLogRepository
+from repositories.inventory_repository import InventoryRepository
+from repositories.order_repository import OrderRepository
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_chunk(session: Session, actor_id: int, after_product_id: int, batch_size: int, dry_run: bool = False) -> dict:
+    """Reconcile the reserved stock of the next `batch_size` products after after_product_id.
+
+    Locks the inventory rows, sums the open ('check') order items of the same product range
+    with one aggregate query, rewrites the reserved column of the rows that differ with one
+    batched UPDATE and records an AuditLog entry per correction, then commits. A dry run
+    rolls back instead. Returns the chunk report, with last_product_id None when no row is left.
+    """
+    inventory_repo = InventoryRepository(session)
+    order_repo = OrderRepository(session)
+    try:
+        rows = inventory_repo.lock_stock_chunk(after_product_id, batch_size)
+        if not rows:
+            session.rollback()
+            return {"checked": 0, "corrections": [], "oversold": [], "last_product_id": None}
+        expected = order_repo.get_reserved_quantities(rows[0][1], rows[-1][1])
+        corrections, oversold = [], []
+        for inventory_id, product_id, quantity, reserved in rows:
+            expected_reserved = expected.get(product_id, 0)
+            if expected_reserved != reserved:
+                corrections.append({
+                    "inventory_id": inventory_id,
+                    "product_id": product_id,
+                    "reserved": reserved,
+                    "expected": expected_reserved
+                })
+            if expected_reserved > quantity:
+                oversold.append({"product_id": product_id, "quantity": quantity, "expected": expected_reserved})
+        if dry_run or not corrections:
+            session.rollback()
+        else:
+            inventory_repo.set_reserved_many([(c["product_id"], c["expected"]) for c in corrections])
+            AuditLogRepository(session).add_many([
+                {
+                    "actor_id": actor_id,
+                    "action": "reconcile",
+                    "object_type": "inventory",
+                    "object_id": c["inventory_id"],
+                    "before_state": json.dumps({"reserved": c["reserved"]}),
+                    "after_state": json.dumps({"reserved": c["expected"]}),
+                    "description": f"Reservado recalculado para el producto {c['product_id']}"
+                }
+                for c in corrections
+            ])
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return {"checked": len(rows), "corrections": corrections, "oversold": oversold, "last_product_id": rows[-1][1]}
+
+def reconcile_inventory(
+    session_factory: Callable[[], Session],
+    actor_id: int,
+    dry_run: bool = False,
+    batch_size: Optional[int] = None
+) -> dict:
+    """Reconcile the whole inventory chunk by chunk (one short transaction per chunk, so
+    checkouts are only blocked on the rows being reconciled). Returns the report."""
+    batch_size = batch_size or settings.INVENTORY_RECONCILE_BATCH_SIZE
+    started = time.perf_counter()
+    report = {"dry_run": dry_run, "checked": 0, "corrected": 0, "corrections": [], "oversold": []}
+    after_product_id = 0
+    while True:
+        with session_factory() as session:
+            chunk = reconcile_chunk(session, actor_id, after_product_id, batch_size, dry_run)
+        report["checked"] += chunk["checked"]
+        report["corrections"].extend(chunk["corrections"])
+        report["oversold"].extend(chunk["oversold"])
+        if chunk["checked"] < batch_size:
+            break
+        after_product_id = chunk["last_product_id"]
+    report["mismatched"] = len(report["corrections"])
+    report["corrected"] = 0 if dry_run else report["mismatched"]
+    report["duration_seconds"] = round(time.perf_counter() - started, 3)
+    if report["corrected"]:
+        logger.info("Inventario conciliado: %s reservas corregidas", report["corrected"])
+    if report["oversold"]:
+        logger.warning("Productos con más reservas que existencias: %s", [o["product_id"] for o in report["oversold"]])
+    return report
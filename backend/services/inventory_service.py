@@ -0,0 +1,207 @@
+import codecs
+import csv
+import io
+import json
+from sqlmodel import Session
+from repositories.inventory_repository import InventoryRepository, STOCK_SORT_COLUMNS
+from core.pagination import decode_position, page_cursors, trim_keyset_page
+from core.errors import BusinessError
+from core.config import settings
+from typing import AsyncIterator, Iterator, List, Optional
+
+IMPORT_FORMATS = ["csv", "ndjson"]
+EXPORT_COLUMNS = ["product_id", "title", "author", "isbn", "price", "quantity", "reserved"]
+
+class InventoryImportError(BusinessError):
+    def __init__(self, message: str, line: int):
+        self.message = message
+        self.line = line
+        super().__init__(f"Línea {line}: {message}")
+
+
+def _stock_sort_value(row: dict, sort_field: str):
+    return row["quantity"] - row["reserved"] if sort_field == "effective" else row[sort_field]
+
+def list_inventory(
+    session: Session,
+    title: Optional[str] = None,
+    isbn: Optional[str] = None,
+    low_stock_below: Optional[int] = None,
+    sort: str = "title",
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> dict:
+    """One page of the stock listing with the cursors of the next and previous pages.
+
+    `sort` is title, quantity, reserved or effective, prefixed with "-" for descending order.
+    """
+    descending = sort.startswith("-")
+    sort_field = sort.lstrip("-")
+    if sort_field not in STOCK_SORT_COLUMNS:
+        raise BusinessError(f"Orden no soportado: {sort}. Opciones: {', '.join(STOCK_SORT_COLUMNS)}")
+    after, backwards = decode_position(cursor, sort) if cursor else (None, False)
+    rows = InventoryRepository(session).list_stock(
+        title, isbn, low_stock_below, sort_field, descending,
+        limit=limit + 1, after=after, backwards=backwards
+    )
+    rows, has_next, has_previous = trim_keyset_page(rows, limit, backwards, from_cursor=cursor is not None)
+    next_cursor, previous_cursor = page_cursors(
+        rows, has_next, has_previous, lambda row: [sort, _stock_sort_value(row, sort_field), row["product_id"]]
+    )
+    return {
+        "inventory": rows,
+        "has_next": has_next,
+        "has_previous": has_previous,
+        "next_cursor": next_cursor,
+        "previous_cursor": previous_cursor
+    }
+
+def adjust_inventory(session: Session, adjustments: List[dict]) -> dict:
+    """Apply many stock adjustments ({product_id, quantity, mode}) in a single transaction.
+
+    Rows are written in batches of INVENTORY_ADJUST_BATCH_SIZE products (two queries and two
+    writes per batch). Unknown products and rows that would drop below the reserved stock are
+    reported and skipped; everything else is committed together.
+    """
+    by_product = {}
+    duplicates = set()
+    for adjustment in adjustments:
+        if adjustment["product_id"] in by_product:
+            duplicates.add(adjustment["product_id"])
+        by_product[adjustment["product_id"]] = (adjustment["mode"], adjustment["quantity"])
+    if duplicates:
+        raise BusinessError(f"Productos repetidos en el ajuste: {', '.join(map(str, sorted(duplicates)))}")
+
+    inventory_repo = InventoryRepository(session)
+    product_ids = sorted(by_product)
+    batch_size = settings.INVENTORY_ADJUST_BATCH_SIZE
+    results, not_found, rejected = [], [], []
+    try:
+        for start in range(0, len(product_ids), batch_size):
+            batch = {product_id: by_product[product_id] for product_id in product_ids[start:start + batch_size]}
+            batch_results, batch_not_found, batch_rejected = inventory_repo.adjust_stock_many(batch)
+            results.extend(batch_results)
+            not_found.extend(batch_not_found)
+            rejected.extend(batch_rejected)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    created = sum(1 for result in results if result["created"])
+    return {
+        "updated": len(results) - created,
+        "created": created,
+        "results": results,
+        "not_found": not_found,
+        "rejected": rejected
+    }
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 body into lines without holding more than one chunk in memory"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield pending.rstrip("\r")
+
+
+class InventoryImporter:
+    """Incremental stock import: feed it the lines of a CSV (header with product_id, quantity and
+    optionally mode) or NDJSON body as they arrive; every INVENTORY_ADJUST_BATCH_SIZE valid lines
+    form a batch that apply() writes. Everything is one transaction, committed by finish().
+    """
+
+    def __init__(self, session: Session, format: str = "csv"):
+        if format not in IMPORT_FORMATS:
+            raise BusinessError(f"Formato no soportado: {format}. Opciones: {', '.join(IMPORT_FORMATS)}")
+        self.session = session
+        self.format = format
+        self.inventory_repo = InventoryRepository(session)
+        self.batch_size = settings.INVENTORY_ADJUST_BATCH_SIZE
+        self.header: Optional[List[str]] = None
+        self.line_number = 0
+        self.seen: set = set()
+        self.pending: List[tuple] = []
+        self.summary = {"received": 0, "updated": 0, "created": 0, "not_found": [], "rejected": []}
+
+    def feed(self, line: str) -> Optional[List[tuple]]:
+        """Parse one line; returns a full batch when one is ready"""
+        self.line_number += 1
+        if not line.strip():
+            return None
+        if self.format == "csv" and self.header is None:
+            self.header = [column.strip() for column in next(csv.reader([line]))]
+            if not {"product_id", "quantity"} <= set(self.header):
+                raise InventoryImportError("La cabecera debe incluir product_id y quantity", self.line_number)
+            return None
+        product_id, mode, quantity = self._parse(line)
+        if product_id in self.seen:
+            raise InventoryImportError(f"Producto {product_id} repetido en la importación", self.line_number)
+        self.seen.add(product_id)
+        self.summary["received"] += 1
+        self.pending.append((product_id, mode, quantity))
+        if len(self.pending) >= self.batch_size:
+            batch, self.pending = self.pending, []
+            return batch
+        return None
+
+    def apply(self, batch: List[tuple]) -> None:
+        result = self.inventory_repo.import_stock_batch(batch)
+        self.summary["updated"] += result["updated"]
+        self.summary["created"] += result["created"]
+        self.summary["not_found"].extend(result["not_found"])
+        self.summary["rejected"].extend(result["rejected"])
+
+    def finish(self) -> dict:
+        """Apply the last partial batch and commit the whole import"""
+        if self.format == "csv" and self.header is None:
+            raise InventoryImportError("Archivo vacío", self.line_number)
+        batch, self.pending = self.pending, []
+        self.apply(batch)
+        self.session.commit()
+        return self.summary
+
+    def _parse(self, line: str) -> tuple:
+        try:
+            if self.format == "csv":
+                record = dict(zip(self.header, next(csv.reader([line])))) # type: ignore
+            else:
+                record = json.loads(line)
+            product_id = int(record["product_id"])
+            quantity = int(record["quantity"])
+            mode = (record.get("mode") or "absolute").strip()
+        except (KeyError, ValueError, TypeError, AttributeError):
+            raise InventoryImportError("Se esperaba product_id y quantity enteros", self.line_number)
+        if mode not in ("absolute", "delta"):
+            raise InventoryImportError(f"Modo no soportado: {mode}", self.line_number)
+        return product_id, mode, quantity
+
+
+def export_inventory(session: Session, format: str = "csv", batch_size: int = 1000) -> Iterator[str]:
+    """Stream the stock table as CSV or NDJSON text chunks (one chunk per `batch_size` rows).
+
+    Rows are read with a server-side cursor, so memory does not grow with the table.
+    """
+    if format not in IMPORT_FORMATS:
+        raise BusinessError(f"Formato no soportado: {format}. Opciones: {', '.join(IMPORT_FORMATS)}")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(InventoryRepository(session).iter_stock(batch_size), start=1):
+        if format == "csv":
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n")
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,10 +1,13 @@
 from sqlmodel import Session
 from repositories.order_repository import OrderRepository
-from repositories.product_repository import ProductRepository
 from repositories.inventory_repository import InventoryRepository
+from services import product_cache
+from core.metrics import order_transitions, reservation_failures
 from models.order import Order, OrderItem
 import math
 from models.product import Product
+from core.errors import BusinessError
+from core.pagination import decode_position, page_cursors, trim_keyset_page
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Tuple, TypedDict
 
@@ -16,9 +19,6 @@ class OrderItemDetail(TypedDict):
     unit_price: float
     sub_total: float
 
-class BusinessError(Exception):
-    pass
-
 class InsufficientStockError(BusinessError):
     def __init__(self, message: str, product_ids: List[int], available_stock: Optional[Dict[int, Dict[str, Any]]] = None):
         self.message = message
@@ -37,30 +37,39 @@ class ProductNotFoundError(BusinessError):
 def create_order(session:Session, user_id:int, items_data:list[dict]) -> Tuple[Order, List[OrderItemDetail]]:
     try:
         order_repo = OrderRepository(session)
-        product_repo = ProductRepository(session)
-        total=0.0 
-        order = order_repo.create_order(user_id=user_id)
-        if order.order_id is None:
-            raise BusinessError("No se pudo crear la orden correctamente")
+        products = product_cache.get_products(session, [item["product_id"] for item in items_data])
+        lines = []
         for item in items_data:
-            product=product_repo.get_product_by_id(item["product_id"])
+            product = products.get(item["product_id"])
             if not product:
                 raise ProductNotFoundError(
                     message=f"Producto con ID {item['product_id']} no encontrado",
                     product_id=item["product_id"]
                 )
-            unit_price= product.price
-            sub_total = unit_price * item["quantity"]
-            oi = order_repo.create_order_item(order.order_id,[{ # type: ignore
-                "product_id":item["product_id"],
-                "quantity":item["quantity"],
-                "unit_price":unit_price,
-                "sub_total":sub_total
-            }])
-            total += sub_total
-        order.total = total
+            lines.append({
+                "product_id": item["product_id"],
+                "quantity": item["quantity"],
+                "unit_price": product.price,
+                "sub_total": product.price * item["quantity"]
+            })
+        order, order_items = order_repo.create_order_with_items(user_id, lines)
+        if order.order_id is None:
+            raise BusinessError("No se pudo crear la orden correctamente")
+        # La respuesta se arma en memoria, antes del commit, para no volver a consultar la orden
+        items_details: List[OrderItemDetail] = [
+            {
+                "order_item_id": oi.order_item_id, # type: ignore
+                "product_id": oi.product_id,
+                "product_title": products[oi.product_id].title,
+                "quantity": oi.quantity,
+                "unit_price": oi.unit_price,
+                "sub_total": oi.sub_total
+            }
+            for oi in order_items
+        ]
         session.commit()
-        return get_order_details(session, order.order_id)
+        order_transitions.inc(from_status="none", to_status="draft")
+        return order, items_details
     except BusinessError as be:
         session.rollback()
         raise be
@@ -68,68 +77,76 @@ def create_order(session:Session, user_id:int, items_data:list[dict]) -> Tuple[O
         session.rollback()
         raise BusinessError(f"Error al crear la orden: {str(e)}")
 
+def _quantities_by_product(order_items: List[OrderItem]) -> Dict[int, int]:
+    """Sum the requested quantity per product (an order may repeat a product)"""
+    quantities: Dict[int, int] = {}
+    for item in order_items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
 def validate_order(session:Session, order_id:int) -> Tuple[Order, List[OrderItemDetail]]:
     try:
         order_repo = OrderRepository(session)
         inventory_repo = InventoryRepository(session)
-        product_repo = ProductRepository(session)
-        order = order_repo.get_order_by_id(order_id)
+        # Bloquear la orden: dos validaciones concurrentes no pueden reservar el stock dos veces
+        order = order_repo.get_order_by_id(order_id, for_update=True)
         if not order:
             raise BusinessError(f"Orden con ID {order_id} no encontrada")
         if order.status != 'draft':
             raise BusinessError(f"Orden con ID {order_id} no está en estado 'draft'")
         order_items = order_repo.get_order_items(order_id)
-        insufficient_stock_products = []
-        available_stock_info = {}
-        for item in order_items:
-            effective_quantity = inventory_repo.get_effective_quantity(item.product_id)
-            if effective_quantity is None or effective_quantity < item.quantity:
-                insufficient_stock_products.append(item.product_id)
-                product = product_repo.get_product_by_id(item.product_id)
-                if product:
-                    available_stock_info[item.product_id] = {
-                        "product_id": item.product_id,
-                        "product_title": product.title if hasattr(product, 'title') else "Unknown",
-                        "available_quantity": effective_quantity or 0,
-                        "requested_quantity": item.quantity
-                    }
-        if insufficient_stock_products:
+        shortfalls = inventory_repo.reserve_stock_many(_quantities_by_product(order_items))
+        if shortfalls:
+            # Los productos sin fila de inventario no traen título desde el bloqueo
+            missing = [s["product_id"] for s in shortfalls if s["product_title"] is None]
+            products = product_cache.get_products(session, missing)
+            available_stock_info = {}
+            for shortfall in shortfalls:
+                if shortfall["product_title"] is None:
+                    product = products.get(shortfall["product_id"])
+                    if not product:
+                        continue
+                    shortfall["product_title"] = product.title
+                available_stock_info[shortfall["product_id"]] = shortfall
+            reservation_failures.inc(reason="insufficient_stock")
+            insufficient_stock_products = [s["product_id"] for s in shortfalls]
             products_str = ", ".join(map(str, insufficient_stock_products))
             raise InsufficientStockError(
                 message=f"Stock insuficiente para los productos con ID: {products_str}",
                 product_ids=insufficient_stock_products,
                 available_stock=available_stock_info
             )
-        for item in order_items:
-            success = inventory_repo.reserve_stock(item.product_id, item.quantity)
-            if not success:
-                raise BusinessError(f"No se pudo reservar stock para el producto ID {item.product_id}")
         order_repo.update_order_status(order_id, "check")
         session.commit()
+        order_transitions.inc(from_status="draft", to_status="check")
         return get_order_details(session, order_id)
     except BusinessError as be:
         session.rollback()
         raise be
     except Exception as e:
         session.rollback()
+        reservation_failures.inc(reason="error")
         raise BusinessError(f"Error al validar la orden: {str(e)}")
     
 def confirm_order(session:Session, order_id:int) -> Tuple[Order, List[OrderItemDetail]]:
     try:
         order_repo = OrderRepository(session)
         inventory_repo = InventoryRepository(session)
-        order = order_repo.get_order_by_id(order_id)
+        # Bloquear la orden: el barrido de reservas vencidas no puede expirarla mientras se confirma
+        order = order_repo.get_order_by_id(order_id, for_update=True)
         if not order:
             raise BusinessError(f"Orden con ID {order_id} no encontrada")
         if order.status != 'check':
             raise BusinessError(f"Orden con ID {order_id} no está en estado 'check'")
         order_items = order_repo.get_order_items(order_id)
-        for item in order_items:
-            success = inventory_repo.confirm_reservation(item.product_id, item.quantity)
-            if not success:
-                raise BusinessError(f"No se pudo confirmar la reserva para el producto ID {item.product_id}")
+        failed = inventory_repo.confirm_reservations_many(_quantities_by_product(order_items))
+        if failed:
+            reservation_failures.inc(reason="confirm_failed")
+            products_str = ", ".join(map(str, failed))
+            raise BusinessError(f"No se pudo confirmar la reserva para los productos con ID: {products_str}")
         order_repo.update_order_status(order_id, "completed")
         session.commit()
+        order_transitions.inc(from_status="check", to_status="completed")
         return get_order_details(session, order_id)
     except BusinessError as be:
         session.rollback()
@@ -138,41 +155,40 @@ def confirm_order(session:Session, order_id:int) -> Tuple[Order, List[OrderItemD
         session.rollback()
         raise BusinessError(f"Error al confirmar la orden: {str(e)}")
 
-def get_order_details(session: Session, order_id: int) -> Tuple[Order, List[OrderItemDetail]]:
-    order_repo = OrderRepository(session)
-    product_repo = ProductRepository(session)
-    order = order_repo.get_order_by_id(order_id)
-    if not order:
-        raise BusinessError(f"Orden con ID {order_id} no encontrada")
-    order_items = order_repo.get_order_items(order_id)
+def _items_details(items: List[Tuple[OrderItem, Optional[str]]]) -> List[OrderItemDetail]:
     items_details: List[OrderItemDetail] = []
-    for item in order_items:
+    for item, product_title in items:
         if item.order_item_id is None:
             raise BusinessError(f"Item de orden con product_id {item.product_id} no tiene ID")
-        product = product_repo.get_product_by_id(item.product_id)
-        product_title = product.title if product and hasattr(product, 'title') else "Unknown"
-        item_detail: OrderItemDetail = {
+        items_details.append({
             "order_item_id": item.order_item_id,
             "product_id": item.product_id,
-            "product_title": product_title,
+            "product_title": product_title or "Unknown",
             "quantity": item.quantity,
             "unit_price": item.unit_price,
             "sub_total": item.sub_total
-        }
-        items_details.append(item_detail)
-    
-    return order, items_details
+        })
+    return items_details
+
+def get_order_details(session: Session, order_id: int) -> Tuple[Order, List[OrderItemDetail]]:
+    orders = get_orders_details(session, [order_id])
+    if not orders:
+        raise BusinessError(f"Orden con ID {order_id} no encontrada")
+    return orders[0]
+
+def get_orders_details(session: Session, order_ids: List[int]) -> List[Tuple[Order, List[OrderItemDetail]]]:
+    order_repo = OrderRepository(session)
+    return [
+        (order, _items_details(items))
+        for order, items in order_repo.get_orders_with_items(order_ids)
+    ]
 
 def get_orders_by_user(session: Session, user_id: int, limit: int = 10, offset: int = 0) -> List[Tuple[Order, List[OrderItemDetail]]]:
     order_repo = OrderRepository(session)
-    orders = order_repo.get_orders_by_user(user_id, limit, offset)
-    orders_with_details = []
-    for order in orders:
-        if order.order_id is None:
-            continue
-        items_details = get_order_details(session, order.order_id)[1]
-        orders_with_details.append((order, items_details))
-    return orders_with_details
+    return [
+        (order, _items_details(items))
+        for order, items in order_repo.get_orders_by_user_with_items(user_id, limit, offset)
+    ]
 
 def edit_order_item(session: Session , order_id : int , product_id : int , new_quantity : int)-> OrderItem:
     if new_quantity <= 0:
@@ -212,25 +228,29 @@ def delete_order_item(session: Session , order_id : int , product_id : int ) ->
     order=order_repo.update_order_status(order_id,'draft')
     return True
 
-def get_user_orders(session: Session, user_id: int, page: int = 1, page_size: int = 10) -> dict:
+def _order_cursor_key(order: dict) -> Tuple[datetime, int]:
+    return order["created_at"], order["order_id"]
+
+def get_user_orders(session: Session, user_id: int, page: int = 1, page_size: int = 10, cursor: Optional[str] = None) -> dict:
     order_repo = OrderRepository(session)
-    offset = (page - 1) * page_size
-    orders = order_repo.get_orders_by_user(user_id, limit=page_size, offset=offset)
-    total_orders = order_repo.count_orders_by_user(user_id)
-    total_pages = math.ceil(total_orders / page_size) if total_orders > 0 else 0
-    has_next = page < total_pages
-    has_previous = page > 1
-    order_list = []
-    for order in orders:
-        order_items = order_repo.get_order_items(order.order_id) # type: ignore
-        order_list.append({
-            "order_id": order.order_id,
-            "status": order.status,
-            "total": order.total,
-            "created_at": order.created_at,
-            "items_count": len(order_items)
-        })
-    
+    if cursor:
+        # Paginación por cursor: la posición viene en el cursor y no depende de OFFSET
+        position, backwards = decode_position(cursor, parse_value=datetime.fromisoformat)
+        order_list = order_repo.get_order_summaries_by_user_after(user_id, position, limit=page_size + 1, backwards=backwards)
+        order_list, has_next, has_previous = trim_keyset_page(order_list, page_size, backwards)
+        total_orders = order_repo.count_orders_by_user(user_id)
+        total_pages = math.ceil(total_orders / page_size) if total_orders > 0 else 0
+    else:
+        offset = (page - 1) * page_size
+        order_list, total_orders = order_repo.get_order_summaries_by_user(user_id, limit=page_size, offset=offset)
+        if total_orders is None:
+            # Página vacía: el total no viene en la ventana, solo se cuenta si no es la primera página
+            total_orders = order_repo.count_orders_by_user(user_id) if offset > 0 else 0
+        total_pages = math.ceil(total_orders / page_size) if total_orders > 0 else 0
+        has_next = page < total_pages
+        has_previous = page > 1
+    next_cursor, previous_cursor = page_cursors(order_list, has_next, has_previous, _order_cursor_key)
+
     return {
         "orders": order_list,
         "total_orders": total_orders,
@@ -238,13 +258,15 @@ def get_user_orders(session: Session, user_id: int, page: int = 1, page_size: in
         "page_size": page_size,
         "total_pages": total_pages,
         "has_next": has_next,
-        "has_previous": has_previous
+        "has_previous": has_previous,
+        "next_cursor": next_cursor,
+        "previous_cursor": previous_cursor
     }
     
 def cancel_order(session: Session, order_id:int) -> Order:
     order_repo = OrderRepository(session)
     inventory_repo = InventoryRepository(session)
-    order = order_repo.get_order_by_id(order_id)
+    order = order_repo.get_order_by_id(order_id, for_update=True)
     if not order:
         raise BusinessError(f"Orden con ID {order_id} no encontrada")
     if order.status != 'check' and order.status != 'draft':
@@ -255,17 +277,17 @@ def cancel_order(session: Session, order_id:int) -> Order:
     # Solo liberamos el inventario si la orden está en estado 'check', ya que
     # las órdenes en estado 'draft' no han reservado inventario todavía
     if order.status == 'check':
-        for item in order_items:
-            success_1 = inventory_repo.release_reserved_stock(item.product_id, item.quantity)
-            if not success_1:
-                raise BusinessError(f"No se pudo liberar la reserva para el producto ID {item.product_id}")
+        quantities = _quantities_by_product(order_items)
+        if inventory_repo.release_reserved_stock_many(quantities) != len(quantities):
+            session.rollback()
+            reservation_failures.inc(reason="release_failed")
+            raise BusinessError(f"No se pudo liberar la reserva de la orden {order_id}")
     
     # Eliminamos los items de la orden independientemente del estado
-    for item in order_items:
-        success_2 = order_repo.delete_order_item(item.order_id, item.product_id)
-        if not success_2:
-            raise BusinessError(f"No se pudo eliminar el item con product_id {item.product_id} de la orden {order_id}")
+    order_repo.delete_order_items(order_id)
     
+    previous_status = order.status
     order_repo.update_order_status(order_id, "canceled")
     session.commit()
+    order_transitions.inc(from_status=previous_status, to_status="canceled")
     return order
\ No newline at end of file
@@ -0,0 +1,114 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+from sqlmodel import Session
+
+from core.cache import CacheBackend, TTLCache, get_cache_backend
+from core.config import settings
+from models.product import Product
+from repositories.product_repository import ProductRepository
+
+
+class ProductSnapshot(NamedTuple):
+    """Immutable copy of the product data the order flow needs (safe to share between sessions)"""
+    product_id: int
+    title: str
+    price: float
+
+
+INVALIDATION_CHANNEL = "invalidate:product"
+
+# Nivel 1: caché local del proceso. Nivel 2: backend compartido (solo si es compartido, p. ej. Redis)
+_cache = TTLCache(max_size=settings.PRODUCT_CACHE_MAX_SIZE, ttl=settings.PRODUCT_CACHE_TTL_SECONDS)
+_subscribed_backend: Optional[CacheBackend] = None
+
+def get_products(session: Session, product_ids: Iterable[int]) -> Dict[int, ProductSnapshot]:
+    """Read-through lookup: local cache, then the shared backend, then one IN query for the rest"""
+    ids = set(product_ids)
+    if not settings.PRODUCT_CACHE_ENABLED:
+        return _load(session, ids)
+    found: Dict[int, ProductSnapshot] = _cache.get_many(ids) # type: ignore
+    missing = ids - found.keys()
+    if not missing:
+        return found
+    backend = _backend()
+    if backend.shared:
+        for key, value in backend.get_many([_key(i) for i in missing]).items():
+            snapshot = ProductSnapshot(*value)
+            _cache.set(snapshot.product_id, snapshot)
+            found[snapshot.product_id] = snapshot
+        missing = ids - found.keys()
+    if missing:
+        loaded = _load(session, missing)
+        for product_id, snapshot in loaded.items():
+            _cache.set(product_id, snapshot)
+        if backend.shared and loaded:
+            backend.set_many(
+                {_key(i): list(snapshot) for i, snapshot in loaded.items()},
+                ttl=settings.PRODUCT_CACHE_TTL_SECONDS
+            )
+        found.update(loaded)
+    return found
+
+def get_product(session: Session, product_id: int) -> Optional[ProductSnapshot]:
+    return get_products(session, [product_id]).get(product_id)
+
+def invalidate(product_ids: Optional[List[int]] = None) -> None:
+    """Evict some products (or everything when no ids are given) in every worker"""
+    _evict_local(product_ids)
+    backend = _backend()
+    if backend.shared and product_ids:
+        backend.delete_many([_key(i) for i in product_ids])
+    backend.publish(INVALIDATION_CHANNEL, {"product_ids": product_ids})
+
+def stats() -> dict:
+    return {"enabled": settings.PRODUCT_CACHE_ENABLED, **_cache.stats(), "shared": _backend().stats()}
+
+def _key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+def _evict_local(product_ids: Optional[List[int]]) -> None:
+    if product_ids is None:
+        _cache.clear()
+        return
+    for product_id in product_ids:
+        _cache.delete(product_id)
+
+def _on_invalidation(message: dict) -> None:
+    _evict_local(message.get("product_ids"))
+
+def _backend() -> CacheBackend:
+    """Shared backend, subscribing this worker to the invalidation channel on first use"""
+    global _subscribed_backend
+    backend = get_cache_backend()
+    if _subscribed_backend is not backend:
+        backend.subscribe(INVALIDATION_CHANNEL, _on_invalidation)
+        _subscribed_backend = backend
+    return backend
+
+def _load(session: Session, product_ids: set) -> Dict[int, ProductSnapshot]:
+    products = ProductRepository(session).get_products_by_ids(list(product_ids))
+    return {
+        product_id: ProductSnapshot(product_id, product.title, product.price)
+        for product_id, product in products.items()
+    }
+
+# Cualquier cambio de un producto hecho con el ORM lo saca de la caché de todos los workers
+# cuando la transacción se confirma (antes otro worker podría volver a cachear el valor viejo).
+# Las sentencias UPDATE masivas no pasan por estos eventos: quien las use debe llamar a invalidate().
+@event.listens_for(Product, "after_update")
+@event.listens_for(Product, "after_delete")
+def _mark_product_changed(mapper, connection, target: Product) -> None:
+    session = object_session(target)
+    if session is not None and target.product_id is not None:
+        session.info.setdefault("changed_products", set()).add(target.product_id)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_changed_products(session: OrmSession) -> None:
+    changed = session.info.pop("changed_products", None)
+    if changed:
+        invalidate(sorted(changed))
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_changed_products(session: OrmSession) -> None:
+    session.info.pop("changed_products", None)
@@ -1,9 +1,127 @@
 from sqlmodel import Session
 from repositories.product_repository import ProductRepository
+from repositories.inventory_repository import InventoryRepository
 from models.product import Product
+from core.pagination import decode_position, page_cursors, trim_keyset_page
+from core.errors import BusinessError
+from core.config import settings
 from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import math
 
 
 def get_products(session:Session, limit:int=10, offset:int=0) -> list[Product]:
     product_repo = ProductRepository(session)
-    return product_repo.get_products(limit=limit, offset=offset)
\ No newline at end of file
+    return product_repo.get_products(limit=limit, offset=offset)
+
+CATALOG_FIELDS = [
+    "product_id", "title", "author", "isbn", "format", "edition", "language", "publisher",
+    "publication_year", "description", "price", "pages", "currency", "weight", "dimensions",
+    "front_page_url"
+]
+CATALOG_SORTS = ["product_id", "price", "publication_year"]
+
+def get_catalog(
+    session:Session,
+    page:int=1,
+    page_size:int=10,
+    sort:str="product_id",
+    fields:Optional[List[str]]=None,
+    filters:Optional[Dict[str, Any]]=None,
+    cursor:Optional[str]=None
+) -> dict:
+    """List the catalog with filters, sorting and a sparse fieldset, by page or by cursor.
+
+    `sort` is one of CATALOG_SORTS, prefixed with "-" for descending order. Rows are
+    returned as plain dicts straight from the query.
+    """
+    descending = sort.startswith("-")
+    sort_field = sort.lstrip("-")
+    if sort_field not in CATALOG_SORTS:
+        raise BusinessError(f"Orden no soportado: {sort}. Opciones: {', '.join(CATALOG_SORTS)}")
+    if fields:
+        unknown = [f for f in fields if f not in CATALOG_FIELDS]
+        if unknown:
+            raise BusinessError(f"Campos no soportados: {', '.join(unknown)}")
+        # product_id siempre se incluye, y el campo de orden se necesita para el cursor
+        selected = ["product_id"] + [f for f in CATALOG_FIELDS if f in fields and f != "product_id"]
+    else:
+        selected = list(CATALOG_FIELDS)
+    query_fields = selected if sort_field in selected else selected + [sort_field]
+    product_repo = ProductRepository(session)
+    filters = filters or {}
+
+    if cursor:
+        after, backwards = decode_position(cursor, sort)
+        rows, _ = product_repo.get_catalog(
+            query_fields, filters, sort_field, descending,
+            limit=page_size + 1, after=after, backwards=backwards
+        )
+        rows, has_next, has_previous = trim_keyset_page(rows, page_size, backwards)
+        total = None
+        total_pages = None
+    else:
+        rows, total = product_repo.get_catalog(
+            query_fields, filters, sort_field, descending,
+            limit=page_size, offset=(page - 1) * page_size, with_total=True
+        )
+        if total is None:
+            total = product_repo.count_catalog(filters) if page > 1 else 0
+        total_pages = math.ceil(total / page_size) if total > 0 else 0
+        has_next = page < total_pages
+        has_previous = page > 1
+
+    next_cursor, previous_cursor = page_cursors(
+        rows, has_next, has_previous, lambda row: [sort, row[sort_field], row["product_id"]]
+    )
+    if sort_field not in selected:
+        for row in rows:
+            del row[sort_field]
+    return {
+        "products": rows,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "has_next": has_next,
+        "has_previous": has_previous,
+        "next_cursor": next_cursor,
+        "previous_cursor": previous_cursor
+    }
+
+def search_products(session:Session, query:str, page:int=1, page_size:int=10) -> dict:
+    """Ranked full-text search over the catalog"""
+    if not query.strip():
+        raise BusinessError("Debe indicar un texto de búsqueda")
+    product_repo = ProductRepository(session)
+    rows, total = product_repo.search(query.strip(), limit=page_size, offset=(page - 1) * page_size)
+    total_pages = math.ceil(total / page_size) if total > 0 else 0
+    return {
+        "query": query,
+        "products": rows,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "has_next": page < total_pages,
+        "has_previous": page > 1
+    }
+
+def get_availability(session:Session, product_ids:List[int]) -> dict:
+    """Available stock of many products with one query; products without inventory are out of stock"""
+    product_ids = list(dict.fromkeys(product_ids))
+    if not product_ids:
+        raise BusinessError("Debe indicar al menos un producto")
+    if len(product_ids) > settings.AVAILABILITY_MAX_PRODUCTS:
+        raise BusinessError(f"Se pueden consultar hasta {settings.AVAILABILITY_MAX_PRODUCTS} productos por solicitud")
+    available = InventoryRepository(session).get_availability_many(product_ids)
+    return {
+        "products": [
+            {
+                "product_id": product_id,
+                "available": max(available.get(product_id, 0), 0),
+                "in_stock": available.get(product_id, 0) > 0
+            }
+            for product_id in product_ids
+        ]
+    }
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from core.config import settings
+from core.metrics import order_transitions
+from repositories.inventory_repository import InventoryRepository
+from repositories.order_repository import OrderRepository
+
+logger = logging.getLogger(__name__)
+
+
+def expire_reservations_batch(session: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+    """Expire one batch of orders left in 'check' for longer than RESERVATION_TTL_MINUTES.
+
+    Locks the orders with SKIP LOCKED (orders being confirmed or cancelled, or taken by
+    another sweeper, are left alone), releases their reservations with one UPDATE, marks
+    them 'expired' and commits. Returns the number of orders expired.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(minutes=settings.RESERVATION_TTL_MINUTES)
+    order_repo = OrderRepository(session)
+    inventory_repo = InventoryRepository(session)
+    try:
+        order_ids = order_repo.lock_expired_reservations(cutoff, batch_size or settings.RESERVATION_SWEEP_BATCH_SIZE)
+        if not order_ids:
+            session.rollback()
+            return 0
+        inventory_repo.release_reserved_stock_many(order_repo.get_quantities_by_product(order_ids))
+        order_repo.update_orders_status(order_ids, "expired")
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    order_transitions.inc(len(order_ids), from_status="check", to_status="expired")
+    return len(order_ids)
+
+def sweep_expired_reservations(session_factory: Callable[[], Session], now: Optional[datetime] = None) -> int:
+    """Expire batches until no expired reservation is left, returns the total expired"""
+    batch_size = settings.RESERVATION_SWEEP_BATCH_SIZE
+    total = 0
+    while True:
+        with session_factory() as session:
+            expired = expire_reservations_batch(session, now, batch_size)
+        total += expired
+        if expired < batch_size:
+            break
+    if total:
+        logger.info("Reservas vencidas liberadas: %s órdenes", total)
+    return total
+
+async def run_sweeper(session_factory: Callable[[], Session], stop: asyncio.Event) -> None:
+    """Sweep every RESERVATION_SWEEP_INTERVAL_SECONDS until `stop` is set (app lifespan task).
+    The database work runs in a worker thread."""
+    while not stop.is_set():
+        try:
+            await run_in_threadpool(sweep_expired_reservations, session_factory)
+        except Exception:
+            logger.exception("Error en el barrido de reservas vencidas")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.RESERVATION_SWEEP_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
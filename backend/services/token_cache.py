@@ -0,0 +1,121 @@
+import hashlib
+import itertools
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+
+from core.cache import CacheBackend, TTLCache, get_cache_backend
+from core.config import settings
+from models.user import User
+
+INVALIDATION_CHANNEL = "invalidate:user"
+
+# Entradas por hash del token: claims decodificados y, si ya se resolvió, el usuario.
+# Cada entrada vive hasta el exp del token; el ttl del caché es solo un tope.
+_cache = TTLCache(max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+# Un cambio de usuario le asigna una generación nueva: los usuarios cacheados con una generación
+# anterior dejan de servirse (sin recorrer los tokens de ese usuario). Una generación solo hace
+# falta mientras pueda quedar un token cacheado de antes del cambio, así que vive lo mismo que
+# un token; los valores salen de un contador global para que nunca se repitan.
+_user_generations = TTLCache(max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=_cache.ttl)
+_generation_counter = itertools.count(1)
+_generations_lock = threading.Lock()
+_subscribed_backend: Optional[CacheBackend] = None
+
+def token_key(token: str) -> str:
+    """The cache never keeps raw tokens, only their SHA-256"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def get_claims(token: str) -> Optional[dict]:
+    if not settings.TOKEN_CACHE_ENABLED:
+        return None
+    _backend()
+    entry = _cache.get(token_key(token))
+    return entry["claims"] if entry else None
+
+def store_claims(token: str, claims: dict) -> None:
+    """Cache verified claims until the token expires"""
+    if not settings.TOKEN_CACHE_ENABLED:
+        return
+    exp = claims.get("exp")
+    ttl = min(exp - time.time(), _cache.ttl) if exp else _cache.ttl
+    if ttl > 0:
+        _cache.set(token_key(token), {"claims": claims, "user": None, "generation": None}, ttl=ttl)
+
+def get_user(token: str) -> Optional[Any]:
+    """The user resolved for this token, unless that user changed since"""
+    if not settings.TOKEN_CACHE_ENABLED:
+        return None
+    entry = _cache.get(token_key(token))
+    if not entry or entry["user"] is None:
+        return None
+    if entry["generation"] != _generation(entry["user"].user_id):
+        return None
+    return entry["user"]
+
+def store_user(token: str, user: Any) -> None:
+    """Attach the resolved user (an immutable snapshot with user_id) to a cached token"""
+    if not settings.TOKEN_CACHE_ENABLED:
+        return
+    entry = _cache.get(token_key(token))
+    if entry is not None:
+        entry["generation"] = _generation(user.user_id)
+        entry["user"] = user
+
+def invalidate_users(user_ids: Iterable[int]) -> None:
+    """Stop serving the cached users (role change, deactivation...) in every worker"""
+    user_ids = list(user_ids)
+    _bump_generations(user_ids)
+    _backend().publish(INVALIDATION_CHANNEL, {"user_ids": user_ids})
+
+def clear() -> None:
+    _cache.clear()
+    _user_generations.clear()
+
+def stats() -> dict:
+    return {"enabled": settings.TOKEN_CACHE_ENABLED, **_cache.stats()}
+
+def _generation(user_id: int) -> int:
+    return _user_generations.get(user_id, 0)
+
+def _bump_generations(user_ids: Iterable[int]) -> None:
+    with _generations_lock:
+        for user_id in user_ids:
+            if len(_user_generations) >= _user_generations.max_size:
+                # Descartar una generación podría volver a servir un usuario viejo: se vacía todo
+                _cache.clear()
+                _user_generations.clear()
+            _user_generations.set(user_id, next(_generation_counter))
+
+def _on_invalidation(message: dict) -> None:
+    _bump_generations(message.get("user_ids") or [])
+
+def _backend() -> CacheBackend:
+    """Shared backend, subscribing this worker to the invalidation channel on first use"""
+    global _subscribed_backend
+    backend = get_cache_backend()
+    if _subscribed_backend is not backend:
+        backend.subscribe(INVALIDATION_CHANNEL, _on_invalidation)
+        _subscribed_backend = backend
+    return backend
+
+# Un usuario modificado con el ORM deja de servirse desde la caché cuando la transacción se confirma
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_changed(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None and target.user_id is not None:
+        session.info.setdefault("changed_users", set()).add(target.user_id)
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_changed_users(session: OrmSession) -> None:
+    changed = session.info.pop("changed_users", None)
+    if changed:
+        invalidate_users(sorted(changed))
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_changed_users(session: OrmSession) -> None:
+    session.info.pop("changed_users", None)
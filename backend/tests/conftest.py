@@ -3,13 +3,18 @@ Configuración de pytest para los tests
 """
 import pytest
 import os
-from sqlmodel import Session, create_engine, SQLModel
+from sqlmodel import Session, create_engine, select, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 
 # Importar la aplicación y las dependencias
 from main import app
-from db.database import get_session
+from core.config import settings
+from db.database import get_session, get_async_session, async_database_url
 from models.user import User, UserRole
 from models.product import Product
 from models.inventory import Inventory
@@ -17,11 +22,19 @@ from models.category import Category
 from models.order import Order
 from models.order_item import OrderItem
 from services.auth_service import create_access_token, get_password_hash
+from services import product_cache, token_cache
 from datetime import datetime, timezone, timedelta
 
 # URL de base de datos de test
 TEST_DATABASE_URL = "sqlite:///./test.db"
 
+@pytest.fixture(autouse=True)
+def strict_query_budgets():
+    """Los endpoints que superan su query_budget hacen fallar el test"""
+    settings.SQL_QUERY_BUDGET_STRICT = True
+    yield
+    settings.SQL_QUERY_BUDGET_STRICT = False
+
 @pytest.fixture(scope="function")
 def test_engine():
     """Crear engine de test con SQLite en memoria"""
@@ -34,6 +47,11 @@ def test_engine():
     except FileNotFoundError:
         pass
 
+@pytest.fixture(scope="function")
+def test_async_engine(test_engine):
+    """Engine asíncrono sobre la misma base de test (sin pool: cada request usa su propio event loop)"""
+    return create_async_engine(async_database_url(TEST_DATABASE_URL), poolclass=NullPool)
+
 @pytest.fixture(scope="function")
 def test_session(test_engine):
     """Crear sesión de test"""
@@ -41,12 +59,19 @@ def test_session(test_engine):
         yield session
 
 @pytest.fixture(scope="function")
-def client(test_session):
+def client(test_session, test_async_engine):
     """Cliente de test con base de datos mockeada"""
     def get_test_session():
         yield test_session
+
+    async def get_test_async_session():
+        async with AsyncSession(test_async_engine, expire_on_commit=False) as session:
+            yield session
     
     app.dependency_overrides[get_session] = get_test_session
+    app.dependency_overrides[get_async_session] = get_test_async_session
+    product_cache.invalidate()
+    token_cache.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
@@ -142,6 +167,87 @@ def test_products(test_session):
     
     return products
 
+@pytest.fixture(scope="function")
+def make_products(test_session):
+    """Crear productos adicionales (carritos grandes, listados de varias páginas)"""
+    def make(count, start_id=100):
+        products = [
+            Product(
+                product_id=start_id + i,
+                sku=f"BULK-{i:03d}",
+                title=f"Bulk Book {i}",
+                author="Bulk Author",
+                isbn=f"978000000{i:04d}",
+                publisher="Bulk Publisher",
+                publication_year=2020,
+                price=1000.0 + i,
+            )
+            for i in range(count)
+        ]
+        test_session.add_all(products)
+        test_session.commit()
+        return products
+
+    return make
+
+@pytest.fixture(scope="function")
+def test_inventory(test_session, test_products):
+    """Crear inventario para los productos de test"""
+    inventories = [
+        Inventory(product_id=1, quantity=5, reserved=0),
+        Inventory(product_id=2, quantity=1, reserved=0)
+    ]
+    test_session.add_all(inventories)
+    test_session.commit()
+    return inventories
+
+@pytest.fixture(scope="function")
+def create_order(client, auth_headers):
+    """Crear un pedido en 'draft' por la API y devolver su ID"""
+    def create(items):
+        response = client.post("/api/orders/", json={"items": items}, headers=auth_headers)
+        assert response.status_code == 201
+        return response.json()["order_id"]
+
+    return create
+
+@pytest.fixture(scope="function")
+def stock_of(test_session):
+    """Leer (quantity, reserved) de un producto desde la base de datos"""
+    def stock(product_id):
+        test_session.expire_all()
+        inventory = test_session.exec(select(Inventory).where(Inventory.product_id == product_id)).one()
+        return inventory.quantity, inventory.reserved
+
+    return stock
+
+@pytest.fixture(scope="function")
+def inventory_stock(test_session):
+    """Leer {product_id: (quantity, reserved)} de todo el inventario desde la base de datos"""
+    def stock():
+        test_session.expire_all()
+        return {
+            inventory.product_id: (inventory.quantity, inventory.reserved)
+            for inventory in test_session.exec(select(Inventory)).all()
+        }
+
+    return stock
+
+@pytest.fixture(scope="function")
+def statements(test_engine, test_async_engine):
+    """Registrar las sentencias SQL ejecutadas contra los engines de test"""
+    executed = []
+    engines = [test_engine, test_async_engine.sync_engine]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
 @pytest.fixture(scope="function")
 def test_orders(test_session, test_user, test_products):
     """Crear pedidos de test"""
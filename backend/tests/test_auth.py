@@ -1,9 +1,15 @@
 """
 Tests para autenticación (login)
 """
+import asyncio
+import threading
+from types import SimpleNamespace
 import pytest
 from fastapi import status
 
+from models.user import UserRole
+from services import token_cache
+
 
 class TestAuth:
     """Tests para endpoints de autenticación"""
@@ -168,4 +174,109 @@ class TestAuth:
             headers={"Authorization": "InvalidBearer token"}
         )
         
-        assert response.status_code == status.HTTP_401_UNAUTHORIZED
\ No newline at end of file
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_register_user(self, client, test_session):
+        """Test registrar un usuario y luego iniciar sesión"""
+        response = client.post(
+            "/api/auth/register",
+            json={
+                "username": "newuser",
+                "email": "new@example.com",
+                "ID": 2001,
+                "name": "New",
+                "last_name": "User",
+                "password": "newpassword"
+            }
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        login = client.post("/api/auth/login", json={"username": "newuser", "password": "newpassword"})
+        assert login.status_code == status.HTTP_200_OK
+
+
+class TestPasswordHashPool:
+    """Tests para el pool de hashing de contraseñas"""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """Test el event loop sigue atendiendo mientras se calculan hashes"""
+        from services.auth_service import PasswordHashPool, get_password_hash
+
+        pool = PasswordHashPool(workers=2, max_pending=10)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        hashes = await asyncio.gather(*(pool.run(get_password_hash, "secreto") for _ in range(4)))
+        task.cancel()
+
+        assert len(set(hashes)) == 4
+        assert ticks > 4
+        assert pool.stats()["completed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full(self):
+        """Test se rechazan hashes cuando la cola está llena"""
+        from services.auth_service import PasswordHashPool, PasswordHashPoolBusy
+
+        pool = PasswordHashPool(workers=1, max_pending=1)
+        release = threading.Event()
+        first = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(PasswordHashPoolBusy):
+            await pool.run(release.set)
+        release.set()
+        assert await first is True
+        stats = pool.stats()
+        assert (stats["rejected"], stats["pending"]) == (1, 0)
+
+    def test_pool_health_requires_admin(self, client, auth_headers, admin_headers):
+        """Test solo un administrador puede ver la cola de hashing"""
+        response = client.get("/health/auth", headers=auth_headers)
+        assert response.status_code == 403
+
+        response = client.get("/health/auth", headers=admin_headers)
+        assert response.status_code == 200
+        assert "rejected" in response.json()
+
+
+class TestTokenCache:
+    """Tests para la caché de tokens verificados"""
+
+    def test_me_reuses_resolved_user(self, client, auth_headers, statements):
+        """Test el segundo /me no vuelve a consultar el usuario"""
+        client.get("/api/auth/me", headers=auth_headers)
+        statements.clear()
+        response = client.get("/api/auth/me", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["username"] == "testuser"
+        assert statements == []
+
+    def test_user_change_invalidates_cache(self, client, test_session, test_user, auth_headers):
+        """Test un cambio de rol se refleja en el siguiente request"""
+        assert client.get("/api/auth/me", headers=auth_headers).json()["role"] == "user"
+
+        test_user.role = UserRole.ADMIN
+        test_session.add(test_user)
+        test_session.commit()
+
+        assert client.get("/api/auth/me", headers=auth_headers).json()["role"] == "admin"
+
+    def test_user_generations_are_bounded(self, monkeypatch):
+        """Test las generaciones de usuarios no crecen sin límite y no reviven usuarios viejos"""
+        monkeypatch.setattr(token_cache._user_generations, "max_size", 2)
+        token_cache.store_claims("token", {"sub": "testuser"})
+        token_cache.store_user("token", SimpleNamespace(user_id=1))
+
+        token_cache._bump_generations([1, 2, 3, 4])
+
+        assert len(token_cache._user_generations) <= 2
+        assert token_cache.get_user("token") is None
@@ -0,0 +1,25 @@
+"""
+Tests para la suite de benchmarks
+"""
+from benchmarks.harness import compare
+from benchmarks.run import main
+
+
+class TestBenchmarks:
+    """Tests para la ejecución de benchmarks y la comparación con la línea base"""
+
+    def test_run_and_compare_with_baseline(self, tmp_path):
+        """Test los escenarios corren a escala mínima y la segunda ejecución se compara con la primera"""
+        args = ["--iterations", "3", "--warmup", "1", "--products", "50", "--users", "5", "--orders", "20",
+                "--baseline-dir", str(tmp_path), "--tolerance", "100"]
+
+        assert main(args + ["--save-baseline"]) == 0
+        assert (tmp_path / "sqlite.json").exists()
+        assert main(args) == 0
+
+    def test_compare_flags_regressions(self):
+        """Test más sentencias SQL o un p95 fuera de tolerancia son regresiones"""
+        baseline = {"orders.create": {"p95_ms": 10.0, "max_statements": 3}}
+
+        assert compare({"orders.create": {"p95_ms": 12.0, "max_statements": 3}}, baseline) == []
+        assert len(compare({"orders.create": {"p95_ms": 20.0, "max_statements": 4}}, baseline)) == 2
@@ -0,0 +1,182 @@
+"""
+Tests para la capa de caché (local y compartida)
+"""
+import asyncio
+import threading
+import time
+import pytest
+
+from core.cache import CacheBackend, TTLCache, MemoryCacheBackend, RedisCacheBackend, set_cache_backend
+from services import product_cache
+
+
+def wait_for(condition, timeout=2.0):
+    """Esperar a que el hilo de suscripción procese los mensajes"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture(scope="function")
+def fake_redis_server():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture(scope="function")
+def redis_backends(fake_redis_server):
+    """Dos backends sobre el mismo servidor, como dos workers"""
+    import fakeredis
+
+    backends = [
+        RedisCacheBackend(client=fakeredis.FakeRedis(server=fake_redis_server), default_ttl=30)
+        for _ in range(2)
+    ]
+    yield backends
+    for backend in backends:
+        backend.close()
+
+
+class TestTTLCache:
+    """Tests para la caché LRU con expiración"""
+
+    def test_lru_eviction(self):
+        """Test se descarta la entrada menos usada al superar el tamaño"""
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get_many(["a", "c"]) == {"a": 1, "c": 3}
+        assert cache.stats()["evictions"] == 1
+
+    def test_expiration_and_counters(self):
+        """Test las entradas expiran y se cuentan aciertos y fallos"""
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set("a", 1, ttl=0)
+        cache.set("b", 2)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+class TestCacheBackends:
+    """Tests para los backends de caché compartida"""
+
+    def test_memory_backend(self):
+        """Test operaciones múltiples y pub/sub en proceso"""
+        backend = MemoryCacheBackend()
+        received = []
+        backend.subscribe("canal", received.append)
+        backend.set_many({"a": [1], "b": [2]})
+        backend.delete_many(["a"])
+        backend.publish("canal", {"ok": True})
+
+        assert backend.get_many(["a", "b"]) == {"b": [2]}
+        assert received == [{"ok": True}]
+        backend.clear()
+        assert backend.get("b") is None
+
+    def test_backend_is_abstract(self):
+        """Test un backend que no implementa las operaciones no se puede instanciar"""
+        with pytest.raises(TypeError):
+            CacheBackend()
+
+    def test_redis_backend_shared_keys(self, redis_backends):
+        """Test los valores escritos por un worker los ve el otro"""
+        first, second = redis_backends
+        first.set_many({"a": {"x": 1}, "b": [1, "dos"]})
+
+        assert second.get_many(["a", "b", "c"]) == {"a": {"x": 1}, "b": [1, "dos"]}
+        second.delete_many(["a", "b"])
+        assert first.get("a") is None
+
+    def test_redis_backend_ttl(self, redis_backends):
+        """Test las claves expiran según el TTL"""
+        first, _ = redis_backends
+        first.set("a", 1, ttl=0.05)
+
+        assert wait_for(lambda: first.get("a") is None)
+
+    def test_redis_backend_clear(self, redis_backends, fake_redis_server):
+        """Test clear solo borra las claves con el prefijo del backend"""
+        import fakeredis
+
+        first, second = redis_backends
+        other = fakeredis.FakeRedis(server=fake_redis_server)
+        other.set("otra-app:a", 1)
+        first.set_many({"a": 1, "b": 2})
+
+        second.clear()
+
+        assert first.get_many(["a", "b"]) == {}
+        assert other.get("otra-app:a") == b"1"
+
+    def test_redis_calls_leave_the_event_loop(self, redis_backends):
+        """Test dentro de run_sync las órdenes a Redis se ejecutan en el threadpool"""
+        from sqlalchemy.util import greenlet_spawn
+
+        backend, _ = redis_backends
+        threads = []
+        publish = backend.client.publish
+        backend.client.publish = lambda *args: threads.append(threading.get_ident()) or publish(*args)
+
+        async def publish_from_greenlet():
+            await greenlet_spawn(backend.publish, "canal", {"product_ids": [1]})
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(publish_from_greenlet())
+
+        assert len(threads) == 1
+        assert threads[0] != loop_thread
+
+    def test_redis_backend_pubsub(self, redis_backends):
+        """Test un mensaje publicado llega a los suscriptores de otro worker"""
+        first, second = redis_backends
+        received = []
+        second.subscribe("canal", received.append)
+        time.sleep(0.05)
+        first.publish("canal", {"product_ids": [1]})
+
+        assert wait_for(lambda: received == [{"product_ids": [1]}])
+
+
+class TestProductCacheInvalidation:
+    """Tests para la invalidación de productos entre workers"""
+
+    def test_invalidation_from_other_worker(self, test_session, test_products, redis_backends):
+        """Test un cambio de precio publicado por otro worker vacía la caché local"""
+        worker, other_worker = redis_backends
+        set_cache_backend(worker)
+        try:
+            product_cache.invalidate()
+            assert product_cache.get_product(test_session, 1).price == 50000.0
+            assert worker.get("product:1") == [1, "Test Book 1", 50000.0]
+            time.sleep(0.05)
+
+            other_worker.publish(product_cache.INVALIDATION_CHANNEL, {"product_ids": [1]})
+
+            assert wait_for(lambda: product_cache._cache.get(1) is None)
+        finally:
+            set_cache_backend(None)
+            product_cache.invalidate()
+
+
+class TestProductCacheStats:
+    """Tests para las estadísticas de la caché de productos"""
+
+    def test_stats_require_admin(self, client, auth_headers, admin_headers):
+        """Test solo un administrador puede ver las estadísticas"""
+        response = client.get("/api/products/cache/stats", headers=auth_headers)
+        assert response.status_code == 403
+
+        response = client.get("/api/products/cache/stats", headers=admin_headers)
+        assert response.status_code == 200
+        assert "hits" in response.json()
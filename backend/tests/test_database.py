@@ -0,0 +1,138 @@
+"""
+Tests para la configuración del pool de conexiones
+"""
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from core.config import settings
+
+from db.database import (
+    MeteredAsyncQueuePool, MeteredQueuePool, async_database_url, engine_options, instrument_pool, pool_metrics
+)
+
+
+class TestEngineOptions:
+    """Tests para las opciones del engine"""
+
+    def test_postgres_pool_and_statement_timeout(self):
+        """Test PostgreSQL usa el pool configurado y el timeout de sentencias"""
+        options = engine_options("postgresql://user:pass@db:5432/appdb")
+
+        assert options["echo"] is False
+        assert options["poolclass"] is MeteredQueuePool
+        assert options["pool_size"] == settings.DB_POOL_SIZE
+        assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+        assert options["pool_recycle"] == settings.DB_POOL_RECYCLE
+        assert options["connect_args"] == {
+            "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        }
+
+    def test_async_engine_options(self):
+        """Test el engine asíncrono usa asyncpg con el timeout en server_settings"""
+        url = async_database_url("postgresql://user:pass@db:5432/appdb")
+        options = engine_options(url, asynchronous=True)
+
+        assert url == "postgresql+asyncpg://user:pass@db:5432/appdb"
+        assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+        assert options["poolclass"] is MeteredAsyncQueuePool
+        assert options["connect_args"] == {
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        }
+
+    def test_sqlite_keeps_default_pool(self):
+        """Test SQLite no recibe parámetros de dimensionamiento del pool"""
+        options = engine_options("sqlite:///./test.db")
+
+        assert "pool_size" not in options
+        assert "connect_args" not in options
+
+
+class TestPoolMetrics:
+    """Tests para las métricas del pool"""
+
+    def test_checkout_wait_and_timeout(self, tmp_path):
+        """Test se cuentan checkouts, conexiones nuevas y timeouts de espera"""
+        metered = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=MeteredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+        )
+        instrument_pool(metered)
+        before = pool_metrics.snapshot()
+
+        with metered.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                metered.connect()
+        metered.dispose()
+
+        after = pool_metrics.snapshot()
+        assert after["checkouts"] - before["checkouts"] == 1
+        assert after["connects"] - before["connects"] == 1
+        assert after["timeouts"] - before["timeouts"] == 1
+        assert after["wait_seconds_max"] >= 0.05
+
+    def test_pool_health_requires_admin(self, client, auth_headers, admin_headers):
+        """Test solo un administrador puede ver el estado del pool"""
+        response = client.get("/health/db", headers=auth_headers)
+        assert response.status_code == 403
+
+        response = client.get("/health/db", headers=admin_headers)
+        assert response.status_code == 200
+        assert "checkouts" in response.json()
+
+
+class TestBootstrap:
+    """Tests para la preparación de la base de datos al arrancar"""
+
+    def test_bootstrap_once_then_marker_check(self, tmp_path):
+        """Test el primer arranque crea y siembra; los siguientes solo leen la marca"""
+        from sqlalchemy import event
+        from sqlmodel import Session, select
+        from db.bootstrap import bootstrap, expected_marker, read_marker
+        from models.inventory import Inventory
+        from models.user import User
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'bootstrap.db'}")
+        assert bootstrap(engine) is True
+        with Session(engine) as session:
+            assert len(session.exec(select(User)).all()) == 4
+            assert len(session.exec(select(Inventory)).all()) == 6
+        with engine.connect() as connection:
+            assert read_marker(connection) == expected_marker()
+
+        executed = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: executed.append(statement))
+        assert bootstrap(engine) is False
+        assert len(executed) == 1
+        engine.dispose()
+
+
+class TestSyntheticData:
+    """Tests para el generador de datos sintéticos"""
+
+    def test_deterministic_generation(self):
+        """Test la misma semilla produce las mismas filas y otra semilla no"""
+        from db.synthetic import SyntheticScale, generate
+
+        scale = SyntheticScale(seed=7, categories=3, products=20, users=5, orders=30)
+
+        assert list(generate(scale, batch_size=8)) == list(generate(scale, batch_size=8))
+        assert list(generate(scale)) != list(generate(scale._replace(seed=8)))
+
+    def test_load_after_seed(self, tmp_path):
+        """Test la carga continúa los IDs de la semilla y deja el reservado conciliado"""
+        from sqlmodel import Session
+        from db.bootstrap import bootstrap
+        from db.synthetic import SyntheticScale, load
+        from services.inventory_reconciler import reconcile_inventory
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'synthetic.db'}")
+        bootstrap(engine)
+        loaded = load(engine, SyntheticScale(categories=3, products=50, users=10, orders=40), batch_size=16)
+
+        assert loaded["product"] == 50 and loaded["inventory"] == 50 and loaded["order"] == 40
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT count(*), min(product_id) FROM product WHERE sku LIKE 'SYN-%'")).one() == (50, 7)
+        report = reconcile_inventory(lambda: Session(engine), actor_id=1, dry_run=True)
+        assert report["checked"] == 56 and report["mismatched"] == 0
+        engine.dispose()
@@ -0,0 +1,253 @@
+"""
+Tests para la administración de inventario
+"""
+from fastapi import status
+
+from models.inventory import Inventory
+
+
+class TestListInventory:
+    """Tests para el listado de inventario"""
+
+    def test_admin_lists_inventory(self, client, test_inventory, admin_headers, statements):
+        """Test el rol de admin se verifica con el token, sin consultar el usuario"""
+        statements.clear()
+        response = client.get("/api/inventory/", headers=admin_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["title"] for item in response.json()["inventory"]] == ["Test Book 1", "Test Book 2"]
+        assert not any('FROM "user"' in sql or "FROM user" in sql for sql in statements)
+
+    def test_user_forbidden(self, client, test_inventory, auth_headers):
+        """Test un usuario sin rol de admin recibe 403"""
+        response = client.get("/api/inventory/", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_sort_and_low_stock_filter(self, client, test_inventory, admin_headers):
+        """Test ordenar por stock efectivo y filtrar stock bajo en la consulta"""
+        response = client.get("/api/inventory/", params={"sort": "-effective"}, headers=admin_headers)
+        assert [item["product_id"] for item in response.json()["inventory"]] == [1, 2]
+
+        response = client.get("/api/inventory/", params={"low_stock_below": 2}, headers=admin_headers)
+        assert [item["product_id"] for item in response.json()["inventory"]] == [2]
+
+    def test_cursor_pagination(self, client, test_session, test_inventory, admin_headers, make_products):
+        """Test recorrer el inventario con los cursores de la respuesta"""
+        for product in make_products(3):
+            test_session.add(Inventory(product_id=product.product_id, quantity=product.product_id, reserved=0))
+        test_session.commit()
+
+        params = {"sort": "quantity", "limit": 2}
+        first = client.get("/api/inventory/", params=params, headers=admin_headers).json()
+        assert [item["quantity"] for item in first["inventory"]] == [1, 5]
+        assert (first["has_previous"], first["previous_cursor"]) == (False, None)
+
+        second = client.get("/api/inventory/", params={**params, "cursor": first["next_cursor"]}, headers=admin_headers).json()
+        assert [item["quantity"] for item in second["inventory"]] == [100, 101]
+        assert second["has_next"] is True
+
+        back = client.get("/api/inventory/", params={**params, "cursor": second["previous_cursor"]}, headers=admin_headers).json()
+        assert back["inventory"] == first["inventory"]
+
+        invalid = client.get("/api/inventory/", params={"sort": "price"}, headers=admin_headers)
+        assert invalid.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_requires_token(self, client):
+        """Test sin token se recibe 401"""
+        response = client.get("/api/inventory/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestInventoryAdjustments:
+    """Tests para los ajustes masivos de inventario"""
+
+    def test_absolute_delta_and_create(self, client, test_inventory, admin_headers, make_products, inventory_stock):
+        """Test ajustes absolutos, relativos y creación de inventario faltante en una transacción"""
+        make_products(1)
+
+        response = client.post("/api/inventory/adjustments", json={"items": [
+            {"product_id": 1, "quantity": 10},
+            {"product_id": 2, "quantity": 3, "mode": "delta"},
+            {"product_id": 100, "quantity": 7, "mode": "delta"},
+            {"product_id": 999, "quantity": 1}
+        ]}, headers=admin_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert (data["updated"], data["created"], data["not_found"], data["rejected"]) == (2, 1, [999], [])
+        assert [(r["product_id"], r["previous_quantity"], r["quantity"]) for r in data["results"]] == [
+            (1, 5, 10), (2, 1, 4), (100, 0, 7)
+        ]
+        assert inventory_stock() == {1: (10, 0), 2: (4, 0), 100: (7, 0)}
+
+    def test_rejects_below_reserved(self, client, test_session, test_inventory, admin_headers, inventory_stock):
+        """Test no se deja el stock por debajo de lo reservado"""
+        test_inventory[0].reserved = 1
+        test_session.add(test_inventory[0])
+        test_session.commit()
+
+        response = client.post("/api/inventory/adjustments", json={"items": [
+            {"product_id": 1, "quantity": -5, "mode": "delta"},
+            {"product_id": 2, "quantity": 2}
+        ]}, headers=admin_headers)
+
+        data = response.json()
+        assert [r["product_id"] for r in data["rejected"]] == [1]
+        assert inventory_stock() == {1: (5, 1), 2: (2, 0)}
+
+    def test_constant_queries(self, client, admin_headers, statements, make_products):
+        """Test el número de sentencias no depende del número de líneas"""
+        product_ids = [p.product_id for p in make_products(60)]
+
+        def count_for(ids, quantity):
+            statements.clear()
+            response = client.post("/api/inventory/adjustments", json={"items": [
+                {"product_id": product_id, "quantity": quantity} for product_id in ids
+            ]}, headers=admin_headers)
+            assert response.status_code == status.HTTP_200_OK
+            return len(statements)
+
+        client.post("/api/inventory/adjustments", json={"items": [
+            {"product_id": product_id, "quantity": 1} for product_id in product_ids
+        ]}, headers=admin_headers)
+        assert count_for(product_ids[:2], 3) == count_for(product_ids, 4)
+
+    def test_duplicated_products(self, client, test_inventory, admin_headers):
+        """Test un producto repetido en el ajuste devuelve 400"""
+        response = client.post("/api/inventory/adjustments", json={"items": [
+            {"product_id": 1, "quantity": 1},
+            {"product_id": 1, "quantity": 2}
+        ]}, headers=admin_headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_adjust_many_compatible(self, client, test_session, test_inventory, admin_headers):
+        """Test el endpoint anterior sigue aceptando la lista de cantidades"""
+        response = client.put("/api/inventory/adjust-many", json=[
+            {"product_id": 1, "quantity": 8}
+        ], headers=admin_headers)
+
+        assert response.json() == [{"title": "Test Book 1", "quantity": 8}]
+
+
+class TestInventoryImportExport:
+    """Tests para la importación y exportación de stock en streaming"""
+
+    def test_export_csv(self, client, test_inventory, admin_headers):
+        """Test exportar el stock en CSV ordenado por producto"""
+        response = client.get("/api/inventory/export", headers=admin_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.strip().splitlines()
+        assert lines[0] == "product_id,title,author,isbn,price,quantity,reserved"
+        assert [line.split(",")[0] for line in lines[1:]] == ["1", "2"]
+
+    def test_export_ndjson(self, client, test_inventory, admin_headers):
+        """Test exportar el stock en NDJSON"""
+        import json
+
+        response = client.get("/api/inventory/export", params={"format": "ndjson"}, headers=admin_headers)
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [(r["product_id"], r["quantity"], r["reserved"]) for r in rows] == [(1, 5, 0), (2, 1, 0)]
+
+    def test_import_csv_in_batches(self, client, test_inventory, admin_headers, make_products, inventory_stock, monkeypatch):
+        """Test importar CSV en varios lotes, con productos inexistentes y filas rechazadas"""
+        from core.config import settings
+        monkeypatch.setattr(settings, "INVENTORY_ADJUST_BATCH_SIZE", 2)
+
+        def body():
+            yield b"product_id,quantity,mode\r\n1,4,delta\n"
+            yield b"2,0\n999,3\n"
+            yield "1".encode()
+            yield b"00,2,absolute"
+
+        make_products(1)
+        response = client.post("/api/inventory/import", content=body(), headers=admin_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert (data["received"], data["updated"], data["created"], data["not_found"]) == (4, 2, 1, [999])
+        assert inventory_stock() == {1: (9, 0), 2: (0, 0), 100: (2, 0)}
+
+    def test_import_invalid_line_applies_nothing(self, client, test_inventory, admin_headers, inventory_stock):
+        """Test una línea inválida devuelve 400 y no se aplica ningún lote"""
+        response = client.post(
+            "/api/inventory/import",
+            params={"format": "ndjson"},
+            content=b'{"product_id": 1, "quantity": 9}\n{"product_id": "x"}\n',
+            headers=admin_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Línea 2" in response.json()["detail"]
+        assert inventory_stock()[1] == (5, 0)
+
+
+class TestInventoryReconciler:
+    """Tests para la conciliación del stock reservado"""
+
+    def test_reconcile_reserved_stock(self, test_session, test_engine, test_inventory, test_orders, test_admin):
+        """Test el reservado se recalcula desde las órdenes en 'check', primero en simulación"""
+        from sqlmodel import Session, select
+        from models.audit_log import AuditLog
+        from services.inventory_reconciler import reconcile_inventory
+
+        for order in test_orders[1:]:
+            order.status = "check"
+        test_inventory[0].reserved = -2
+        test_session.add_all([*test_orders, test_inventory[0]])
+        test_session.commit()
+
+        def session_factory():
+            return Session(test_engine)
+
+        report = reconcile_inventory(session_factory, test_admin.user_id, dry_run=True, batch_size=1)
+        assert (report["checked"], report["mismatched"], report["corrected"]) == (2, 2, 0)
+        assert test_session.exec(select(AuditLog)).all() == []
+
+        report = reconcile_inventory(session_factory, test_admin.user_id, batch_size=1)
+        assert report["corrected"] == 2
+        assert report["oversold"] == []
+        test_session.expire_all()
+        assert [(inventory.product_id, inventory.reserved) for inventory in test_session.exec(select(Inventory).order_by(Inventory.product_id))] == [(1, 1), (2, 1)]
+        logs = test_session.exec(select(AuditLog).order_by(AuditLog.object_id)).all()
+        assert [(log.action, log.before_state, log.after_state) for log in logs] == [
+            ("reconcile", '{"reserved": -2}', '{"reserved": 1}'),
+            ("reconcile", '{"reserved": 0}', '{"reserved": 1}')
+        ]
+
+        assert reconcile_inventory(session_factory, test_admin.user_id)["mismatched"] == 0
+
+
+class TestAvailability:
+    """Tests para la consulta de disponibilidad por lotes"""
+
+    def test_batch_availability(self, client, test_session, test_inventory, auth_headers):
+        """Test la disponibilidad sale de la columna calculada y sigue a las reservas"""
+        response = client.get("/api/products/availability", params={"ids": "2,1,99"}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["products"] == [
+            {"product_id": 2, "available": 1, "in_stock": True},
+            {"product_id": 1, "available": 5, "in_stock": True},
+            {"product_id": 99, "available": 0, "in_stock": False}
+        ]
+
+        test_inventory[1].reserved = 1
+        test_session.add(test_inventory[1])
+        test_session.commit()
+        assert test_inventory[1].available == 0
+        response = client.get("/api/products/availability", params={"ids": "2"}, headers=auth_headers)
+        assert response.json()["products"] == [{"product_id": 2, "available": 0, "in_stock": False}]
+
+    def test_invalid_ids(self, client, auth_headers):
+        """Test IDs no numéricos o demasiados productos devuelven 400"""
+        response = client.get("/api/products/availability", params={"ids": "1,a"}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.get("/api/products/availability", params={"ids": ",".join(map(str, range(1, 200)))}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,100 @@
+"""
+Tests para el endpoint de métricas
+"""
+import pytest
+from fastapi import status
+
+from core import metrics
+from core.metrics import MetricsRegistry, collect, merge, render
+
+
+@pytest.fixture(scope="function")
+def clean_metrics():
+    metrics.registry.clear()
+    yield metrics.registry
+    metrics.registry.clear()
+
+
+class TestMetricsRegistry:
+    """Tests para la agregación y el formato de las métricas"""
+
+    def test_histogram_rendering(self):
+        """Test los buckets se exportan acumulados con suma y total"""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latencia", ["route"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 3.0):
+            latency.observe(value, route="/a")
+
+        text = render(registry.snapshot())
+
+        assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/a"} 3' in text
+
+    def test_merge_workers(self):
+        """Test los snapshots de dos workers se suman (o se toma el máximo)"""
+        workers = []
+        for requests, wait in ((2, 0.5), (3, 0.2)):
+            registry = MetricsRegistry()
+            registry.counter("requests_total", "Requests", ["route"]).inc(requests, route="/a")
+            registry.gauge("wait_seconds_max", "Espera", aggregate="max").set(wait)
+            registry.histogram("latency_seconds", "Latencia", buckets=(1.0,)).observe(0.5)
+            workers.append(registry.snapshot())
+
+        merged = merge(workers)
+
+        assert merged["requests_total"]["samples"] == [[["/a"], 5]]
+        assert merged["wait_seconds_max"]["samples"] == [[[], 0.5]]
+        assert merged["latency_seconds"]["samples"] == [[[], {"counts": [2, 0], "sum": 1.0, "count": 2}]]
+
+    def test_collect_from_directory(self, tmp_path, clean_metrics):
+        """Test con METRICS_DIR se combinan los archivos de los workers vivos"""
+        import json
+        other_worker = MetricsRegistry()
+        other_worker.counter("order_transitions_total", "", ["from_status", "to_status"]).inc(4, from_status="draft", to_status="check")
+        (tmp_path / "worker-1.json").write_text(json.dumps(other_worker.snapshot()))
+        metrics.order_transitions.inc(from_status="draft", to_status="check")
+
+        merged = collect(str(tmp_path))
+
+        assert merged["order_transitions_total"]["samples"] == [[["draft", "check"], 5]]
+
+
+class TestMetricsEndpoint:
+    """Tests para /metrics"""
+
+    def test_order_lifecycle_metrics(self, client, test_inventory, auth_headers, admin_headers, create_order, clean_metrics):
+        """Test latencias por ruta, transiciones de órdenes, reservas fallidas y cachés"""
+        order_id = create_order([{"product_id": 1, "quantity": 1}])
+        client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+        failed_order = create_order([{"product_id": 2, "quantity": 5}])
+        client.post(f"/api/orders/{failed_order}/validate", headers=auth_headers)
+
+        response = client.get("/metrics", headers=admin_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'http_request_duration_seconds_count{method="POST",route="/api/orders/{order_id}/validate",status="200"} 1' in text
+        assert 'http_request_duration_seconds_count{method="POST",route="/api/orders/{order_id}/validate",status="409"} 1' in text
+        assert 'order_transitions_total{from_status="none",to_status="draft"} 2' in text
+        assert 'order_transitions_total{from_status="draft",to_status="check"} 1' in text
+        assert 'reservation_failures_total{reason="insufficient_stock"} 1' in text
+        assert "http_requests_in_flight 1" in text
+        assert 'cache_hit_ratio{cache="product"}' in text
+        assert "db_pool_checkouts_total" in text
+
+    def test_requires_admin_or_scrape_token(self, client, auth_headers, admin_headers, monkeypatch):
+        """Test solo un administrador o el token de scraping configurado pueden leer las métricas"""
+        from core.config import settings
+
+        assert client.get("/metrics").status_code == status.HTTP_401_UNAUTHORIZED
+        assert client.get("/metrics", headers=auth_headers).status_code == status.HTTP_403_FORBIDDEN
+        assert client.get("/metrics", headers=admin_headers).status_code == status.HTTP_200_OK
+
+        monkeypatch.setattr(settings, "METRICS_SCRAPE_TOKEN", "token-de-prometheus")
+        scraper = {"Authorization": "Bearer token-de-prometheus"}
+        assert client.get("/metrics", headers=scraper).status_code == status.HTTP_200_OK
+        wrong = {"Authorization": "Bearer otro-token"}
+        assert client.get("/metrics", headers=wrong).status_code == status.HTTP_401_UNAUTHORIZED
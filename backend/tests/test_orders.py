@@ -0,0 +1,287 @@
+"""
+Tests para el ciclo de vida de pedidos
+"""
+from fastapi import status
+
+from models.product import Product
+
+
+class TestCreateOrder:
+    """Tests para la creación de pedidos"""
+
+    def test_create_order_success(self, client, test_products, auth_headers):
+        """Test crear pedido con varios productos"""
+        response = client.post(
+            "/api/orders/",
+            json={"items": [
+                {"product_id": 1, "quantity": 2},
+                {"product_id": 2, "quantity": 1}
+            ]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["status"] == "draft"
+        assert data["total"] == 175000.0
+        assert data["items_count"] == 2
+        titles = {item["product_id"]: item["product_title"] for item in data["items"]}
+        assert titles == {1: "Test Book 1", 2: "Test Book 2"}
+        assert all(item["order_item_id"] for item in data["items"])
+
+    def test_create_order_product_not_found(self, client, test_session, test_products, auth_headers):
+        """Test crear pedido con un producto inexistente no deja la orden a medias"""
+        from sqlmodel import select
+        from models.order import Order
+
+        response = client.post(
+            "/api/orders/",
+            json={"items": [
+                {"product_id": 1, "quantity": 1},
+                {"product_id": 999, "quantity": 1}
+            ]},
+            headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"]["product_id"] == 999
+        assert test_session.exec(select(Order)).all() == []
+
+    def test_create_order_constant_queries(self, client, test_user, auth_headers, statements, make_products):
+        """Test el número de consultas no depende del tamaño del carrito"""
+        product_ids = [p.product_id for p in make_products(40)]
+
+        def count_for(cart):
+            statements.clear()
+            response = client.post(
+                "/api/orders/",
+                json={"items": [{"product_id": product_id, "quantity": 1} for product_id in cart]},
+                headers=auth_headers
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            assert response.json()["items_count"] == len(cart)
+            return len(statements)
+
+        assert count_for(product_ids[:2]) == count_for(product_ids)
+
+    def test_create_order_uses_product_cache(self, client, test_session, test_products, auth_headers, statements):
+        """Test los precios se leen de la caché y un cambio de precio la invalida"""
+        items = {"items": [{"product_id": 1, "quantity": 1}]}
+        client.post("/api/orders/", json=items, headers=auth_headers)
+
+        statements.clear()
+        response = client.post("/api/orders/", json=items, headers=auth_headers)
+        assert response.json()["total"] == 50000.0
+        assert not any("FROM product" in sql for sql in statements)
+
+        product = test_session.get(Product, 1)
+        product.price = 42000.0
+        test_session.add(product)
+        test_session.commit()
+
+        response = client.post("/api/orders/", json=items, headers=auth_headers)
+        assert response.json()["total"] == 42000.0
+
+
+class TestOrderLifecycle:
+    """Tests para validar, confirmar y cancelar pedidos"""
+
+    def test_validate_reserves_every_line(self, client, test_inventory, auth_headers, create_order, stock_of):
+        """Test validar un pedido reserva todas sus líneas (sumando productos repetidos)"""
+        order_id = create_order([
+            {"product_id": 1, "quantity": 2},
+            {"product_id": 1, "quantity": 1},
+            {"product_id": 2, "quantity": 1}
+        ])
+
+        response = client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "check"
+        assert stock_of(1) == (5, 3)
+        assert stock_of(2) == (1, 1)
+
+    def test_validate_twice_reserves_once(self, client, test_inventory, auth_headers, create_order, stock_of):
+        """Test validar de nuevo una orden ya validada se rechaza y no reserva otra vez"""
+        order_id = create_order([{"product_id": 1, "quantity": 2}])
+        client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+
+        response = client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert stock_of(1) == (5, 2)
+
+    def test_validate_insufficient_stock_reserves_nothing(self, client, test_inventory, auth_headers, create_order, stock_of):
+        """Test si una línea no tiene stock no se reserva ninguna"""
+        order_id = create_order([
+            {"product_id": 1, "quantity": 2},
+            {"product_id": 2, "quantity": 3}
+        ])
+
+        response = client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        detail = response.json()["detail"]
+        assert detail["error_code"] == "INSUFFICIENT_STOCK"
+        assert detail["available_stock"] == {"2": {
+            "product_id": 2,
+            "product_title": "Test Book 2",
+            "available_quantity": 1,
+            "requested_quantity": 3
+        }}
+        assert stock_of(1) == (5, 0)
+        assert stock_of(2) == (1, 0)
+
+    def test_confirm_consumes_reservation(self, client, test_inventory, auth_headers, create_order, stock_of):
+        """Test confirmar un pedido descuenta el stock reservado"""
+        order_id = create_order([{"product_id": 1, "quantity": 2}])
+        client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+
+        response = client.post(f"/api/orders/{order_id}/confirm", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "completed"
+        assert stock_of(1) == (3, 0)
+
+    def test_cancel_releases_reservation(self, client, test_inventory, auth_headers, create_order, stock_of):
+        """Test cancelar un pedido validado libera la reserva"""
+        order_id = create_order([
+            {"product_id": 1, "quantity": 2},
+            {"product_id": 2, "quantity": 1}
+        ])
+        client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+
+        response = client.delete(f"/api/orders/{order_id}/cancel", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "canceled"
+        assert stock_of(1) == (5, 0)
+        assert stock_of(2) == (1, 0)
+
+
+class TestReservationExpiry:
+    """Tests para el vencimiento de reservas de órdenes en 'check'"""
+
+    def test_sweeper_expires_old_reservations(self, client, test_session, test_engine, test_inventory, auth_headers, create_order, stock_of):
+        """Test las órdenes vencidas pasan a 'expired' y liberan el stock; las recientes no"""
+        from datetime import datetime, timedelta, timezone
+        from sqlmodel import Session
+        from models.order import Order
+        from services.reservation_sweeper import sweep_expired_reservations
+
+        old_order = create_order([{"product_id": 1, "quantity": 2}])
+        recent_order = create_order([{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 1}])
+        for order_id in (old_order, recent_order):
+            client.post(f"/api/orders/{order_id}/validate", headers=auth_headers)
+        order = test_session.get(Order, old_order)
+        order.updated_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        test_session.add(order)
+        test_session.commit()
+
+        expired = sweep_expired_reservations(lambda: Session(test_engine))
+
+        assert expired == 1
+        test_session.expire_all()
+        assert test_session.get(Order, old_order).status == "expired"
+        assert test_session.get(Order, recent_order).status == "check"
+        assert stock_of(1) == (5, 1)
+        assert stock_of(2) == (1, 1)
+        response = client.post(f"/api/orders/{old_order}/confirm", headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestOrderDetails:
+    """Tests para la carga de detalles de pedidos"""
+
+    def test_get_order_items_endpoint(self, client, test_orders, auth_headers):
+        """Test los items de un pedido incluyen el título del producto"""
+        response = client.get(f"/api/order/item/{test_orders[0].order_id}", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [item["product_title"] for item in data] == ["Test Book 1", "Test Book 2"]
+
+    def test_get_order_items_not_found(self, client, test_user, auth_headers):
+        """Test pedido inexistente"""
+        response = client.get("/api/order/item/999", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_orders_by_user_single_query(self, test_session, test_user, test_orders, statements):
+        """Test el historial con detalles se carga con una sola consulta"""
+        from services.orders_service import get_orders_by_user
+
+        user_id = test_user.user_id
+        statements.clear()
+        orders = get_orders_by_user(test_session, user_id, limit=10)
+
+        assert len(statements) == 1
+        assert [len(items) for _, items in orders] == [2, 1, 1]
+        assert orders[0][1][1]["product_title"] == "Test Book 2"
+
+
+class TestUserOrders:
+    """Tests para el historial paginado de pedidos"""
+
+    def test_user_orders_single_query(self, test_session, test_user, test_orders, statements):
+        """Test la página con items_count y total se obtiene con una sola consulta"""
+        from services.orders_service import get_user_orders
+
+        user_id = test_user.user_id
+        statements.clear()
+        result = get_user_orders(test_session, user_id, page=1, page_size=2)
+
+        assert len(statements) == 1
+        assert [o["items_count"] for o in result["orders"]] == [2, 1]
+        assert result["total_orders"] == 3
+        assert result["total_pages"] == 2
+        assert result["has_next"] is True
+        assert result["has_previous"] is False
+
+    def test_user_orders_page_out_of_range(self, test_session, test_user, test_orders):
+        """Test una página vacía mantiene el total de pedidos"""
+        from services.orders_service import get_user_orders
+
+        result = get_user_orders(test_session, test_user.user_id, page=5, page_size=2)
+
+        assert result["orders"] == []
+        assert result["total_orders"] == 3
+        assert result["has_next"] is False
+
+    def test_user_orders_without_orders(self, test_session, test_user):
+        """Test usuario sin pedidos"""
+        from services.orders_service import get_user_orders
+
+        result = get_user_orders(test_session, test_user.user_id)
+
+        assert result["orders"] == []
+        assert result["total_orders"] == 0
+        assert result["total_pages"] == 0
+
+    def test_user_orders_cursor_pagination(self, test_session, test_user, test_orders):
+        """Test recorrer el historial con cursores hacia adelante y hacia atrás"""
+        from services.orders_service import get_user_orders
+
+        user_id = test_user.user_id
+        first = get_user_orders(test_session, user_id, page_size=2)
+        assert first["previous_cursor"] is None
+
+        second = get_user_orders(test_session, user_id, page_size=2, cursor=first["next_cursor"])
+        assert [o["order_id"] for o in second["orders"]] == [test_orders[2].order_id]
+        assert second["has_next"] is False
+        assert second["next_cursor"] is None
+        assert second["total_orders"] == 3
+
+        back = get_user_orders(test_session, user_id, page_size=2, cursor=second["previous_cursor"])
+        assert [o["order_id"] for o in back["orders"]] == [o["order_id"] for o in first["orders"]]
+        assert back["has_previous"] is False
+
+    def test_user_orders_invalid_cursor(self, client, test_user, auth_headers):
+        """Test un cursor inválido devuelve 400"""
+        response = client.get(
+            f"/api/users/{test_user.user_id}/orders",
+            params={"cursor": "no-es-un-cursor"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,178 @@
+"""
+Tests para el catálogo de productos
+"""
+from fastapi import status
+
+from repositories.product_repository import like_pattern
+
+
+class TestProductsCatalog:
+    """Tests para el listado de productos"""
+
+    def test_list_products(self, client, test_products, auth_headers):
+        """Test listar productos"""
+        response = client.get("/api/products/", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [p["product_id"] for p in data["products"]] == [1, 2]
+        assert data["total"] == 2
+        assert data["total_pages"] == 1
+        assert data["has_next"] is False
+        assert data["next_cursor"] is None
+
+    def test_list_products_cursor(self, client, test_products, auth_headers):
+        """Test paginar el catálogo por cursor"""
+        first = client.get("/api/products/", params={"page_size": 1}, headers=auth_headers).json()
+        assert [p["product_id"] for p in first["products"]] == [1]
+
+        second = client.get(
+            "/api/products/",
+            params={"page_size": 1, "cursor": first["next_cursor"]},
+            headers=auth_headers
+        ).json()
+        assert [p["product_id"] for p in second["products"]] == [2]
+        assert second["next_cursor"] is None
+
+        back = client.get(
+            "/api/products/",
+            params={"page_size": 1, "cursor": second["previous_cursor"]},
+            headers=auth_headers
+        ).json()
+        assert [p["product_id"] for p in back["products"]] == [1]
+
+    def test_list_products_requires_token(self, client, test_products):
+        """Test el catálogo requiere autenticación"""
+        response = client.get("/api/products/")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_list_products_sort_by_price_desc(self, client, test_products, auth_headers):
+        """Test ordenar por precio descendente"""
+        response = client.get("/api/products/", params={"sort": "-price"}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["price"] for p in response.json()["products"]] == [75000.0, 50000.0]
+
+    def test_list_products_sorted_cursor(self, client, test_products, auth_headers):
+        """Test el cursor respeta el orden solicitado"""
+        params = {"sort": "-price", "page_size": 1}
+        first = client.get("/api/products/", params=params, headers=auth_headers).json()
+        second = client.get(
+            "/api/products/",
+            params={**params, "cursor": first["next_cursor"]},
+            headers=auth_headers
+        ).json()
+
+        assert [p["product_id"] for p in first["products"]] == [2]
+        assert [p["product_id"] for p in second["products"]] == [1]
+
+        mismatch = client.get(
+            "/api/products/",
+            params={"sort": "price", "cursor": first["next_cursor"]},
+            headers=auth_headers
+        )
+        assert mismatch.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_products_filters(self, client, test_products, auth_headers):
+        """Test filtrar por autor y rango de precio"""
+        response = client.get(
+            "/api/products/",
+            params={"author": "Test Author 2", "min_price": 60000},
+            headers=auth_headers
+        )
+        assert [p["product_id"] for p in response.json()["products"]] == [2]
+
+        response = client.get("/api/products/", params={"max_price": 10}, headers=auth_headers)
+        assert response.json()["products"] == []
+        assert response.json()["total"] == 0
+
+    def test_list_products_category_filter(self, client, test_session, test_products, auth_headers):
+        """Test filtrar por categoría"""
+        from models.category import Category, CategoryProductLink
+
+        test_session.add(Category(category_id=1, name="Novela", description="Novelas"))
+        test_session.add(CategoryProductLink(category_id=1, product_id=2))
+        test_session.commit()
+
+        response = client.get("/api/products/", params={"category_id": 1}, headers=auth_headers)
+
+        assert [p["product_id"] for p in response.json()["products"]] == [2]
+
+    def test_list_products_sparse_fields(self, client, test_products, auth_headers):
+        """Test seleccionar solo algunos campos"""
+        response = client.get(
+            "/api/products/",
+            params={"fields": "title,price", "sort": "publication_year"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["products"][0] == {"product_id": 1, "title": "Test Book 1", "price": 50000.0}
+
+    def test_list_products_invalid_params(self, client, test_products, auth_headers):
+        """Test campos u orden no soportados devuelven 400"""
+        response = client.get("/api/products/", params={"fields": "password"}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.get("/api/products/", params={"sort": "title"}, headers=auth_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestProductsSearch:
+    """Tests para la búsqueda de productos"""
+
+    def test_search_by_title_words(self, client, test_products, auth_headers):
+        """Test buscar por palabras del título"""
+        response = client.get("/api/products/search", params={"q": "book 2"}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 1
+        assert data["products"][0]["title"] == "Test Book 2"
+        assert "rank" in data["products"][0]
+
+    def test_search_by_partial_isbn(self, client, test_products, auth_headers):
+        """Test buscar por prefijo de ISBN"""
+        response = client.get("/api/products/search", params={"q": "123456789012"}, headers=auth_headers)
+
+        assert {p["product_id"] for p in response.json()["products"]} == {1, 2}
+
+    def test_search_ranks_best_match_first(self, client, test_products, auth_headers):
+        """Test el mejor resultado aparece primero"""
+        response = client.get("/api/products/search", params={"q": "another"}, headers=auth_headers)
+
+        assert [p["product_id"] for p in response.json()["products"]] == [2]
+
+    def test_search_sees_updates(self, client, test_session, test_products, auth_headers):
+        """Test el índice se mantiene al actualizar un producto"""
+        product = test_products[0]
+        product.title = "Cien años de soledad"
+        test_session.add(product)
+        test_session.commit()
+
+        response = client.get("/api/products/search", params={"q": "soledad"}, headers=auth_headers)
+
+        assert [p["product_id"] for p in response.json()["products"]] == [1]
+
+    def test_search_requires_query(self, client, test_products, auth_headers):
+        """Test la búsqueda requiere texto"""
+        response = client.get("/api/products/search", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_search_rejects_blank_query(self, client, test_products, auth_headers):
+        """Test una búsqueda con solo espacios devuelve 400"""
+        response = client.get("/api/products/search", params={"q": "   "}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_search_wildcards_are_literal(self, client, test_products, auth_headers):
+        """Test los comodines de LIKE no coinciden con todo el catálogo"""
+        response = client.get("/api/products/search", params={"q": "%"}, headers=auth_headers)
+
+        assert response.json()["total"] == 0
+
+    def test_like_pattern_escapes_wildcards(self):
+        """Test el patrón de ISBN escapa %, _ y la barra invertida"""
+        assert like_pattern("97_8%\\") == "%97\\_8\\%\\\\%"
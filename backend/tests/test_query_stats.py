@@ -0,0 +1,67 @@
+"""
+Tests para el conteo de sentencias SQL por request
+"""
+import json
+import logging
+import pytest
+from fastapi import Depends, FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from core.config import settings
+from core.query_stats import QueryBudgetExceeded, QueryStatsMiddleware, fingerprint, query_budget
+
+
+@pytest.fixture(scope="function")
+def budget_app(test_engine):
+    """Aplicación mínima con un endpoint que consulta un producto por cada id (N+1)"""
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/products", dependencies=[Depends(query_budget(2))])
+    def list_products(ids: str):
+        with test_engine.connect() as connection:
+            for product_id in ids.split(","):
+                connection.execute(text("SELECT title FROM product WHERE product_id = :id"), {"id": int(product_id)})
+        return {"ok": True}
+
+    return app
+
+
+class TestQueryStats:
+    """Tests para el middleware de estadísticas SQL"""
+
+    def test_server_timing_header(self, client, test_products, auth_headers):
+        """Test la respuesta informa las sentencias y el tiempo en base de datos"""
+        response = client.get("/api/products/availability", params={"ids": "1,2"}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        db_timing, app_timing = response.headers["server-timing"].split(", ")
+        assert db_timing.startswith("db;dur=") and db_timing.endswith('desc="1 queries"')
+        assert app_timing.startswith("app;dur=")
+
+    def test_repeated_statements_logged(self, budget_app, test_products, caplog, monkeypatch):
+        """Test una sentencia repetida (N+1) se registra como advertencia con su huella"""
+        caplog.set_level(logging.WARNING, logger="sql")
+        monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_STRICT", False)
+
+        response = TestClient(budget_app).get("/products", params={"ids": "1,2,1,2,1"})
+
+        assert response.status_code == status.HTTP_200_OK
+        record = json.loads(caplog.records[-1].getMessage())
+        assert (record["route"], record["queries"], record["budget"]) == ("/products", 5, 2)
+        assert record["repeated"] == [{"count": 5, "sql": "SELECT title FROM product WHERE product_id = ?"}]
+
+    def test_strict_budget_fails(self, budget_app, test_products):
+        """Test en modo estricto superar el presupuesto hace fallar el request"""
+        client = TestClient(budget_app)
+        assert client.get("/products", params={"ids": "1,2"}).status_code == status.HTTP_200_OK
+
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/products", params={"ids": "1,2,1"})
+
+    def test_fingerprint_collapses_literals_and_in_lists(self):
+        """Test sentencias con distintos valores comparten huella"""
+        assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == fingerprint(
+            "SELECT *  FROM t\nWHERE id IN (?, ?) AND name = 'y'"
+        ) == "SELECT * FROM t WHERE id IN (?) AND name = ?"
@@ -2,6 +2,7 @@ import React, { useEffect, useState, useRef } from 'react';
 import { getInventory, adjustInventory } from '../services/inventoryService';
 import Sidebar from '../components/layout/Sidebar';
 import '../styles/Inventory.css';
+import '../styles/OrderHistory.css';
 
 const InventoryPage = () => {
   const [inventory, setInventory] = useState([]);
@@ -13,6 +14,14 @@ const InventoryPage = () => {
   const [showConfirm, setShowConfirm] = useState(false);
   const [isUpdating, setIsUpdating] = useState(false);
   const [isEditing, setIsEditing] = useState(false);
+  // Paginación por cursor: el backend devuelve los cursores de la página siguiente y anterior
+  const [filters, setFilters] = useState({});
+  const [pagination, setPagination] = useState({
+    has_next: false,
+    has_previous: false,
+    next_cursor: null,
+    previous_cursor: null
+  });
 
 
   useEffect(() => {
@@ -24,14 +33,22 @@ const InventoryPage = () => {
     };
   }, []);
 
-  const fetchInventory = async (filters = {}) => {
+  const fetchInventory = async (newFilters = {}, cursor = null) => {
     setLoading(true);
     try {
-      const data = await getInventory(filters);
-      setInventory(data);
+      const data = await getInventory(cursor ? { ...newFilters, cursor } : newFilters);
+      setInventory(data.inventory);
+      setPagination({
+        has_next: data.has_next,
+        has_previous: data.has_previous,
+        next_cursor: data.next_cursor,
+        previous_cursor: data.previous_cursor
+      });
     } catch (error) {
       setInventory([]);
+      setPagination({ has_next: false, has_previous: false, next_cursor: null, previous_cursor: null });
     }
+    setFilters(newFilters);
     setLoading(false);
   };
 
@@ -81,9 +98,9 @@ const InventoryPage = () => {
                   }
 
                   debounceRef.current = setTimeout(() => {
-                    const filters = {};
-                    if (value) filters[searchField] = value;
-                    fetchInventory(filters);
+                    const newFilters = {};
+                    if (value) newFilters[searchField] = value;
+                    fetchInventory(newFilters);
                   }, 300);
                 }}
                 className="search-input"
@@ -196,6 +213,25 @@ const InventoryPage = () => {
                 </tbody>
               </table>
             )}
+            {/* Paginación */}
+            {(pagination.has_next || pagination.has_previous) && (
+              <div className="pagination">
+                <button
+                  className="pagination-button"
+                  onClick={() => fetchInventory(filters, pagination.previous_cursor)}
+                  disabled={!pagination.has_previous || loading}
+                >
+                  ← Anterior
+                </button>
+                <button
+                  className="pagination-button"
+                  onClick={() => fetchInventory(filters, pagination.next_cursor)}
+                  disabled={!pagination.has_next || loading}
+                >
+                  Siguiente →
+                </button>
+              </div>
+            )}
           </div>
         </div>
         {/* Modal de confirmación de actualización */}
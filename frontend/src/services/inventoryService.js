@@ -2,7 +2,8 @@ import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL + '/api/inventory';
 
-export const getInventory = async (filter = filter) => {
+// Devuelve una página: { inventory, has_next, has_previous, next_cursor, previous_cursor }
+export const getInventory = async (filter = {}) => {
   const param = new URLSearchParams(filter).toString();
   const url = param ? `${API_URL}?${param}` : API_URL;
   const token = localStorage.getItem('auth_token');